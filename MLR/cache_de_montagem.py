@@ -0,0 +1,84 @@
+'''
+Cache em disco das montagens, para não montar de novo códigos que não
+mudaram. Cada montagem fica em um arquivo cujo nome é o hash do código,
+das opções da montagem e da versão do montador (o hash de seu próprio
+código), e a cache é limitada em tamanho, apagando primeiro as montagens
+usadas há mais tempo.
+'''
+
+import os
+import json
+import hashlib
+import tempfile
+
+#Arquivos do montador, que definem sua versão
+ARQUIVOS_DO_MONTADOR=["montador.py", "motor_de_eventos.py", "eventos.py"]
+#Tamanho máximo padrão da cache, em bytes
+TAMANHO_MAXIMO=64*1024*1024
+
+#Devolve o hash do código do montador, que muda a cada nova versão
+def versao_do_montador():
+	diretorio=os.path.dirname(os.path.abspath(__file__))
+	versao=hashlib.sha256()
+	for nome in ARQUIVOS_DO_MONTADOR:
+		arquivo=open(os.path.join(diretorio, nome), "rb")
+		versao.update(arquivo.read())
+		arquivo.close()
+	return versao.hexdigest()
+
+class CacheDeMontagem:
+	def __init__(self, diretorio:str, tamanho_maximo:int=TAMANHO_MAXIMO):
+		self.diretorio=diretorio
+		self.tamanho_maximo=tamanho_maximo
+		self.versao=versao_do_montador()
+		os.makedirs(diretorio, exist_ok=True)
+
+	#Devolve a chave da montagem do código com as opções dadas
+	def chave(self, codigo:str, opcoes:tuple):
+		return hashlib.sha256(json.dumps([self.versao, list(opcoes), codigo]).encode()).hexdigest()
+
+	def caminho(self, chave:str):
+		return os.path.join(self.diretorio, chave+".json")
+
+	#Devolve a montagem guardada com a chave dada, ou None se não houver
+	def busca(self, chave:str):
+		caminho=self.caminho(chave)
+		try:
+			arquivo=open(caminho, "r")
+			dados=json.load(arquivo)
+			arquivo.close()
+			os.utime(caminho)
+		except (OSError, ValueError):
+			return None
+		return dados
+
+	#Guarda a montagem com a chave dada e apaga as mais antigas se a cache passar do tamanho máximo
+	def guarda(self, chave:str, dados:dict):
+		descritor, temporario=tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+		arquivo=os.fdopen(descritor, "w")
+		json.dump(dados, arquivo)
+		arquivo.close()
+		os.replace(temporario, self.caminho(chave))
+		self.limita()
+
+	#Apaga as montagens usadas há mais tempo até a cache caber no tamanho máximo
+	def limita(self):
+		entradas=[]
+		tamanho=0
+		for entrada in os.scandir(self.diretorio):
+			if entrada.name.endswith(".json"):
+				try:
+					estado=entrada.stat()
+				except OSError:
+					continue
+				entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+				tamanho+=estado.st_size
+		entradas.sort()
+		for usada, tamanho_entrada, caminho in entradas:
+			if tamanho<=self.tamanho_maximo:
+				break
+			try:
+				os.remove(caminho)
+			except OSError:
+				pass
+			tamanho-=tamanho_entrada
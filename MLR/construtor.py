@@ -0,0 +1,178 @@
+'''
+Construtor de vários códigos de uma vez: lê uma descrição da construção
+e roda as montagens, ligações e relocações descritas em um conjunto de
+processos, cada tarefa começando assim que os arquivos de que depende
+ficam prontos. Cada linha da descrição é uma tarefa, uma de:
+monta [fonte.asm] [base] [absoluto]
+liga [saida.mvn] [entrada1.mvn] [entrada2.mvn] ...
+reloca [entrada.mvn] [saida.mvn] [base]
+monta gera os arquivos .mvn e .lst com o nome da fonte, um código
+relocável a menos que a linha termine em absoluto, as bases são
+opcionais e em hexadecimal. Os caminhos relativos são tomados a partir
+do diretório da descrição e o texto depois de ";" é ignorado.
+'''
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from montador import assemble, VERMELHO, VERDE, BRANCO
+from cache_de_montagem import CacheDeMontagem
+from ligador import liga
+from relocador import reloca
+
+#Caches de montagem já abertas por este processo
+# chave:	diretório e tamanho máximo da cache
+# valor:	CacheDeMontagem
+caches={}
+
+'''Lê a descrição e devolve a lista de tarefas, cada uma um dicionário
+com tipo, entradas, saidas, base, relocavel e linha'''
+def le_descricao(nome):
+	diretorio=os.path.dirname(nome)
+	arquivo=open(nome, "r")
+	linhas=arquivo.read().split("\n")
+	arquivo.close()
+	tarefas=[]
+	for numero, linha in enumerate(linhas, 1):
+		linha=linha.split(";")[0].split()
+		if len(linha)==0:
+			continue
+		tipo=linha[0]
+		caminhos=[os.path.join(diretorio, caminho) for caminho in linha[1:]]
+		relocavel=True
+		if tipo=="monta" and len(linha)>2 and linha[-1]=="absoluto":
+			relocavel=False
+			linha=linha[:-1]
+		if tipo=="monta" and len(linha) in [2, 3]:
+			fonte=caminhos[0]
+			nome_saida=os.path.splitext(fonte)[0]
+			tarefa={"entradas": [fonte], "saidas": [nome_saida+".mvn", nome_saida+".lst"], "base": linha[2] if len(linha)==3 else "0"}
+		elif tipo=="liga" and len(linha)>=4:
+			tarefa={"entradas": caminhos[1:], "saidas": [caminhos[0]], "base": "0"}
+		elif tipo=="reloca" and len(linha) in [3, 4]:
+			tarefa={"entradas": [caminhos[0]], "saidas": [caminhos[1]], "base": linha[3] if len(linha)==4 else "0"}
+		else:
+			raise ValueError(f"Linha {numero} da descrição mal formulada: "+" ".join(linha))
+		try:
+			tarefa["base"]=int(tarefa["base"], 16)
+		except ValueError:
+			raise ValueError(f"Base inválida na linha {numero} da descrição: "+tarefa["base"])
+		tarefa["tipo"]=tipo
+		tarefa["relocavel"]=relocavel
+		tarefa["linha"]=numero
+		tarefas.append(tarefa)
+	return tarefas
+
+'''Devolve, para cada tarefa, o conjunto das tarefas que geram suas
+entradas e a lista das tarefas que usam suas saídas, levanta erro se
+dois arquivos têm o mesmo nome ou se há dependências circulares'''
+def dependencias(tarefas):
+	geradoras={}
+	for indice, tarefa in enumerate(tarefas):
+		for saida in tarefa["saidas"]:
+			saida=os.path.normpath(saida)
+			if saida in geradoras:
+				raise ValueError(f"O arquivo {saida} é gerado nas linhas {tarefas[geradoras[saida]]['linha']} e {tarefa['linha']} da descrição")
+			geradoras[saida]=indice
+	depende=[set() for tarefa in tarefas]
+	dependentes=[[] for tarefa in tarefas]
+	for indice, tarefa in enumerate(tarefas):
+		for entrada in tarefa["entradas"]:
+			geradora=geradoras.get(os.path.normpath(entrada))
+			if geradora!=None and geradora not in depende[indice]:
+				depende[indice].add(geradora)
+				dependentes[geradora].append(indice)
+	#Confere que todas as tarefas podem ser feitas em alguma ordem
+	faltam=[len(requisitos) for requisitos in depende]
+	prontas=[indice for indice in range(len(tarefas)) if faltam[indice]==0]
+	feitas=0
+	while prontas:
+		indice=prontas.pop()
+		feitas+=1
+		for dependente in dependentes[indice]:
+			faltam[dependente]-=1
+			if faltam[dependente]==0:
+				prontas.append(dependente)
+	if feitas<len(tarefas):
+		raise ValueError("Há dependências circulares na descrição")
+	return depende, dependentes
+
+'''Roda uma tarefa e devolve se ela deu certo e as mensagens que os
+scripts escreveriam na tela'''
+def executa(tarefa, verbosidade, cache):
+	try:
+		if tarefa["tipo"]=="monta":
+			if cache!=None and cache not in caches:
+				caches[cache]=CacheDeMontagem(*cache)
+			arquivo=open(tarefa["entradas"][0], "r")
+			codigo=arquivo.read()
+			arquivo.close()
+			resultado=assemble(codigo, tarefa["base"], tarefa["relocavel"], verbosidade, cache=caches[cache] if cache!=None else None)
+			if resultado.mvn==None:
+				return False, resultado.messages+[f"{VERMELHO}Código não montado: "+tarefa["entradas"][0]+BRANCO]
+			arquivo=open(tarefa["saidas"][0], "w")
+			arquivo.write("".join(linha+"\n" for linha in resultado.mvn))
+			arquivo.close()
+			arquivo=open(tarefa["saidas"][1], "w")
+			arquivo.write(resultado.lst)
+			arquivo.close()
+			return True, resultado.messages+["Código montado para "+tarefa["saidas"][0]]
+		if tarefa["tipo"]=="liga":
+			liga(tarefa["entradas"], tarefa["saidas"][0])
+			return True, ["Códigos ligados para "+tarefa["saidas"][0]]
+		reloca(tarefa["entradas"][0], tarefa["saidas"][0], tarefa["base"])
+		return True, ["Código relocado para "+tarefa["saidas"][0]]
+	except Exception as erro:
+		return False, [f"{VERMELHO}Erro na linha {tarefa['linha']} da descrição: {erro!r}{BRANCO}"]
+
+'''Roda as tarefas em processos, cada uma assim que as tarefas de que
+depende terminam, escrevendo as mensagens de cada uma com saida quando
+ela termina, e devolve para cada tarefa True se deu certo, False se
+deu errado e None se não foi rodada por depender de uma que deu errado'''
+def constroi(tarefas, processos=None, verbosidade=0, cache=None, saida=print):
+	depende, dependentes=dependencias(tarefas)
+	faltam=[len(requisitos) for requisitos in depende]
+	resultados=[None]*len(tarefas)
+	with ProcessPoolExecutor(processos) as executor:
+		rodando={}
+		for indice in range(len(tarefas)):
+			if faltam[indice]==0:
+				rodando[executor.submit(executa, tarefas[indice], verbosidade, cache)]=indice
+		while rodando:
+			terminadas, pendentes=wait(rodando, return_when=FIRST_COMPLETED)
+			for futuro in terminadas:
+				indice=rodando.pop(futuro)
+				resultados[indice], mensagens=futuro.result()
+				if saida!=None:
+					for mensagem in mensagens:
+						saida(mensagem)
+				if not resultados[indice]:
+					continue
+				for dependente in dependentes[indice]:
+					faltam[dependente]-=1
+					if faltam[dependente]==0:
+						rodando[executor.submit(executa, tarefas[dependente], verbosidade, cache)]=dependente
+	return resultados
+
+if __name__=="__main__":
+	parser=argparse.ArgumentParser(description="Parâmetros do construtor")
+	parser.add_argument("descricao",				action="store", type=str,					help="Arquivo com uma tarefa por linha: monta [fonte.asm] [base] [absoluto], liga [saida.mvn] [entradas.mvn ...] ou reloca [entrada.mvn] [saida.mvn] [base].")
+	parser.add_argument("-j", "--processos",		action="store", type=int,	required=False, help="Número de processos rodando tarefas. Default: um por CPU.", default=None)
+	parser.add_argument("-v", "--verbosidade",		action="store", type=int,	required=False, help="Verbosidade das montagens. Default: 0", default=0)
+	parser.add_argument("-c", "--cache",			action="store", type=str,	required=False, help="Diretório da cache de montagens. Default: sem cache.", default=None)
+	parser.add_argument("-ct", "--cache_tamanho",	action="store", type=int,	required=False, help="Tamanho máximo da cache de montagens em MB. Default: 64.", default=64)
+	args=parser.parse_args()
+
+	tarefas=le_descricao(args.descricao)
+	cache=(args.cache, args.cache_tamanho*1024*1024) if args.cache!=None else None
+	resultados=constroi(tarefas, args.processos, args.verbosidade, cache)
+
+	erradas=resultados.count(False)
+	puladas=[tarefa for tarefa, resultado in zip(tarefas, resultados) if resultado==None]
+	for tarefa in puladas:
+		print(f"{VERMELHO}Tarefa da linha {tarefa['linha']} não rodada, depende de uma tarefa que deu errado{BRANCO}")
+	if erradas>0 or puladas:
+		print(f"{VERMELHO}{erradas} tarefas deram errado e {len(puladas)} não foram rodadas{BRANCO}")
+		sys.exit(1)
+	print(f"{VERDE}{len(tarefas)} tarefas prontas{BRANCO}")
@@ -1,7 +1,9 @@
 from eventos import *
 from motor_de_eventos import *
+from cache_de_montagem import CacheDeMontagem
 import argparse
 import sys
+import io
 
 #Constantes
 EOF="EOF"
@@ -18,242 +20,35 @@ BRANCO="\u001b[37m"
 AMARELO="\u001b[33m"
 ESTADO_FINAL="P1"
 ESTADO_INICIAL="P0"
-
-#Hiperparâmetros
-
-parser=argparse.ArgumentParser(description="Hiperparâmetros do interpretador de ghun")
-parser.add_argument("input", 				action="store", type=str, 					help="Caminho para o arquivo a ser interpretado.")
-parser.add_argument("-o", "--output",		action="store", type=str, 	required=False, help="Caminho para o arquivo a ser gerado. Default: igual ao arquivo de entrada.", default="")
-parser.add_argument("-v", "--verbosidade",	action="store", type=int, 	required=False, help="Verboidade da interpretação. Quanto maior, mais informações são mostradas durante o reconhecimento e interpretação. Default: 0", default=0)
-parser.add_argument("-t", "--tokens",	 	action="store_true",		required=False, help="Se ativo, mostra os tokens provenientes da análise léxica.", default=False)
-parser.add_argument("-st", "--sintatico", 	action="store_false",		required=False, help="Se ativo, não executa a análise sintática, apenas a léxica.", default=True)
-parser.add_argument("-sm", "--semantico", 	action="store", type=int,	required=False, help="Indica quanto da análise semantica deve ser feita. 0 para não fazer, 1 para analisar as definições de variáveis, 2 para analisar os usos de variáveis e 3 ou maior para realizar toda a geração de código. Default: 3", default=3)
-parser.add_argument("-g", "--gerar",	 	action="store_false",		required=False, help="Se ativo, não executa a escrita do código no arquivo de saída.", default=True)
-parser.add_argument("-b", "--base",		 	action="store", type=int,	required=False, help="Endereço base do código a ser gerado em hexadecimal, para o caso de não estar definido no código de entrada. Default: 0.", default=0)
-parser.add_argument("-a", "--absoluto",	 	action="store_false",		required=False, help="Se ativo, o código gerado não será relocável, para caso não seja definido no código de entrada.", default=True)
-args=parser.parse_args()
-
-TOKENS=args.tokens
-SINTATICO=args.sintatico
-SEMANTICO=args.semantico
-GERAR=args.gerar
-VERBOSIDADE=args.verbosidade
-CODIGO=args.input
-CODIGO_OUT= CODIGO.split(".")[0] if args.output=="" else args.output
-BASE=args.base
-ABSOLUTO=args.absoluto
+#Bases dos números, dado o caractere que os precede
+codigo_para_base={"/":16, "=":10, "@":8, "#":2}
 
 #Tipos
-#				 arquivo=["file"]
-#				   linha=["linha", "eof"]
-#			  caracteres=["util", "descartavel", "controle"]
-#	    caracteres_uteis=["letra", "digito", "especial"]
-#caracteres_descartaveis=["delimitador"]
-#				 palavra=["terminal", "n-terminal", "especial", "reservada"]
-
-#Código
-
-if VERBOSIDADE>1:
-	print("Iniciando análise léxica\n-----------------------------")
-
-#Motor para separar arquivo em linhas
-def le_arquivo(evento, extra_params=()):
-	try:
-		arquivo=open(evento)
-	except:
-		if VERBOSIDADE>-1:
-			print(f"{VERMELHO}O arquivo {evento} não existe.")
-		exit()
-	conteudo=arquivo.read()
-	linhas=conteudo.split("\n")
-	linhas=[Evento(indice, "linha", (linhas[indice]+"\n")) for indice in range(len(linhas))]
-	for indice in range(len(linhas)-1):
-		linhas[indice].proximo=linhas[indice+1]
-	eof=Evento(0, "eof", (EOF))
-	linhas[-1].proximo=eof
-	return linhas[0]
-
-arquivo_entrada=Evento(0, "file", (CODIGO))
-
-sistemas_de_arquivos=MotorDeEventos(arquivo_entrada, {"file": le_arquivo})
-
-linha=sistemas_de_arquivos.roda_um_evento()
-
-#Motor para separar linha em caracteres
-def le_linha(evento, chave_base):
-	linha=list(evento)
-	caracteres=[]
-	for indice in range(len(linha)):
-		if linha[indice] in DESCARTAVEIS:
-			tipo="descartavel"
-		elif linha[indice] in CONTROLE:
-			tipo="controle"
-		else:
-			tipo="util"
-		caracteres.append(Evento(chave_base+indice, tipo, (linha[indice])))
-		if indice!=0: caracteres[-2].proximo=caracteres[-1]
-	return caracteres[0]
-
-def add_eof(evento, chave_base):
-	return Evento(chave_base, "eof", EOF)
-
-filtro_ascii=MotorDeEventos(linha, {"linha": le_linha, 
-									"eof":add_eof})
-
-carac=filtro_ascii.roda_um_evento((0))
-
-#Motor para classificar caracteres uteis
-def categoriza_ascii_util(evento, chave_base):
-	if evento.isalpha():
-		tipo="letra"
-	elif evento.isnumeric():
-		tipo="digito"
-	else:
-		tipo="especial"
-	return Evento(chave_base, tipo, evento)
-
-def categoriza_ascii_descartavel(evento, chave_base):
-	return Evento(chave_base, "delimitador", evento)
-
-def categoriza_ascii_controle(evento, chave_base):
-	return Evento(chave_base, "controle", evento)
-
-categorizador_ascii=MotorDeEventos(carac, {"util": categoriza_ascii_util, 
-										   "descartavel": categoriza_ascii_descartavel,
-										   "controle": categoriza_ascii_controle,
-										   "eof": add_eof})
-
-while filtro_ascii.fila_de_eventos!=None:
-	carac=filtro_ascii.roda_um_evento((categorizador_ascii.ultima_chave()+1))
-	categorizador_ascii.insere_na_fila(carac)
-
-carac=categorizador_ascii.roda_um_evento((0))
-
-linha=1
-erro_lexico=False
-eh_coment=False
-
-#Motor para agrupar caracter em palavras
-def categoriza_lexico_letra(evento, extra_params):
-	global linha
-	global erro_lexico
-	global eh_coment
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	if tipo=="":
-		return (None,(chave_base, evento, "identificador", dentro_de_aspas))
-	elif tipo=="identificador":
-		return (None,(chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
-	elif tipo=="numero":
-		if evento in LETRAS_HEXA:
-			return (None,(chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
-		if not eh_coment:
-			if VERBOSIDADE>-1:
-				print(f"{VERMELHO}Palavra mal formada na linha {linha}.")
-			erro_lexico=True
-			return (None,(chave_base, palavra_acumulada+evento, "erro", dentro_de_aspas))
-		return (None,(chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
-	elif tipo=="especial":
-		if palavra_acumulada[0]=='"':
-			return (None,(chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
-		return (Evento(chave_base, "especial", palavra_acumulada), 
-					  (chave_base+1, evento, "identificador", dentro_de_aspas))
-
-def categoriza_lexico_digito(evento, extra_params):
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	if tipo=="":
-		return(None, (chave_base, evento, "numero", dentro_de_aspas))
-	elif tipo=="identificador":
-		check_hex=True
-		for letra in palavra_acumulada:
-			if letra not in LETRAS_HEXA: check_hex=False
-		if check_hex:
-			return(None, (chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
-		else:
-			return(None, (chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
-	elif tipo=="numero":
-		return(None, (chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
-	elif tipo=="especial":
-		if palavra_acumulada[0]=='"':
-			return (None,(chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
-		return (Evento(chave_base, "especial", palavra_acumulada), 
-					  (chave_base+1, evento, "numero", dentro_de_aspas))
-
-def categoriza_lexico_especial(evento, extra_params):
-	global eh_coment
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	if evento=='"': dentro_de_aspas=not dentro_de_aspas
-	elif evento==";": eh_coment=True
-	if tipo=="":
-		if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
-			return (Evento(chave_base, "especial", evento), 
-					  (chave_base+1, "", "", dentro_de_aspas))
-		return (None, (chave_base, evento, "especial", dentro_de_aspas))
-	elif tipo=="identificador":
-		if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
-			identifi=Evento(chave_base, "identificador", palavra_acumulada)
-			operador=Evento(chave_base+1, "especial", evento)
-			identifi.proximo=operador
-			return (identifi, 
-					  (chave_base+2, "", "", dentro_de_aspas))
-		return (None, (chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
-	elif tipo=="numero":
-		return (Evento(chave_base, "numero", palavra_acumulada), 
-					  (chave_base+1, evento, "especial", dentro_de_aspas))
-	elif tipo=="especial":
-		if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
-			especial=Evento(chave_base, "especial", palavra_acumulada)
-			operador=Evento(chave_base+1, "especial", evento)
-			especial.proximo=operador
-			return (especial, 
-					  (chave_base+2, "", "", dentro_de_aspas))
-		return (None, (chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
-
-def categoriza_lexico_delimitador(evento, extra_params):
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	if tipo=="":
-		return (None, (chave_base, "", "", dentro_de_aspas))
-	else:
-		return (Evento(chave_base, tipo, palavra_acumulada), 
-					  (chave_base+1, "", "", dentro_de_aspas))
-
-def categoriza_lexico_controle(evento, extra_params):
-	global linha
-	linha+=1
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	if tipo=="":
-		return (Evento(chave_base, "controle", evento), 
-					  (chave_base+1, "", "", dentro_de_aspas))
-	else:
-		ult_evento=Evento(chave_base, tipo, palavra_acumulada)
-		ult_evento.proximo=Evento(chave_base+1, "controle", evento)
-		return (ult_evento,
-			   (chave_base+2, "", "", dentro_de_aspas))
-
-def categoriza_lexico_eof(evento, extra_params):
-	chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
-	return (Evento(chave_base, "eof", EOF), (chave_base+1, "", "", dentro_de_aspas))
-
-categorizador_lexico=MotorDeEventos(carac, {"letra":categoriza_lexico_letra,
-											"digito": categoriza_lexico_digito,
-											"especial": categoriza_lexico_especial,
-											"delimitador": categoriza_lexico_delimitador,
-											"controle": categoriza_lexico_controle,
-											"eof": categoriza_lexico_eof})
-
-while categorizador_ascii.fila_de_eventos!=None:
-	carac=categorizador_ascii.roda_um_evento((categorizador_lexico.ultima_chave()+1))
-	categorizador_lexico.insere_na_fila(carac)
-
-palavra=categorizador_lexico.roda_um_evento((0, "", "", False))
-
-while palavra[0]==None:
-	palavra=categorizador_lexico.roda_um_evento(palavra[1])
-
-if erro_lexico:
-	print(f"{VERMELHO}O código está lexicamente errado.{BRANCO}")
-	sys.exit()
-
-#Motor para categorizar e agrupar palvras em reservadas
+#			  caracteres=["letra", "digito", "especial", "delimitador", "controle"]
+#				palavras=["identificador", "numero", "especial", "controle", "eof"]
+#				  tokens=["terminal", "n-terminal", "reservada", "instrucao", "controle", "eof"]
+
+#Gera as linhas do código, cada uma terminada em "\n", como se ele fosse separado em "\n"
+def le_linhas(codigo):
+	ultima="\n"
+	for ultima in io.StringIO(codigo):
+		yield ultima if ultima.endswith("\n") else ultima+"\n"
+	if ultima.endswith("\n"):
+		yield "\n"
+
+#Categoriza um caractere como delimitador, controle, letra, digito ou especial
+def categoriza_caractere(caractere):
+	if caractere in DESCARTAVEIS:
+		return "delimitador"
+	elif caractere in CONTROLE:
+		return "controle"
+	elif caractere.isalpha():
+		return "letra"
+	elif caractere.isnumeric():
+		return "digito"
+	return "especial"
+
+#Categoriza e agrupa palavras em reservadas
 def recategoriza_identificador(evento, extra_params):
 	chave_base, reservada, indice=extra_params
 	if evento in RESERVADAS:
@@ -296,886 +91,1089 @@ def recategoriza_eof(evento, extra_params):
 	return (Evento(chave_base, "eof", evento),
 			(chave_base+1, "", None))
 
-recategrorizador_lexico=MotorDeEventos(palavra[0], {"identificador": recategoriza_identificador, 
-													"especial": recategoriza_especial,
-													"numero": recategoriza_numero,
-													"controle": recategoriza_controle,
-													"eof": recategoriza_eof})
-
-while categorizador_lexico.fila_de_eventos!=None:
-	palavra=categorizador_lexico.roda_um_evento(palavra[1])
-	while palavra[0]==None:
-		palavra=categorizador_lexico.roda_um_evento(palavra[1])
-	recategrorizador_lexico.insere_na_fila(palavra[0])
-
-palavra=recategrorizador_lexico.roda_um_evento((0, "", None))
-
-while palavra[0]==None:
-	palavra=recategorizador_lexico.roda_um_evento(palavra[1])
-
-pilha_retorno=[]
-linha=1
-erro_sintatico=False
-is_panico=False
-
-#Retorno das rotinas (estado, contador, transicao)
-def fim_codigo(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Terminando o programa")
-	return estado
-
-def base(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado endereço base")
-	return estado
-
-def rotulo(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado novo rotulo")
-	return estado
-
-def entry_point(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um entry point")
-	return estado
-
-def external(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um external")
-	return estado
-
-def instrucao(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrada uma instrução")
-	return estado
-
-def num_hex(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um número hexadecimal")
-	return estado
-
-def num_dec(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um número decimal")
-	return estado
-
-def num_oct(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um número octal")
-	return estado
-
-def num_bin(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um número binário")
-	return estado
-
-def num_asc(simbolo, estado): 
-	global VERBOSIDADE
-	if VERBOSIDADE>1:
-		print("Encontrado um número ASCII")
-	return estado
-
-def faz_nada(simbolo, estado):
-	return estado
-
-def checa_hex(simbolo, estado):
-	global erro_sintatico, linha
-	try:
-		int(simbolo, 16)
-	except:
-		print(f"{VERMELHO}Erro na linha {linha}. {simbolo} não é hexadecimal.{BRANCO}")
-		erro_sintatico=True
-	return estado
-
-def checa_dec(simbolo, estado):
-	global erro_sintatico, linha
-	try:
-		int(simbolo, 10)
-	except:
-		print(f"{VERMELHO}Erro na linha {linha}. {simbolo} não é decimal.{BRANCO}")
-		erro_sintatico=True
-	return estado
-
-def checa_oct(simbolo, estado):
-	global erro_sintatico, linha
-	try:
-		int(simbolo, 8)
-	except:
-		print(f"{VERMELHO}Erro na linha {linha}. {simbolo} não é octal.{BRANCO}")
-		erro_sintatico=True
-	return estado
-
-def checa_bin(simbolo, estado):
-	global erro_sintatico, linha
-	try:
-		int(simbolo, 2)
-	except:
-		print(f"{VERMELHO}Erro na linha {linha}. {simbolo} não é binário.{BRANCO}")
-		erro_sintatico=True
-	return estado
-
-def checa_asc(simbolo, estado):
-	global erro_sintatico, linha
-	if len(simbolo)>2:
-		print(f"{VERMELHO}Erro na linha {linha}. {simbolo} tem mais que dois dígitos.{BRANCO}")
-		erro_sintatico=True
-	return estado
-
-transicoes_sintatico={
-			"P0":{
-				"controle"			: (faz_nada, "P0"),
-				"#"					: (fim_codigo, "P2"),
-				"@"					: (base, "P3"),
-				"&"					: (base, "P3"),
-				"n-terminal"		: (rotulo, "P11"),
-				">"					: (entry_point, "P13"),
-				"<"					: (external, "P13"),
-				";"					: (faz_nada, "P10"),
-				"instrucao"			: (instrucao, "P12"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P1":{
-				"controle"			: (faz_nada, "P1"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P2":{
-				"n-terminal"		: (faz_nada, "P1"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P3":{
-				"/"					: (num_hex, "P4"),
-				"="					: (num_dec, "P5"),
-				"@"					: (num_oct, "P6"),
-				"#"					: (num_bin, "P7"),
-				"'"					: (num_asc, "P8"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P4":{
-				"terminal"			: (checa_hex, "P9"),
-				"n-terminal"		: (checa_hex, "P9"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P5":{
-				"terminal"			: (checa_dec, "P9"),
-				"n-terminal"		: (checa_dec, "P9"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P6":{
-				"terminal"			: (checa_oct, "P9"),
-				"n-terminal"		: (checa_oct, "P9"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P7":{
-				"terminal"			: (checa_bin, "P9"),
-				"n-terminal"		: (checa_bin, "P9"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P8":{
-				"n-terminal"		: (checa_asc, "P9"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P9":{
-				";"					: (faz_nada, "P10"),
-				"controle"			: (faz_nada, "P0"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P10":{
-				"controle"			: (faz_nada, "P0"),
-				"terminal"			: (faz_nada, "P10"),
-				"n-terminal"		: (faz_nada, "P10"),
-				"#"					: (faz_nada, "P10"),
-				"@"					: (faz_nada, "P10"),
-				"&"					: (faz_nada, "P10"),
-				";"					: (faz_nada, "P10"),
-				"/"					: (faz_nada, "P10"),
-				"="					: (faz_nada, "P10"),
-				"'"					: (faz_nada, "P10"),
-				">"					: (faz_nada, "P10"),
-				"<"					: (faz_nada, "P10"),
-				"instrucao"			: (faz_nada, "P10"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P11":{
-				"instrucao"			: (instrucao, "P12"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P12":{
-				"/"					: (num_hex, "P4"),
-				"="					: (num_dec, "P5"),
-				"@"					: (num_oct, "P6"),
-				"#"					: (num_bin, "P7"),
-				"'"					: (num_asc, "P8"),
-				"n-terminal"		: (faz_nada, "P14"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P13":{
-				"n-terminal"		: (faz_nada, "P14"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"P14":{
-				";"					: (faz_nada, "P10"),
-				"controle"			: (faz_nada, "P0"),
-				"else"				: (faz_nada, "PANICO")
-			},
-			"PANICO":{
-				"controle"			: (faz_nada, "P0"),
-				"else"				: (faz_nada, "PANICO")
-			}
-}
-
-#Máquina de estados que faz a análise siintática do código
-def sintatico_generico(evento, busca, extra_params):
-	global transicoes_sintatico
-	global linha
-	global pilha_retorno
-	global erro_sintatico
-	global is_panico
-	chave_base, atual=extra_params
-	if VERBOSIDADE>2:
-		print(f"No estado {atual}, recebi {evento}, que foi buscado como {busca}, e a pilha está assim: {pilha_retorno}")
-	try:
-		rotina, proximo=transicoes_sintatico[atual][busca]
-	except:
-		rotina=None
-		operacao, param=transicoes_sintatico[atual]["else"]
-	if rotina==None:
-		estado_novo=operacao(evento, param)
-		if param=="PANICO":
-			if not is_panico:
-				if VERBOSIDADE>2:
-					print("Encontrado um erro, indo para o estado de pânico.")
-				print(f"{VERMELHO}Erro na linha {linha}. {evento}, que é um(a) {busca}, não corresponde ao esperado.{BRANCO}")
-				erro_sintatico=True
-			is_panico=True
-			return (chave_base+1, "PANICO")
-		return sintatico_generico(evento, busca, (chave_base, estado_novo))
-	else:
-		estado = rotina(evento, proximo)
-		return (chave_base+1, estado)
-
-def sintatico_terminal(evento, extra_params):
-	return sintatico_generico(evento, "terminal", extra_params)
-
-def sintatico_nterminal(evento, extra_params):
-	return sintatico_generico(evento, "n-terminal", extra_params)
-
-def sintatico_reservada(evento, extra_params):
-	return sintatico_generico(evento, evento, extra_params)
-
-def sintatico_instrucao(evento, extra_params):
-	return sintatico_generico(evento, "instrucao", extra_params)
-
-def sintatico_controle(evento, extra_params):
-	global linha, is_panico
-	linha+=1
-	is_panico=False
-	return sintatico_generico(evento, "controle", extra_params)
+#Palavras mal formadas, a montagem para antes da análise sintática
+def recategoriza_erro(evento, extra_params):
+	chave_base, reservada, indice=extra_params
+	return (Evento(chave_base, "erro", evento),
+			(chave_base+1, "", None))
 
-def sintatico_eof(evento, extra_params):
-	chave_base, atual=extra_params
-	return (chave_base+1, None, atual)
+rotinas_recategoriza={"identificador": recategoriza_identificador, 
+					   "especial": recategoriza_especial,
+					   "numero": recategoriza_numero,
+					   "controle": recategoriza_controle,
+					   "eof": recategoriza_eof,
+					   "erro": recategoriza_erro}
+
+#Gera os tokens das palavras dadas
+def recategoriza(palavras):
+	estado=(0, "", None)
+	for palavra in palavras:
+		token, estado=rotinas_recategoriza[palavra.tipo](palavra.parametros, estado)
+		yield token
+
+#Escreve o contexto como um comentário do .lst
+def desempilha_contexto(contexto):
+	saida=f";"
+	while contexto:
+		saida+=f" {contexto.pop(0)}"
+	return saida
 
-sintatico=MotorDeEventos(palavra[0], {"terminal":sintatico_terminal,
-									  "n-terminal":sintatico_nterminal,
-									  "reservada":sintatico_reservada,
-									  "instrucao":sintatico_instrucao,
-									  "controle":sintatico_controle,
-									  "eof":sintatico_eof})
+'''
+Resultado de uma montagem: as linhas do código .mvn e o texto do
+.lst (None se o código não chegou a ser gerado), a tabela de símbolos,
+com o (endereço, relocável) de cada rótulo, os externals, as mensagens
+escritas durante a montagem e se nenhum erro foi encontrado
+'''
+class AssemblyResult:
+	def __init__(self, mvn, lst, symbols, externals, messages, ok):
+		self.mvn=mvn
+		self.lst=lst
+		self.symbols=symbols
+		self.externals=externals
+		self.messages=messages
+		self.ok=ok
+
+'''
+Montador de um código, com o estado de cada análise guardado no objeto
+em vez de em variáveis globais, para que várias montagens possam ser
+feitas no mesmo processo
+'''
+class Montador:
+	def __init__(self, base=0, relocavel=True, verbosidade=0, semantico=3, sintatico=True, tokens=False, saida=None):
+		self.endereco_base=base
+		self.relocavel_base=relocavel
+		self.verbosidade=verbosidade
+		self.nivel_semantico=semantico
+		self.faz_sintatico=sintatico
+		self.mostra_tokens=tokens
+		self.saida=saida
+		self.mensagens=[]
+		self.linha=1
+		self.erro_lexico=False
+		self.eh_coment=False
+		self.pilha_retorno=[]
+		self.erro_sintatico=False
+		self.is_panico=False
+		self.endereco=base
+		self.relocavel=relocavel
+		self.rotulos={}
+		self.externals=[]
+		self.erro_vars=False
+		self.contexternal=0
+		self.codigo_mvn=""
+		self.codigo_lst=""
+		self.gerado=False
+
+	#Guarda uma mensagem da montagem e a passa para saida, se houver
+	def escreve(self, mensagem):
+		self.mensagens.append(mensagem)
+		if self.saida!=None:
+			self.saida(mensagem)
+
+	#Devolve o resultado da montagem até aqui
+	def resultado(self):
+		return AssemblyResult(self.codigo_mvn.splitlines() if self.gerado else None,
+							  self.codigo_lst if self.gerado else None,
+							  self.rotulos, self.externals, self.mensagens,
+							  not (self.erro_lexico or self.erro_sintatico or self.erro_vars))
+
+	#Monta o código dado, passando por cada análise até onde foi pedido
+	def monta(self, codigo):
+		if self.verbosidade>1:
+			self.escreve("Iniciando análise léxica\n-----------------------------")
+
+		#Liga os tokens do código em uma lista, a fila da análise sintática
+		tokens=recategoriza(self.analisa_lexico(le_linhas(codigo)))
+		primeiro_token=next(tokens)
+		ultimo_token=primeiro_token
+		for token in tokens:
+			ultimo_token.proximo=token
+			ultimo_token=token
+
+		if self.erro_lexico:
+			self.escreve(f"{VERMELHO}O código está lexicamente errado.{BRANCO}")
+			return self.resultado()
+
+		self.linha=1
+		sintatico=MotorDeEventos(primeiro_token, {"terminal":self.sintatico_terminal,
+												  "n-terminal":self.sintatico_nterminal,
+												  "reservada":self.sintatico_reservada,
+												  "instrucao":self.sintatico_instrucao,
+												  "controle":self.sintatico_controle,
+												  "eof":self.sintatico_eof})
+
+		if self.mostra_tokens:
+			c=sintatico.fila_de_eventos
+			while c.proximo!=None:
+				self.escreve(str(c.parametros)+"->"+c.tipo+", "+str(c.chave_ordenacao))
+				c=c.proximo
+			self.escreve(str(c.parametros)+"->"+c.tipo+", "+str(c.chave_ordenacao))
+
+		if not self.faz_sintatico:
+			return self.resultado()
+
+		if self.verbosidade>1:
+			self.escreve("\nIniciando análise sintática\n-----------------------------")
+
+		backup=sintatico.fila_de_eventos
+
+		palavra=sintatico.roda_um_evento((0, ESTADO_INICIAL))
+
+		while sintatico.fila_de_eventos!=None:
+			palavra=sintatico.roda_um_evento(palavra)
+
+		if self.erro_sintatico:
+			return self.resultado()
+
+		if self.verbosidade>0:
+			self.escreve(f"{VERDE}O código está sintaticamente correto.{BRANCO}")
+
+		self.linha=1
+
+		if self.nivel_semantico<1:
+			return self.resultado()
+
+		if self.verbosidade>1:
+			self.escreve("\nIniciando análise semântica 1\n-----------------------------")
+
+		rotinas={"terminal":self.semantico_terminal,
+				 "n-terminal":self.semantico_nterminal,
+				 "reservada":self.semantico_reservada,
+				 "instrucao":self.semantico_instrucao,
+				 "controle":self.semantico_controle,
+				 "eof":self.semantico_eof}
+
+		#Máquina de estados que coleta as variáveis, vetores, rótulos e externals
+		self.transicoes_semantico=self.transicoes_semantico_1
+		semantico_1=MotorDeEventos(backup, rotinas)
+
+		palavra=semantico_1.roda_um_evento((0, ESTADO_INICIAL, []))
+		while semantico_1.fila_de_eventos!=None:
+			palavra=semantico_1.roda_um_evento(palavra)
+
+		self.linha=1
+
+		#Máquina de estados que confere se as chamadas às variáveis, vetores e rótulos está condizente
+		self.transicoes_semantico=self.transicoes_semantico_2
+		semantico_2=MotorDeEventos(backup, rotinas)
+
+		palavra=semantico_2.roda_um_evento((0, ESTADO_INICIAL, []))
+
+		if self.nivel_semantico<2:
+			return self.resultado()
+
+		if self.verbosidade>1:
+			self.escreve("\nIniciando análise semântica 2\n-----------------------------")
+
+		while semantico_2.fila_de_eventos!=None:
+			palavra=semantico_2.roda_um_evento(palavra)
+
+		if self.erro_vars:
+			if self.verbosidade>-1:
+				self.escreve(f"{VERMELHO}Compilação foi interrompida devido aos erros apresentados.{BRANCO}")
+			return self.resultado()
+
+		if self.verbosidade>0:
+			self.escreve(f"{VERDE}As variáveis foram geradas corretamente.{BRANCO}")
+
+		self.linha=0
+		self.endereco=self.endereco_base
+		self.contexternal=0
+		self.relocavel=self.relocavel_base
+
+		#Máquina de estado que gera todo o código compilado
+		self.transicoes_semantico=self.transicoes_semantico_3
+		semantico_3=MotorDeEventos(backup, rotinas)
+
+		palavra=semantico_3.roda_um_evento((0, ESTADO_INICIAL, []))
+
+		if self.nivel_semantico<3:
+			return self.resultado()
 
-while recategrorizador_lexico.fila_de_eventos!=None:
-	palavra=recategrorizador_lexico.roda_um_evento(palavra[1])
-	while palavra[0]==None:
-		palavra=recategrorizador_lexico.roda_um_evento(palavra[1])
-	sintatico.insere_na_fila(palavra[0])
+		if self.verbosidade>1:
+			self.escreve("\nIniciando análise semântica 3\n-----------------------------")
+
+		while semantico_3.fila_de_eventos!=None:
+			palavra=semantico_3.roda_um_evento(palavra)
+
+		if self.verbosidade>0:
+			self.escreve(f"{VERDE}O código final foi gerado.{BRANCO}")
 
-if TOKENS:
-	c=sintatico.fila_de_eventos
-	while c.proximo!=None:
-		print(str(c.parametros)+"->"+c.tipo+", "+str(c.chave_ordenacao))
-		c=c.proximo
-	print(str(c.parametros)+"->"+c.tipo+", "+str(c.chave_ordenacao))
+		self.gerado=True
+		return self.resultado()
 
-if not SINTATICO:
-	sys.exit()
+	#Motor para agrupar caracter em palavras
+	def categoriza_lexico_letra(self, evento, extra_params):
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		if tipo=="":
+			return (None,(chave_base, evento, "identificador", dentro_de_aspas))
+		elif tipo=="identificador":
+			return (None,(chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
+		elif tipo=="numero":
+			if evento in LETRAS_HEXA:
+				return (None,(chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
+			if not self.eh_coment:
+				if self.verbosidade>-1:
+					self.escreve(f"{VERMELHO}Palavra mal formada na linha {self.linha}.")
+				self.erro_lexico=True
+				return (None,(chave_base, palavra_acumulada+evento, "erro", dentro_de_aspas))
+			return (None,(chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
+		elif tipo=="especial":
+			if palavra_acumulada[0]=='"':
+				return (None,(chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
+			return (Evento(chave_base, "especial", palavra_acumulada), 
+						  (chave_base+1, evento, "identificador", dentro_de_aspas))
+		elif tipo=="erro":
+			return (None,(chave_base, palavra_acumulada+evento, "erro", dentro_de_aspas))
 
-if VERBOSIDADE>1:
-	print("\nIniciando análise sintática\n-----------------------------")
+	def categoriza_lexico_digito(self, evento, extra_params):
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		if tipo=="":
+			return(None, (chave_base, evento, "numero", dentro_de_aspas))
+		elif tipo=="identificador":
+			check_hex=True
+			for letra in palavra_acumulada:
+				if letra not in LETRAS_HEXA: check_hex=False
+			if check_hex:
+				return(None, (chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
+			else:
+				return(None, (chave_base, palavra_acumulada+evento, "identificador", dentro_de_aspas))
+		elif tipo=="numero":
+			return(None, (chave_base, palavra_acumulada+evento, "numero", dentro_de_aspas))
+		elif tipo=="erro":
+			return(None, (chave_base, palavra_acumulada+evento, "erro", dentro_de_aspas))
+		elif tipo=="especial":
+			if palavra_acumulada[0]=='"':
+				return (None,(chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
+			return (Evento(chave_base, "especial", palavra_acumulada), 
+						  (chave_base+1, evento, "numero", dentro_de_aspas))
+
+	def categoriza_lexico_especial(self, evento, extra_params):
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		if evento=='"': dentro_de_aspas=not dentro_de_aspas
+		elif evento==";": self.eh_coment=True
+		if tipo=="":
+			if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
+				return (Evento(chave_base, "especial", evento), 
+						  (chave_base+1, "", "", dentro_de_aspas))
+			return (None, (chave_base, evento, "especial", dentro_de_aspas))
+		elif tipo in ["identificador", "erro"]:
+			if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
+				identifi=Evento(chave_base, tipo, palavra_acumulada)
+				operador=Evento(chave_base+1, "especial", evento)
+				identifi.proximo=operador
+				return (identifi, 
+						  (chave_base+2, "", "", dentro_de_aspas))
+			return (None, (chave_base, palavra_acumulada+evento, tipo, dentro_de_aspas))
+		elif tipo=="numero":
+			return (Evento(chave_base, "numero", palavra_acumulada), 
+						  (chave_base+1, evento, "especial", dentro_de_aspas))
+		elif tipo=="especial":
+			if (evento in OPERADORES or evento in RESERVADAS) and not dentro_de_aspas:
+				especial=Evento(chave_base, "especial", palavra_acumulada)
+				operador=Evento(chave_base+1, "especial", evento)
+				especial.proximo=operador
+				return (especial, 
+						  (chave_base+2, "", "", dentro_de_aspas))
+			return (None, (chave_base, palavra_acumulada+evento, "especial", dentro_de_aspas))
+
+	def categoriza_lexico_delimitador(self, evento, extra_params):
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		if tipo=="":
+			return (None, (chave_base, "", "", dentro_de_aspas))
+		else:
+			return (Evento(chave_base, tipo, palavra_acumulada), 
+						  (chave_base+1, "", "", dentro_de_aspas))
+
+	def categoriza_lexico_controle(self, evento, extra_params):
+		self.linha+=1
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		if tipo=="":
+			return (Evento(chave_base, "controle", evento), 
+						  (chave_base+1, "", "", dentro_de_aspas))
+		else:
+			ult_evento=Evento(chave_base, tipo, palavra_acumulada)
+			ult_evento.proximo=Evento(chave_base+1, "controle", evento)
+			return (ult_evento,
+				   (chave_base+2, "", "", dentro_de_aspas))
+
+	def categoriza_lexico_eof(self, evento, extra_params):
+		chave_base, palavra_acumulada, tipo, dentro_de_aspas=extra_params
+		return (Evento(chave_base, "eof", EOF), (chave_base+1, "", "", dentro_de_aspas))
+
+	#Gera as palavras das linhas dadas, passando uma única vez por seus caracteres
+	def analisa_lexico(self, linhas):
+		rotinas={"letra": self.categoriza_lexico_letra,
+				 "digito": self.categoriza_lexico_digito,
+				 "especial": self.categoriza_lexico_especial,
+				 "delimitador": self.categoriza_lexico_delimitador,
+				 "controle": self.categoriza_lexico_controle}
+		estado=(0, "", "", False)
+		for linha_codigo in linhas:
+			for caractere in linha_codigo:
+				palavra, estado=rotinas[categoriza_caractere(caractere)](caractere, estado)
+				while palavra!=None:
+					seguinte=palavra.proximo
+					palavra.proximo=None
+					yield palavra
+					palavra=seguinte
+		palavra, estado=self.categoriza_lexico_eof(EOF, estado)
+		yield palavra
+
+	#Retorno das rotinas (estado, contador, transicao)
+	def fim_codigo(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Terminando o programa")
+		return estado
+
+	def base(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado endereço base")
+		return estado
+
+	def rotulo(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado novo rotulo")
+		return estado
+
+	def entry_point(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um entry point")
+		return estado
+
+	def external(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um external")
+		return estado
+
+	def instrucao(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrada uma instrução")
+		return estado
+
+	def num_hex(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um número hexadecimal")
+		return estado
+
+	def num_dec(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um número decimal")
+		return estado
+
+	def num_oct(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um número octal")
+		return estado
+
+	def num_bin(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um número binário")
+		return estado
+
+	def num_asc(self, simbolo, estado): 
+		if self.verbosidade>1:
+			self.escreve("Encontrado um número ASCII")
+		return estado
+
+	def faz_nada(self, simbolo, estado):
+		return estado
+
+	def checa_hex(self, simbolo, estado):
+		try:
+			int(simbolo, 16)
+		except:
+			self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {simbolo} não é hexadecimal.{BRANCO}")
+			self.erro_sintatico=True
+		return estado
+
+	def checa_dec(self, simbolo, estado):
+		try:
+			int(simbolo, 10)
+		except:
+			self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {simbolo} não é decimal.{BRANCO}")
+			self.erro_sintatico=True
+		return estado
+
+	def checa_oct(self, simbolo, estado):
+		try:
+			int(simbolo, 8)
+		except:
+			self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {simbolo} não é octal.{BRANCO}")
+			self.erro_sintatico=True
+		return estado
+
+	def checa_bin(self, simbolo, estado):
+		try:
+			int(simbolo, 2)
+		except:
+			self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {simbolo} não é binário.{BRANCO}")
+			self.erro_sintatico=True
+		return estado
+
+	def checa_asc(self, simbolo, estado):
+		if len(simbolo)>2:
+			self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {simbolo} tem mais que dois dígitos.{BRANCO}")
+			self.erro_sintatico=True
+		return estado
+
+	transicoes_sintatico={
+				"P0":{
+					"controle"			: (faz_nada, "P0"),
+					"#"					: (fim_codigo, "P2"),
+					"@"					: (base, "P3"),
+					"&"					: (base, "P3"),
+					"n-terminal"		: (rotulo, "P11"),
+					">"					: (entry_point, "P13"),
+					"<"					: (external, "P13"),
+					";"					: (faz_nada, "P10"),
+					"instrucao"			: (instrucao, "P12"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P1":{
+					"controle"			: (faz_nada, "P1"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P2":{
+					"n-terminal"		: (faz_nada, "P1"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P3":{
+					"/"					: (num_hex, "P4"),
+					"="					: (num_dec, "P5"),
+					"@"					: (num_oct, "P6"),
+					"#"					: (num_bin, "P7"),
+					"'"					: (num_asc, "P8"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P4":{
+					"terminal"			: (checa_hex, "P9"),
+					"n-terminal"		: (checa_hex, "P9"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P5":{
+					"terminal"			: (checa_dec, "P9"),
+					"n-terminal"		: (checa_dec, "P9"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P6":{
+					"terminal"			: (checa_oct, "P9"),
+					"n-terminal"		: (checa_oct, "P9"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P7":{
+					"terminal"			: (checa_bin, "P9"),
+					"n-terminal"		: (checa_bin, "P9"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P8":{
+					"n-terminal"		: (checa_asc, "P9"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P9":{
+					";"					: (faz_nada, "P10"),
+					"controle"			: (faz_nada, "P0"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P10":{
+					"controle"			: (faz_nada, "P0"),
+					"terminal"			: (faz_nada, "P10"),
+					"n-terminal"		: (faz_nada, "P10"),
+					"#"					: (faz_nada, "P10"),
+					"@"					: (faz_nada, "P10"),
+					"&"					: (faz_nada, "P10"),
+					";"					: (faz_nada, "P10"),
+					"/"					: (faz_nada, "P10"),
+					"="					: (faz_nada, "P10"),
+					"'"					: (faz_nada, "P10"),
+					">"					: (faz_nada, "P10"),
+					"<"					: (faz_nada, "P10"),
+					"instrucao"			: (faz_nada, "P10"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P11":{
+					"instrucao"			: (instrucao, "P12"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P12":{
+					"/"					: (num_hex, "P4"),
+					"="					: (num_dec, "P5"),
+					"@"					: (num_oct, "P6"),
+					"#"					: (num_bin, "P7"),
+					"'"					: (num_asc, "P8"),
+					"n-terminal"		: (faz_nada, "P14"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P13":{
+					"n-terminal"		: (faz_nada, "P14"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"P14":{
+					";"					: (faz_nada, "P10"),
+					"controle"			: (faz_nada, "P0"),
+					"else"				: (faz_nada, "PANICO")
+				},
+				"PANICO":{
+					"controle"			: (faz_nada, "P0"),
+					"else"				: (faz_nada, "PANICO")
+				}
+	}
+
+	#Máquina de estados que faz a análise siintática do código
+	def sintatico_generico(self, evento, busca, extra_params):
+		chave_base, atual=extra_params
+		if self.verbosidade>2:
+			self.escreve(f"No estado {atual}, recebi {evento}, que foi buscado como {busca}, e a pilha está assim: {self.pilha_retorno}")
+		try:
+			rotina, proximo=self.transicoes_sintatico[atual][busca]
+		except:
+			rotina=None
+			operacao, param=self.transicoes_sintatico[atual]["else"]
+		if rotina==None:
+			estado_novo=operacao(self, evento, param)
+			if param=="PANICO":
+				if not self.is_panico:
+					if self.verbosidade>2:
+						self.escreve("Encontrado um erro, indo para o estado de pânico.")
+					self.escreve(f"{VERMELHO}Erro na linha {self.linha}. {evento}, que é um(a) {busca}, não corresponde ao esperado.{BRANCO}")
+					self.erro_sintatico=True
+				self.is_panico=True
+				return (chave_base+1, "PANICO")
+			return self.sintatico_generico(evento, busca, (chave_base, estado_novo))
+		else:
+			estado = rotina(self, evento, proximo)
+			return (chave_base+1, estado)
 
-backup=sintatico.fila_de_eventos
+	def sintatico_terminal(self, evento, extra_params):
+		return self.sintatico_generico(evento, "terminal", extra_params)
 
-palavra=sintatico.roda_um_evento((0, ESTADO_INICIAL))
+	def sintatico_nterminal(self, evento, extra_params):
+		return self.sintatico_generico(evento, "n-terminal", extra_params)
 
-while sintatico.fila_de_eventos!=None:
-	palavra=sintatico.roda_um_evento(palavra)
+	def sintatico_reservada(self, evento, extra_params):
+		return self.sintatico_generico(evento, evento, extra_params)
 
-chave_base, atual, estado=palavra
-if erro_sintatico:
-	sys.exit()
+	def sintatico_instrucao(self, evento, extra_params):
+		return self.sintatico_generico(evento, "instrucao", extra_params)
 
-if VERBOSIDADE>0:
-	print(f"{VERDE}O código está sintaticamente correto.{BRANCO}")
+	def sintatico_controle(self, evento, extra_params):
+		self.linha+=1
+		self.is_panico=False
+		return self.sintatico_generico(evento, "controle", extra_params)
 
-linha=1
-endereco=BASE
-relocavel=ABSOLUTO
-rotulos={}
-externals=[]
-erro_vars=False
-codigo_para_base={"/":16, "=":10, "@":8, "#":2}
+	def sintatico_eof(self, evento, extra_params):
+		chave_base, atual=extra_params
+		return (chave_base+1, None, atual)
 
-def faz_nada(simbolo, estado, contexto):
-	return estado, contexto
+	def ignora(self, simbolo, estado, contexto):
+		return estado, contexto
 
-def adiciona_external(simbolo, estado, contexto):
-	global externals, erro_vars
-	if contexto.pop(-1)=="<":
-		if simbolo in rotulos:
-			erro_vars=True
-			if VERBOSIDADE>-1:
-				print(f"{VERMELHO}Erro na linha {linha}. Já existe rotulo com nome {simbolo}.{BRANCO}")
+	def adiciona_external(self, simbolo, estado, contexto):
+		if contexto.pop(-1)=="<":
+			if simbolo in self.rotulos:
+				self.erro_vars=True
+				if self.verbosidade>-1:
+					self.escreve(f"{VERMELHO}Erro na linha {self.linha}. Já existe rotulo com nome {simbolo}.{BRANCO}")
+			else:
+				self.externals.append(simbolo)
+		return estado, contexto
+
+	def adiciona_rotulo(self, simbolo, estado, contexto):
+		if simbolo in set.union(set(self.externals), set(self.rotulos.keys())):
+			if simbolo in self.externals:
+				self.erro_vars=True
+				if self.verbosidade>-1:
+					self.escreve(f"{VERMELHO}Erro na linha {self.linha}. Já existe external com nome {simbolo}.{BRANCO}")
+			elif simbolo in self.rotulos:
+				if self.verbosidade>-1:
+					self.escreve(f"{AMARELO}Aviso na linha {self.linha}. Já existe rótulo com nome {simbolo}, tem certeza que deseja sobreescrever?{BRANCO}")
 		else:
-			externals.append(simbolo)
-	return estado, contexto
-
-def adiciona_rotulo(simbolo, estado, contexto):
-	global rotulos, linha, externals, erro_vars, endereco, relocavel
-	if simbolo in set.union(set(externals), set(rotulos.keys())):
-		if simbolo in externals:
-			erro_vars=True
-			if VERBOSIDADE>-1:
-				print(f"{VERMELHO}Erro na linha {linha}. Já existe external com nome {simbolo}.{BRANCO}")
-		elif simbolo in rotulos:
-			if VERBOSIDADE>-1:
-				print(f"{AMARELO}Aviso na linha {linha}. Já existe rótulo com nome {simbolo}, tem certeza que deseja sobreescrever?{BRANCO}")
-	else:
-		rotulos[simbolo]=(endereco, relocavel)
-	return estado, contexto
-
-def define_endereco(simbolo, estado, contexto):
-	global endereco, relocavel
-	if contexto:
-		tipo_int=contexto.pop(-1)
-		instrucao=contexto.pop(-1)
-		if instrucao=="$":
-			if tipo_int=="'":
-				endereco+=2*ord(simbolo[0])*0x100+ord(simbolo[1])-2
+			self.rotulos[simbolo]=(self.endereco, self.relocavel)
+		return estado, contexto
+
+	def define_endereco(self, simbolo, estado, contexto):
+		if contexto:
+			tipo_int=contexto.pop(-1)
+			instrucao=contexto.pop(-1)
+			if instrucao=="$":
+				if tipo_int=="'":
+					self.endereco+=2*ord(simbolo[0])*0x100+ord(simbolo[1])-2
+				else:
+					self.endereco+=2*int(simbolo, codigo_para_base[tipo_int])-2
+			elif instrucao in ["@", "&"]:
+				self.relocavel=instrucao=="&"
+				if tipo_int=="'":
+					self.endereco=ord(simbolo[0])*0x100+ord(simbolo[1])-2
+				else:
+					self.endereco=int(simbolo, codigo_para_base[tipo_int])-2
+		return estado, contexto
+
+	def atualiza_endereco(self, simbolo, estado, contexto):
+		self.endereco+=2
+		return estado, contexto
+
+	def adiciona_id(self, simbolo, estado, contexto):
+		contexto.append(simbolo)
+		return estado, contexto
+
+	transicoes_semantico_1={
+				"P0":{
+					"controle"			: (ignora, "P0"),
+					"#"					: (ignora, "P2"),
+					"@"					: (adiciona_id, "P3"),
+					"&"					: (adiciona_id, "P3"),
+					"n-terminal"		: (adiciona_rotulo, "P11"),
+					">"					: (adiciona_id, "P13"),
+					"<"					: (adiciona_id, "P13"),
+					";"					: (ignora, "P10"),
+					"instrucao"			: (adiciona_id, "P12")
+				},
+				"P1":{
+					"controle"			: (ignora, "P1")
+				},
+				"P2":{
+					"n-terminal"		: (ignora, "P1")
+				},
+				"P3":{
+					"/"					: (adiciona_id, "P4"),
+					"="					: (adiciona_id, "P5"),
+					"@"					: (adiciona_id, "P6"),
+					"#"					: (adiciona_id, "P7"),
+					"'"					: (adiciona_id, "P8")
+				},
+				"P4":{
+					"terminal"			: (define_endereco, "P9"),
+					"n-terminal"		: (define_endereco, "P9")
+				},
+				"P5":{
+					"terminal"			: (define_endereco, "P9"),
+					"n-terminal"		: (define_endereco, "P9")
+				},
+				"P6":{
+					"terminal"			: (define_endereco, "P9"),
+					"n-terminal"		: (define_endereco, "P9")
+				},
+				"P7":{
+					"terminal"			: (define_endereco, "P9"),
+					"n-terminal"		: (define_endereco, "P9")
+				},
+				"P8":{
+					"n-terminal"		: (define_endereco, "P9")
+				},
+				"P9":{
+					";"					: (atualiza_endereco, "P10"),
+					"controle"			: (atualiza_endereco, "P0")
+				},
+				"P10":{
+					"controle"			: (ignora, "P0"),
+					"terminal"			: (ignora, "P10"),
+					"n-terminal"		: (ignora, "P10"),
+					"#"					: (ignora, "P10"),
+					"@"					: (ignora, "P10"),
+					"&"					: (ignora, "P10"),
+					";"					: (ignora, "P10"),
+					"/"					: (ignora, "P10"),
+					"="					: (ignora, "P10"),
+					"'"					: (ignora, "P10"),
+					">"					: (ignora, "P10"),
+					"<"					: (ignora, "P10"),
+					"instrucao"			: (ignora, "P10")
+				},
+				"P11":{
+					"instrucao"			: (adiciona_id, "P12")
+				},
+				"P12":{
+					"/"					: (adiciona_id, "P4"),
+					"="					: (adiciona_id, "P5"),
+					"@"					: (adiciona_id, "P6"),
+					"#"					: (adiciona_id, "P7"),
+					"'"					: (adiciona_id, "P8"),
+					"n-terminal"		: (ignora, "P14")
+				},
+				"P13":{
+					"n-terminal"		: (adiciona_external, "P14")
+				},
+				"P14":{
+					";"					: (atualiza_endereco, "P10"),
+					"controle"			: (atualiza_endereco, "P0")
+				}
+	}
+
+	#Máquina de estados das análises semânticas, com as transições de transicoes_semantico
+	def semantico_generico(self, evento, busca, extra_params):
+		chave_base, atual, contexto=extra_params
+		if self.verbosidade>2:
+			self.escreve(f"No estado {atual}, recebi {evento}, que foi buscado como {busca}, e a pilha está assim: {self.pilha_retorno}")
+		rotina, proximo=self.transicoes_semantico[atual][busca]
+		estado, contexto_novo = rotina(self, evento, proximo, contexto)
+		return (chave_base+1, estado, contexto_novo)
+
+	def semantico_terminal(self, evento, extra_params):
+		return self.semantico_generico(evento, "terminal", extra_params)
+
+	def semantico_nterminal(self, evento, extra_params):
+		return self.semantico_generico(evento, "n-terminal", extra_params)
+
+	def semantico_reservada(self, evento, extra_params):
+		return self.semantico_generico(evento, evento, extra_params)
+
+	def semantico_instrucao(self, evento, extra_params):
+		return self.semantico_generico(evento, "instrucao", extra_params)
+
+	def semantico_controle(self, evento, extra_params):
+		self.linha+=1
+		return self.semantico_generico(evento, "controle", extra_params)
+
+	def semantico_eof(self, evento, extra_params):
+		chave_base, atual, contexto=extra_params
+		return (chave_base+1, None, atual)
+
+	def confere_rotulo(self, simbolo, estado, contexto):
+		if simbolo not in set.union(set(self.externals), set(self.rotulos.keys())):
+			self.erro_vars=True
+			if self.verbosidade>-1:
+				self.escreve(f"{VERMELHO}Erro na linha {self.linha}. Rótulo {simbolo} não foi definido.{BRANCO}")
+		return estado, contexto
+
+	def tira_id(self, simbolo, estado, contexto):
+		contexto.pop(-1)
+		return estado, contexto
+
+	transicoes_semantico_2={
+				"P0":{
+					"controle"			: (ignora, "P0"),
+					"#"					: (ignora, "P2"),
+					"@"					: (ignora, "P3"),
+					"&"					: (ignora, "P3"),
+					"n-terminal"		: (ignora, "P11"),
+					">"					: (ignora, "P13"),
+					"<"					: (ignora, "P13"),
+					";"					: (ignora, "P10"),
+					"instrucao"			: (ignora, "P12")
+				},
+				"P1":{
+					"controle"			: (ignora, "P1")
+				},
+				"P2":{
+					"n-terminal"		: (ignora, "P1")
+				},
+				"P3":{
+					"/"					: (ignora, "P4"),
+					"="					: (ignora, "P5"),
+					"@"					: (ignora, "P6"),
+					"#"					: (ignora, "P7"),
+					"'"					: (ignora, "P8")
+				},
+				"P4":{
+					"terminal"			: (ignora, "P9"),
+					"n-terminal"		: (ignora, "P9")
+				},
+				"P5":{
+					"terminal"			: (ignora, "P9"),
+					"n-terminal"		: (ignora, "P9")
+				},
+				"P6":{
+					"terminal"			: (ignora, "P9"),
+					"n-terminal"		: (ignora, "P9")
+				},
+				"P7":{
+					"terminal"			: (ignora, "P9"),
+					"n-terminal"		: (ignora, "P9")
+				},
+				"P8":{
+					"n-terminal"		: (ignora, "P9"),
+					"n-terminal"		: (ignora, "P9")
+				},
+				"P9":{
+					";"					: (ignora, "P10"),
+					"controle"			: (ignora, "P0")
+				},
+				"P10":{
+					"controle"			: (ignora, "P0"),
+					"terminal"			: (ignora, "P10"),
+					"n-terminal"		: (ignora, "P10"),
+					"#"					: (ignora, "P10"),
+					"@"					: (ignora, "P10"),
+					"&"					: (ignora, "P10"),
+					";"					: (ignora, "P10"),
+					"/"					: (ignora, "P10"),
+					"="					: (ignora, "P10"),
+					"'"					: (ignora, "P10"),
+					">"					: (ignora, "P10"),
+					"<"					: (ignora, "P10"),
+					"instrucao"			: (ignora, "P10")
+				},
+				"P11":{
+					"instrucao"			: (ignora, "P12")
+				},
+				"P12":{
+					"/"					: (ignora, "P4"),
+					"="					: (ignora, "P5"),
+					"@"					: (ignora, "P6"),
+					"#"					: (ignora, "P7"),
+					"'"					: (ignora, "P8"),
+					"n-terminal"		: (confere_rotulo, "P14")
+				},
+				"P13":{
+					"n-terminal"		: (confere_rotulo, "P14")
+				},
+				"P14":{
+					";"					: (ignora, "P10"),
+					"controle"			: (ignora, "P0")
+				}
+	}
+
+	def escreve_lst_entrada(self, simbolo, estado, contexto):
+		self.codigo_lst+=desempilha_contexto(contexto+[simbolo])
+		return estado, []
+
+	def gera_valor(self, simbolo, estado, contexto):
+		tipo_int=contexto[-1]
+		contexto.append(simbolo)
+		if tipo_int=="'":
+			if len(simbolo)==1:
+				contexto.append(ord(simbolo[0]))
 			else:
-				endereco+=2*int(simbolo, codigo_para_base[tipo_int])-2
+				contexto.append(ord(simbolo[0])*0x100+ord(simbolo[1]))
+		else:
+			contexto.append(int(simbolo, codigo_para_base[tipo_int]))
+		return estado, contexto
+
+	def gera_codigo_de_valor(self, simbolo, estado, contexto):
+		valor=contexto.pop(-1)
+		instrucao=contexto[-3]
+		if instrucao in ["@", "&"]:
+			self.endereco=valor-2
+			self.relocavel=instrucao=="&"
+			self.codigo_lst+=desempilha_contexto(contexto+[simbolo])
+		elif instrucao=="$":
+			if valor==0 and self.verbosidade>-1:
+				self.escreve(f"{AMARELO}Você tem certeza de que sabe o que está fazendo? Na linha {self.linha} você criou um espaço de memória com tamanho 0...{BRANCO}")
+			preambulo=8*self.relocavel
+			for end in range(self.endereco, self.endereco+2*valor, 2):
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(end)[2:].zfill(3)} 0000"
+				self.codigo_mvn+=f"{linha_gerada}\n"
+				self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+			self.endereco+=2*valor-2
+		elif instrucao=="K":
+			linha_gerada=f"{hex(8*self.relocavel)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(valor)[2:].zfill(4)}"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+		else:
+			linha_gerada=f"{hex(8*self.relocavel)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(valor)[2:].zfill(3)}"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+		self.endereco+=2
+		return estado, []
+
+	def gera_codigo_de_rotulo(self, simbolo, estado, contexto):
+		rotulo=contexto[-1]
+		instrucao=contexto[-2]
+		if instrucao=="<":
+			linha_gerada=f"4{hex(self.contexternal)[2:].zfill(3)} 0000 ; '< {rotulo}'"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+			self.contexternal+=1
+			self.endereco-=2
+		elif instrucao==">":
+			linha_gerada=f"{hex(2*self.rotulos[rotulo][1])[2:]}{hex(self.rotulos[rotulo][0])[2:].zfill(3)} {hex(self.rotulos[rotulo][0])[2:].zfill(4)} ; '> {rotulo}'"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
 		elif instrucao in ["@", "&"]:
-			relocavel=instrucao=="&"
-			if tipo_int=="'":
-				endereco=ord(simbolo[0])*0x100+ord(simbolo[1])-2
+			self.endereco=rotulo-2
+			self.relocavel=instrucao=="&"
+			self.codigo_lst+=desempilha_contexto(contexto+[simbolo])
+		elif instrucao=="$":
+			if self.verbosidade>-1:
+				self.escreve(f"{AMARELO}Você tem certeza de que sabe o que está fazendo? Na linha {self.linha} você criou um espaço de memória com tamanho de um rótulo...{BRANCO}")
+			preambulo=8*self.relocavel+5*(rotulo in self.externals)+2*self.rotulos[rotulo][1]
+			for end in range(self.endereco, self.endereco+2*self.rotulos[rotulo][0], 2):
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(end)[2:].zfill(3)} 0000"
+				self.codigo_mvn+=f"{linha_gerada}\n"
+				self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+			self.endereco+=2*self.rotulos[rotulo][0]-2
+		elif instrucao=="K":
+			if rotulo in self.externals:
+				preambulo=8*self.relocavel+5
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(self.externals.index(rotulo))[2:].zfill(4)}"
 			else:
-				endereco=int(simbolo, codigo_para_base[tipo_int])-2
-	return estado, contexto
-
-def atualiza_endereco(simbolo, estado, contexto):
-	global endereco
-	endereco+=2
-	return estado, contexto
-
-def adiciona_id(simbolo, estado, contexto):
-	contexto.append(simbolo)
-	return estado, contexto
-
-transicoes_semantico_1={
-			"P0":{
-				"controle"			: (faz_nada, "P0"),
-				"#"					: (faz_nada, "P2"),
-				"@"					: (adiciona_id, "P3"),
-				"&"					: (adiciona_id, "P3"),
-				"n-terminal"		: (adiciona_rotulo, "P11"),
-				">"					: (adiciona_id, "P13"),
-				"<"					: (adiciona_id, "P13"),
-				";"					: (faz_nada, "P10"),
-				"instrucao"			: (adiciona_id, "P12")
-			},
-			"P1":{
-				"controle"			: (faz_nada, "P1")
-			},
-			"P2":{
-				"n-terminal"		: (faz_nada, "P1")
-			},
-			"P3":{
-				"/"					: (adiciona_id, "P4"),
-				"="					: (adiciona_id, "P5"),
-				"@"					: (adiciona_id, "P6"),
-				"#"					: (adiciona_id, "P7"),
-				"'"					: (adiciona_id, "P8")
-			},
-			"P4":{
-				"terminal"			: (define_endereco, "P9"),
-				"n-terminal"		: (define_endereco, "P9")
-			},
-			"P5":{
-				"terminal"			: (define_endereco, "P9"),
-				"n-terminal"		: (define_endereco, "P9")
-			},
-			"P6":{
-				"terminal"			: (define_endereco, "P9"),
-				"n-terminal"		: (define_endereco, "P9")
-			},
-			"P7":{
-				"terminal"			: (define_endereco, "P9"),
-				"n-terminal"		: (define_endereco, "P9")
-			},
-			"P8":{
-				"n-terminal"		: (define_endereco, "P9")
-			},
-			"P9":{
-				";"					: (atualiza_endereco, "P10"),
-				"controle"			: (atualiza_endereco, "P0")
-			},
-			"P10":{
-				"controle"			: (faz_nada, "P0"),
-				"terminal"			: (faz_nada, "P10"),
-				"n-terminal"		: (faz_nada, "P10"),
-				"#"					: (faz_nada, "P10"),
-				"@"					: (faz_nada, "P10"),
-				"&"					: (faz_nada, "P10"),
-				";"					: (faz_nada, "P10"),
-				"/"					: (faz_nada, "P10"),
-				"="					: (faz_nada, "P10"),
-				"'"					: (faz_nada, "P10"),
-				">"					: (faz_nada, "P10"),
-				"<"					: (faz_nada, "P10"),
-				"instrucao"			: (faz_nada, "P10")
-			},
-			"P11":{
-				"instrucao"			: (adiciona_id, "P12")
-			},
-			"P12":{
-				"/"					: (adiciona_id, "P4"),
-				"="					: (adiciona_id, "P5"),
-				"@"					: (adiciona_id, "P6"),
-				"#"					: (adiciona_id, "P7"),
-				"'"					: (adiciona_id, "P8"),
-				"n-terminal"		: (faz_nada, "P14")
-			},
-			"P13":{
-				"n-terminal"		: (adiciona_external, "P14")
-			},
-			"P14":{
-				";"					: (atualiza_endereco, "P10"),
-				"controle"			: (atualiza_endereco, "P0")
-			}
-}
-
-transicoes_semantico=transicoes_semantico_1
-
-#Máquina de estados que coleta as variáveis, vetores, rótulos e externals
-def semantico_generico(evento, busca, extra_params):
-	global transicoes_semantico
-	global linha
-	global pilha_retorno
-	chave_base, atual, contexto=extra_params
-	if VERBOSIDADE>2:
-		print(f"No estado {atual}, recebi {evento}, que foi buscado como {busca}, e a pilha está assim: {pilha_retorno}")
-	rotina, proximo=transicoes_semantico[atual][busca]
-	estado, contexto_novo = rotina(evento, proximo, contexto)
-	return (chave_base+1, estado, contexto_novo)
-
-def semantico_terminal(evento, extra_params):
-	return semantico_generico(evento, "terminal", extra_params)
-
-def semantico_nterminal(evento, extra_params):
-	return semantico_generico(evento, "n-terminal", extra_params)
-
-def semantico_reservada(evento, extra_params):
-	return semantico_generico(evento, evento, extra_params)
-
-def semantico_instrucao(evento, extra_params):
-	return semantico_generico(evento, "instrucao", extra_params)
-
-def semantico_controle(evento, extra_params):
-	global linha
-	linha+=1
-	return semantico_generico(evento, "controle", extra_params)
-
-def semantico_eof(evento, extra_params):
-	chave_base, atual, contexto=extra_params
-	return (chave_base+1, None, atual)
-
-if SEMANTICO<1:
-	sys.exit()
-
-if VERBOSIDADE>1:
-	print("\nIniciando análise semântica 1\n-----------------------------")
-
-semantico_1=MotorDeEventos(backup, {"terminal":semantico_terminal,
-								    "n-terminal":semantico_nterminal,
-								    "reservada":semantico_reservada,
-									"instrucao":semantico_instrucao,
-								    "controle":semantico_controle,
-								    "eof":semantico_eof})
-
-palavra=semantico_1.roda_um_evento((0, ESTADO_INICIAL, []))
-while semantico_1.fila_de_eventos!=None:
-	palavra=semantico_1.roda_um_evento(palavra)
-
-linha=1
-
-def confere_rotulo(simbolo, estado, contexto):
-	global rotulos, variaveis, vetores, externals, linha, erro_vars
-	if simbolo not in set.union(set(externals), set(rotulos.keys())):
-		erro_vars=True
-		if VERBOSIDADE>-1:
-			print(f"{VERMELHO}Erro na linha {linha}. Rótulo {simbolo} não foi definido.{BRANCO}")
-	return estado, contexto
-
-def tira_id(simbolo, estado, contexto):
-	contexto.pop(-1)
-	return estado, contexto
-
-transicoes_semantico_2={
-			"P0":{
-				"controle"			: (faz_nada, "P0"),
-				"#"					: (faz_nada, "P2"),
-				"@"					: (faz_nada, "P3"),
-				"&"					: (faz_nada, "P3"),
-				"n-terminal"		: (faz_nada, "P11"),
-				">"					: (faz_nada, "P13"),
-				"<"					: (faz_nada, "P13"),
-				";"					: (faz_nada, "P10"),
-				"instrucao"			: (faz_nada, "P12")
-			},
-			"P1":{
-				"controle"			: (faz_nada, "P1")
-			},
-			"P2":{
-				"n-terminal"		: (faz_nada, "P1")
-			},
-			"P3":{
-				"/"					: (faz_nada, "P4"),
-				"="					: (faz_nada, "P5"),
-				"@"					: (faz_nada, "P6"),
-				"#"					: (faz_nada, "P7"),
-				"'"					: (faz_nada, "P8")
-			},
-			"P4":{
-				"terminal"			: (faz_nada, "P9"),
-				"n-terminal"		: (faz_nada, "P9")
-			},
-			"P5":{
-				"terminal"			: (faz_nada, "P9"),
-				"n-terminal"		: (faz_nada, "P9")
-			},
-			"P6":{
-				"terminal"			: (faz_nada, "P9"),
-				"n-terminal"		: (faz_nada, "P9")
-			},
-			"P7":{
-				"terminal"			: (faz_nada, "P9"),
-				"n-terminal"		: (faz_nada, "P9")
-			},
-			"P8":{
-				"n-terminal"		: (faz_nada, "P9"),
-				"n-terminal"		: (faz_nada, "P9")
-			},
-			"P9":{
-				";"					: (faz_nada, "P10"),
-				"controle"			: (faz_nada, "P0")
-			},
-			"P10":{
-				"controle"			: (faz_nada, "P0"),
-				"terminal"			: (faz_nada, "P10"),
-				"n-terminal"		: (faz_nada, "P10"),
-				"#"					: (faz_nada, "P10"),
-				"@"					: (faz_nada, "P10"),
-				"&"					: (faz_nada, "P10"),
-				";"					: (faz_nada, "P10"),
-				"/"					: (faz_nada, "P10"),
-				"="					: (faz_nada, "P10"),
-				"'"					: (faz_nada, "P10"),
-				">"					: (faz_nada, "P10"),
-				"<"					: (faz_nada, "P10"),
-				"instrucao"			: (faz_nada, "P10")
-			},
-			"P11":{
-				"instrucao"			: (faz_nada, "P12")
-			},
-			"P12":{
-				"/"					: (faz_nada, "P4"),
-				"="					: (faz_nada, "P5"),
-				"@"					: (faz_nada, "P6"),
-				"#"					: (faz_nada, "P7"),
-				"'"					: (faz_nada, "P8"),
-				"n-terminal"		: (confere_rotulo, "P14")
-			},
-			"P13":{
-				"n-terminal"		: (confere_rotulo, "P14")
-			},
-			"P14":{
-				";"					: (faz_nada, "P10"),
-				"controle"			: (faz_nada, "P0")
-			}
-}
-
-transicoes_semantico=transicoes_semantico_2
-
-#Máquina de estados que confere se as chamadas às variáveis, vetores e rótulos está condizente
-semantico_2=MotorDeEventos(backup, {"terminal":semantico_terminal,
-								    "n-terminal":semantico_nterminal,
-								    "reservada":semantico_reservada,
-									"instrucao":semantico_instrucao,
-								    "controle":semantico_controle,
-								    "eof":semantico_eof})
-
-palavra=semantico_2.roda_um_evento((0, ESTADO_INICIAL, []))
-
-if SEMANTICO<2:
-	sys.exit()
-
-if VERBOSIDADE>1:
-	print("\nIniciando análise semântica 2\n-----------------------------")
-
-while semantico_2.fila_de_eventos!=None:
-	palavra=semantico_2.roda_um_evento(palavra)
-
-if erro_vars:
-	if VERBOSIDADE>-1:
-		print(f"{VERMELHO}Compilação foi interrompida devido aos erros apresentados.{BRANCO}")
-	sys.exit()
-
-if VERBOSIDADE>0:
-	print(f"{VERDE}As variáveis foram geradas corretamente.{BRANCO}")
-
-#Cria a string que conterá o código compilado e escreve seu preâmbulo
-codigo_mvn=""
-codigo_lst=""
-
-linha=0
-endereco=BASE
-contexternal=0
-relocavel=ABSOLUTO
-
-def escreve_lst_entrada(simbolo, estado, contexto):
-	global codigo_lst
-	codigo_lst+=desempilha_contexto(contexto+[simbolo])
-	return estado, []
-
-def gera_valor(simbolo, estado, contexto):
-	tipo_int=contexto[-1]
-	contexto.append(simbolo)
-	if tipo_int=="'":
-		if len(simbolo)==1:
-			contexto.append(ord(simbolo[0]))
+				preambulo=8*self.relocavel+2*self.rotulos[rotulo][1]
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(self.rotulos[rotulo][0])[2:].zfill(4)}"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
 		else:
-			contexto.append(ord(simbolo[0])*0x100+ord(simbolo[1]))
-	else:
-		contexto.append(int(simbolo, codigo_para_base[tipo_int]))
-	return estado, contexto
-
-def desempilha_contexto(contexto):
-	saida=f";"
-	while contexto:
-		saida+=f" {contexto.pop(0)}"
-	return saida
+			if rotulo in self.externals:
+				preambulo=8*self.relocavel+5
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(self.externals.index(rotulo))[2:].zfill(3)}"
+			else:
+				preambulo=8*self.relocavel+2*self.rotulos[rotulo][1]
+				linha_gerada=f"{hex(preambulo)[2:]}{hex(self.endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(self.rotulos[rotulo][0])[2:].zfill(3)}"
+			self.codigo_mvn+=f"{linha_gerada}\n"
+			self.codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
+		self.endereco+=2
+		return estado, []
+
+	transicoes_semantico_3={
+				"P0":{
+					"controle"			: (escreve_lst_entrada, "P0"),
+					"#"					: (adiciona_id, "P2"),
+					"@"					: (adiciona_id, "P3"),
+					"&"					: (adiciona_id, "P3"),
+					"n-terminal"		: (adiciona_id, "P11"),
+					">"					: (adiciona_id, "P13"),
+					"<"					: (adiciona_id, "P13"),
+					";"					: (escreve_lst_entrada, "P10"),
+					"instrucao"			: (adiciona_id, "P12")
+				},
+				"P1":{
+					"controle"			: (escreve_lst_entrada, "P1")
+				},
+				"P2":{
+					"n-terminal"		: (adiciona_id, "P1")
+				},
+				"P3":{
+					"/"					: (adiciona_id, "P4"),
+					"="					: (adiciona_id, "P5"),
+					"@"					: (adiciona_id, "P6"),
+					"#"					: (adiciona_id, "P7"),
+					"'"					: (adiciona_id, "P8")
+				},
+				"P4":{
+					"terminal"			: (gera_valor, "P9"),
+					"n-terminal"		: (gera_valor, "P9")
+				},
+				"P5":{
+					"terminal"			: (gera_valor, "P9"),
+					"n-terminal"		: (gera_valor, "P9")
+				},
+				"P6":{
+					"terminal"			: (gera_valor, "P9"),
+					"n-terminal"		: (gera_valor, "P9")
+				},
+				"P7":{
+					"terminal"			: (gera_valor, "P9"),
+					"n-terminal"		: (gera_valor, "P9")
+				},
+				"P8":{
+					"n-terminal"		: (gera_valor, "P9"),
+					"n-terminal"		: (gera_valor, "P9")
+				},
+				"P9":{
+					";"					: (gera_codigo_de_valor, "P10"),
+					"controle"			: (gera_codigo_de_valor, "P0")
+				},
+				"P10":{
+					"controle"			: (escreve_lst_entrada, "P0"),
+					"terminal"			: (escreve_lst_entrada, "P10"),
+					"n-terminal"		: (escreve_lst_entrada, "P10"),
+					"#"					: (escreve_lst_entrada, "P10"),
+					"@"					: (escreve_lst_entrada, "P10"),
+					"&"					: (escreve_lst_entrada, "P10"),
+					";"					: (escreve_lst_entrada, "P10"),
+					"/"					: (escreve_lst_entrada, "P10"),
+					"="					: (escreve_lst_entrada, "P10"),
+					"'"					: (escreve_lst_entrada, "P10"),
+					">"					: (escreve_lst_entrada, "P10"),
+					"<"					: (escreve_lst_entrada, "P10"),
+					"instrucao"			: (escreve_lst_entrada, "P10")
+				},
+				"P11":{
+					"instrucao"			: (adiciona_id, "P12")
+				},
+				"P12":{
+					"/"					: (adiciona_id, "P4"),
+					"="					: (adiciona_id, "P5"),
+					"@"					: (adiciona_id, "P6"),
+					"#"					: (adiciona_id, "P7"),
+					"'"					: (adiciona_id, "P8"),
+					"n-terminal"		: (adiciona_id, "P14")
+				},
+				"P13":{
+					"n-terminal"		: (adiciona_id, "P14")
+				},
+				"P14":{
+					";"					: (gera_codigo_de_rotulo, "P10"),
+					"controle"			: (gera_codigo_de_rotulo, "P0")
+				}
+	}
+
+'''Monta source, o texto de um código em ASM, sem processos nem estado
+global, e devolve um AssemblyResult. base e relocatable são o endereço
+base e se o código é relocável quando não são definidos no código; as
+outras opções são as mesmas da linha de comando e log, se dado, recebe
+cada mensagem ao ser escrita. Se cache, uma CacheDeMontagem, for dada,
+o resultado é buscado nela antes de montar o código e guardado nela
+depois'''
+def assemble(source, base=0, relocatable=True, verbosity=0, semantic=3, syntactic=True, tokens=False, log=None, cache=None):
+	if cache==None:
+		return Montador(base, relocatable, verbosity, semantic, syntactic, tokens, log).monta(source)
+	chave=cache.chave(source, (base, relocatable, verbosity, semantic, syntactic, tokens))
+	dados=cache.busca(chave)
+	if dados!=None:
+		resultado=AssemblyResult(dados["mvn"], dados["lst"], {rotulo: tuple(simbolo) for rotulo, simbolo in dados["symbols"].items()},
+								 dados["externals"], dados["messages"], dados["ok"])
+		if log!=None:
+			for mensagem in resultado.messages:
+				log(mensagem)
+		return resultado
+	resultado=Montador(base, relocatable, verbosity, semantic, syntactic, tokens, log).monta(source)
+	cache.guarda(chave, {"mvn": resultado.mvn,
+						 "lst": resultado.lst,
+						 "symbols": resultado.symbols,
+						 "externals": resultado.externals,
+						 "messages": resultado.messages,
+						 "ok": resultado.ok})
+	return resultado
+
+if __name__=="__main__":
+	#Hiperparâmetros
+
+	parser=argparse.ArgumentParser(description="Hiperparâmetros do interpretador de ghun")
+	parser.add_argument("input", 				action="store", type=str, 					help="Caminho para o arquivo a ser interpretado.")
+	parser.add_argument("-o", "--output",		action="store", type=str, 	required=False, help="Caminho para o arquivo a ser gerado. Default: igual ao arquivo de entrada.", default="")
+	parser.add_argument("-v", "--verbosidade",	action="store", type=int, 	required=False, help="Verboidade da interpretação. Quanto maior, mais informações são mostradas durante o reconhecimento e interpretação. Default: 0", default=0)
+	parser.add_argument("-t", "--tokens",	 	action="store_true",		required=False, help="Se ativo, mostra os tokens provenientes da análise léxica.", default=False)
+	parser.add_argument("-st", "--sintatico", 	action="store_false",		required=False, help="Se ativo, não executa a análise sintática, apenas a léxica.", default=True)
+	parser.add_argument("-sm", "--semantico", 	action="store", type=int,	required=False, help="Indica quanto da análise semantica deve ser feita. 0 para não fazer, 1 para analisar as definições de variáveis, 2 para analisar os usos de variáveis e 3 ou maior para realizar toda a geração de código. Default: 3", default=3)
+	parser.add_argument("-g", "--gerar",	 	action="store_false",		required=False, help="Se ativo, não executa a escrita do código no arquivo de saída.", default=True)
+	parser.add_argument("-b", "--base",		 	action="store", type=int,	required=False, help="Endereço base do código a ser gerado em hexadecimal, para o caso de não estar definido no código de entrada. Default: 0.", default=0)
+	parser.add_argument("-a", "--absoluto",	 	action="store_false",		required=False, help="Se ativo, o código gerado não será relocável, para caso não seja definido no código de entrada.", default=True)
+	parser.add_argument("-c", "--cache",	 	action="store", type=str,	required=False, help="Diretório da cache de montagens. Se dado, um código já montado com as mesmas opções não é montado de novo. Default: sem cache.", default=None)
+	parser.add_argument("-ct", "--cache_tamanho",	action="store", type=int,	required=False, help="Tamanho máximo da cache de montagens em MB, as montagens usadas há mais tempo são apagadas primeiro. Default: 64.", default=64)
+	args=parser.parse_args()
+
+	TOKENS=args.tokens
+	SINTATICO=args.sintatico
+	SEMANTICO=args.semantico
+	GERAR=args.gerar
+	VERBOSIDADE=args.verbosidade
+	CODIGO=args.input
+	CODIGO_OUT= CODIGO.split(".")[0] if args.output=="" else args.output
+	BASE=args.base
+	ABSOLUTO=args.absoluto
+	CACHE=CacheDeMontagem(args.cache, args.cache_tamanho*1024*1024) if args.cache!=None else None
 
-def gera_codigo_de_valor(simbolo, estado, contexto):
-	global codigo_mvn, codigo_lst, endereco, relocavel, OPERADORES
-	valor=contexto.pop(-1)
-	instrucao=contexto[-3]
-	if instrucao in ["@", "&"]:
-		endereco=valor-2
-		relocavel=instrucao=="&"
-		codigo_lst+=desempilha_contexto(contexto+[simbolo])
-	elif instrucao=="$":
-		if valor==0 and VERBOSIDADE>-1:
-			print(f"{AMARELO}Você tem certeza de que sabe o que está fazendo? Na linha {linha} você criou um espaço de memória com tamanho 0...{BRANCO}")
-		preambulo=8*relocavel
-		for end in range(endereco, endereco+2*valor, 2):
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(end)[2:].zfill(3)} 0000"
-			codigo_mvn+=f"{linha_gerada}\n"
-			codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-		endereco+=2*valor-2
-	elif instrucao=="K":
-		linha_gerada=f"{hex(8*relocavel)[2:]}{hex(endereco)[2:].zfill(3)} {hex(valor)[2:].zfill(4)}"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-	else:
-		linha_gerada=f"{hex(8*relocavel)[2:]}{hex(endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(valor)[2:].zfill(3)}"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-	endereco+=2
-	return estado, []
-
-def gera_codigo_de_rotulo(simbolo, estado, contexto):
-	global codigo_mvn, codigo_lst, endereco, relocavel, OPERADORES, rotulos, externals, contexternal, linha
-	rotulo=contexto[-1]
-	instrucao=contexto[-2]
-	if instrucao=="<":
-		linha_gerada=f"4{hex(contexternal)[2:].zfill(3)} 0000 ; '< {rotulo}'"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-		contexternal+=1
-		endereco-=2
-	elif instrucao==">":
-		linha_gerada=f"{hex(2*rotulos[rotulo][1])[2:]}{hex(rotulos[rotulo][0])[2:].zfill(3)} {hex(rotulos[rotulo][0])[2:].zfill(4)} ; '> {rotulo}'"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-	elif instrucao in ["@", "&"]:
-		endereco=rotulo-2
-		relocavel=instrucao=="&"
-		codigo_lst+=desempilha_contexto(contexto+[simbolo])
-	elif instrucao=="$":
+	try:
+		arquivo=open(CODIGO)
+	except:
 		if VERBOSIDADE>-1:
-			print(f"{AMARELO}Você tem certeza de que sabe o que está fazendo? Na linha {linha} você criou um espaço de memória com tamanho de um rótulo...{BRANCO}")
-		preambulo=8*relocavel+5*(rotulo in externals)+2*rotulos[rotulo][1]
-		for end in range(endereco, endereco+2*rotulos[rotulo][0], 2):
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(end)[2:].zfill(3)} 0000"
-			codigo_mvn+=f"{linha_gerada}\n"
-			codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-		endereco+=2*rotulos[rotulo][0]-2
-	elif instrucao=="K":
-		if rotulo in externals:
-			preambulo=8*relocavel+5
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(endereco)[2:].zfill(3)} {hex(externals.index(rotulo))[2:].zfill(4)}"
-		else:
-			preambulo=8*relocavel+2*rotulos[rotulo][1]
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(endereco)[2:].zfill(3)} {hex(rotulos[rotulo][0])[2:].zfill(4)}"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-	else:
-		if rotulo in externals:
-			preambulo=8*relocavel+5
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(externals.index(rotulo))[2:].zfill(3)}"
-		else:
-			preambulo=8*relocavel+2*rotulos[rotulo][1]
-			linha_gerada=f"{hex(preambulo)[2:]}{hex(endereco)[2:].zfill(3)} {hex(OPERADORES.index(instrucao))[2:]}{hex(rotulos[rotulo][0])[2:].zfill(3)}"
-		codigo_mvn+=f"{linha_gerada}\n"
-		codigo_lst+=linha_gerada+desempilha_contexto(contexto+[simbolo])
-	endereco+=2
-	return estado, []
-
-transicoes_semantico_3={
-			"P0":{
-				"controle"			: (escreve_lst_entrada, "P0"),
-				"#"					: (adiciona_id, "P2"),
-				"@"					: (adiciona_id, "P3"),
-				"&"					: (adiciona_id, "P3"),
-				"n-terminal"		: (adiciona_id, "P11"),
-				">"					: (adiciona_id, "P13"),
-				"<"					: (adiciona_id, "P13"),
-				";"					: (escreve_lst_entrada, "P10"),
-				"instrucao"			: (adiciona_id, "P12")
-			},
-			"P1":{
-				"controle"			: (escreve_lst_entrada, "P1")
-			},
-			"P2":{
-				"n-terminal"		: (adiciona_id, "P1")
-			},
-			"P3":{
-				"/"					: (adiciona_id, "P4"),
-				"="					: (adiciona_id, "P5"),
-				"@"					: (adiciona_id, "P6"),
-				"#"					: (adiciona_id, "P7"),
-				"'"					: (adiciona_id, "P8")
-			},
-			"P4":{
-				"terminal"			: (gera_valor, "P9"),
-				"n-terminal"		: (gera_valor, "P9")
-			},
-			"P5":{
-				"terminal"			: (gera_valor, "P9"),
-				"n-terminal"		: (gera_valor, "P9")
-			},
-			"P6":{
-				"terminal"			: (gera_valor, "P9"),
-				"n-terminal"		: (gera_valor, "P9")
-			},
-			"P7":{
-				"terminal"			: (gera_valor, "P9"),
-				"n-terminal"		: (gera_valor, "P9")
-			},
-			"P8":{
-				"n-terminal"		: (gera_valor, "P9"),
-				"n-terminal"		: (gera_valor, "P9")
-			},
-			"P9":{
-				";"					: (gera_codigo_de_valor, "P10"),
-				"controle"			: (gera_codigo_de_valor, "P0")
-			},
-			"P10":{
-				"controle"			: (escreve_lst_entrada, "P0"),
-				"terminal"			: (escreve_lst_entrada, "P10"),
-				"n-terminal"		: (escreve_lst_entrada, "P10"),
-				"#"					: (escreve_lst_entrada, "P10"),
-				"@"					: (escreve_lst_entrada, "P10"),
-				"&"					: (escreve_lst_entrada, "P10"),
-				";"					: (escreve_lst_entrada, "P10"),
-				"/"					: (escreve_lst_entrada, "P10"),
-				"="					: (escreve_lst_entrada, "P10"),
-				"'"					: (escreve_lst_entrada, "P10"),
-				">"					: (escreve_lst_entrada, "P10"),
-				"<"					: (escreve_lst_entrada, "P10"),
-				"instrucao"			: (escreve_lst_entrada, "P10")
-			},
-			"P11":{
-				"instrucao"			: (adiciona_id, "P12")
-			},
-			"P12":{
-				"/"					: (adiciona_id, "P4"),
-				"="					: (adiciona_id, "P5"),
-				"@"					: (adiciona_id, "P6"),
-				"#"					: (adiciona_id, "P7"),
-				"'"					: (adiciona_id, "P8"),
-				"n-terminal"		: (adiciona_id, "P14")
-			},
-			"P13":{
-				"n-terminal"		: (adiciona_id, "P14")
-			},
-			"P14":{
-				";"					: (gera_codigo_de_rotulo, "P10"),
-				"controle"			: (gera_codigo_de_rotulo, "P0")
-			}
-}
-
-transicoes_semantico=transicoes_semantico_3
-
-#Máquina de estado que gera todo o código compilado
-semantico_3=MotorDeEventos(backup, {"terminal":semantico_terminal,
-								    "n-terminal":semantico_nterminal,
-								    "reservada":semantico_reservada,
-								    "instrucao":semantico_instrucao,
-								    "controle":semantico_controle,
-								    "eof":semantico_eof})
-
-palavra=semantico_3.roda_um_evento((0, ESTADO_INICIAL, []))
-
-if SEMANTICO<3:
-	sys.exit()
-
-if VERBOSIDADE>1:
-	print("\nIniciando análise semântica 3\n-----------------------------")
-
-while semantico_3.fila_de_eventos!=None:
-	palavra=semantico_3.roda_um_evento(palavra)
-
-if VERBOSIDADE>0:
-	print(f"{VERDE}O código final foi gerado.{BRANCO}")
-
-if not GERAR:
-	sys.exit()
-
-arquivo_saida_mvn=open(CODIGO_OUT+".mvn", "w")
-arquivo_saida_mvn.write(codigo_mvn)
-arquivo_saida_mvn.close()
-
-arquivo_saida_lst=open(CODIGO_OUT+".lst", "w")
-arquivo_saida_lst.write(codigo_lst)
-arquivo_saida_lst.close()
-
-if VERBOSIDADE>0:
-	print(f"{VERDE}Tudo pronto.\nbIlo'meH qatlho'!!!{BRANCO}")
\ No newline at end of file
+			print(f"{VERMELHO}O arquivo {CODIGO} não existe.")
+		exit()
+	codigo=arquivo.read()
+	arquivo.close()
+
+	resultado=assemble(codigo, BASE, ABSOLUTO, VERBOSIDADE, SEMANTICO, SINTATICO, TOKENS, print, CACHE)
+
+	if not GERAR or resultado.mvn==None:
+		sys.exit()
+
+	arquivo_saida_mvn=open(CODIGO_OUT+".mvn", "w")
+	arquivo_saida_mvn.write("".join(linha+"\n" for linha in resultado.mvn))
+	arquivo_saida_mvn.close()
+
+	arquivo_saida_lst=open(CODIGO_OUT+".lst", "w")
+	arquivo_saida_lst.write(resultado.lst)
+	arquivo_saida_lst.close()
+
+	if VERBOSIDADE>0:
+		print(f"{VERDE}Tudo pronto.\nbIlo'meH qatlho'!!!{BRANCO}")
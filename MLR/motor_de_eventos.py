@@ -1,30 +1,68 @@
 '''
 Classe para simular um motor de eventos do compilador
+
+A fila é a lista ligada de eventos que começa em fila_de_eventos, com
+um ponteiro para o último evento, de modo que inserir eventos com
+chaves crescentes (como fazem os motores do montador) e consultar a
+última chave não percorrem a fila. Eventos inseridos fora de ordem
+ficam em um heap e são ligados à fila quando chega a vez deles.
 '''
 
+import heapq
 from eventos import Evento
 
 class MotorDeEventos:
 	def __init__(self, fila_de_eventos:Evento, rotinas:dict):
 		self.fila_de_eventos=fila_de_eventos
 		self.rotinas=rotinas
+		#Chaves dos eventos da fila, exceto o primeiro, e do heap
+		self.chaves=set()
+		#Heap de (chave, evento) inseridos antes do último evento
+		self.fora_de_ordem=[]
+		self.ultimo_evento=None
+		if fila_de_eventos!=None:
+			self.ultimo_evento=self.liga_ao_fim(fila_de_eventos)
+			self.chaves.discard(fila_de_eventos.chave_ordenacao)
+
+	#Guarda as chaves dos eventos a partir de evento e devolve o último deles
+	def liga_ao_fim(self, evento:Evento):
+		self.chaves.add(evento.chave_ordenacao)
+		while evento.proximo!=None:
+			evento=evento.proximo
+			self.chaves.add(evento.chave_ordenacao)
+		return evento
 
 	def insere_na_fila(self, evento:Evento):
 		nova_chave=evento.chave_ordenacao
-		atual_evento=self.fila_de_eventos
-		while atual_evento.proximo!=None and nova_chave>atual_evento.proximo.chave_ordenacao:
-			atual_evento=atual_evento.proximo
-		if atual_evento.proximo==None:
-			atual_evento.proximo=evento
+		if self.fila_de_eventos==None:
+			self.fila_de_eventos=evento
+			self.ultimo_evento=self.liga_ao_fim(evento)
+			self.chaves.discard(nova_chave)
 			return
-		if nova_chave==atual_evento.proximo.chave_ordenacao:
+		if nova_chave in self.chaves:
 			raise ValueError("Dois eventos com mesma chave.")
-		evento.proximo=atual_evento.proximo
-		atual_evento.proximo=evento
+		if self.ultimo_evento is self.fila_de_eventos or nova_chave>self.ultimo_evento.chave_ordenacao:
+			self.ultimo_evento.proximo=evento
+			self.ultimo_evento=self.liga_ao_fim(evento)
+			return
+		self.chaves.add(nova_chave)
+		heapq.heappush(self.fora_de_ordem, (nova_chave, evento))
 
 	def tira_da_fila(self):
 		primeiro=self.fila_de_eventos
-		self.fila_de_eventos=self.fila_de_eventos.proximo
+		proximo=primeiro.proximo
+		if self.fora_de_ordem and (proximo==None or self.fora_de_ordem[0][0]<proximo.chave_ordenacao):
+			evento=heapq.heappop(self.fora_de_ordem)[1]
+			evento.proximo=proximo
+			primeiro.proximo=evento
+			if proximo==None:
+				self.ultimo_evento=evento
+			proximo=evento
+		self.fila_de_eventos=proximo
+		if proximo==None:
+			self.ultimo_evento=None
+		else:
+			self.chaves.discard(proximo.chave_ordenacao)
 		return primeiro
 
 	def roda_um_evento(self, extra_params:tuple=()):
@@ -36,7 +74,4 @@ class MotorDeEventos:
 		return self.fila_de_eventos.chave_ordenacao
 
 	def ultima_chave(self):
-		atual_evento=self.fila_de_eventos
-		while atual_evento.proximo!=None:
-			atual_evento=atual_evento.proximo
-		return atual_evento.chave_ordenacao
\ No newline at end of file
+		return self.ultimo_evento.chave_ordenacao
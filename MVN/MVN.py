@@ -2,10 +2,24 @@ import memory
 import register
 import ULA
 import device
+import compiler
+import profiler
+import tracer
+import history
+import detector
+import hooks
+import image
 import time
 from mvnutils import *
 from switchcase import *
 
+#Reasons returned by MVN.run for stopping the execution
+HALT="halt"
+STEP_LIMIT="step_limit"
+BREAKPOINT="breakpoint"
+ERROR="error"
+LOOP="loop"
+
 '''
 This is the class for the MVN, it contains one memory 
 (0x0000-0x0FFF), 7 registers (MDR, MAR, IC, IR, OP, OI, AC), 
@@ -21,27 +35,63 @@ class MVN:
 	list) and set the default devices'''
 	'''NUM represents the number of steps to be done before 
 	executing the Time Interruption (subroutine calling 0x000)'''
-	def __init__(self, timeInterrupt=False, time_limit=50, timeout_input=0, line_feed="\n", quiet=False):
-		self.mem=memory.memory()
-		self.MAR=register.register()
-		self.MDR=register.register()
-		self.IC=register.register()
-		self.IR=register.register()
-		self.OP=register.register()
-		self.OI=register.register()
-		self.AC=register.register()
+	'''If compile_blocks is True, run executes the code compiled in 
+	basic blocks (see compiler.py)'''
+	'''If trusted is True, the code is only checked when loaded by 
+	set_memory, and memory, registers and ULA run without checking 
+	each access. Otherwise every access is checked'''
+	def __init__(self, timeInterrupt=False, time_limit=50, timeout_input=0, line_feed="\n", quiet=False, compile_blocks=False, trusted=False):
+		self.trusted=trusted
+		if trusted:
+			new_register=register.trusted_register
+			self.mem=memory.trusted_memory()
+			self.ula=ULA.trusted_ULA()
+		else:
+			new_register=register.register
+			self.mem=memory.memory()
+			self.ula=ULA.ULA()
+		self.MAR=new_register()
+		self.MDR=new_register()
+		self.IC=new_register()
+		self.IR=new_register()
+		self.OP=new_register()
+		self.OI=new_register()
+		self.AC=new_register()
 		self.SP=0x0ffe
 		self.end=True
 		self.timeInterrupt=timeInterrupt
 		self.NUM=time_limit
 		self.TIMEOUT=timeout_input
 		self.line_feed=line_feed
+		#File the screens write to, sys.stdout if None
+		self.sink=None
+		#Stream the keyboards read from, sys.stdin if None
+		self.input=None
+		#Command the printers send their jobs to, lpr if None
+		self.print_command=None
 		self.quiet=quiet
 		self.nsteps=0
-		self.ula=ULA.ULA()
+		self.error=None
+		#Devices in the order they were added
 		self.devs=[]
-		self.devs.append(device.device(0,0, self.quiet))
-		self.devs.append(device.device(1,0, self.quiet, line_feed=self.line_feed))
+		# key:		(type, UC) of a device
+		# value:	the device, the first one added if repeated
+		self.dev_table={}
+		self.add_dev(device.device(0,0, self.quiet, stream=self.input))
+		self.add_dev(device.device(1,0, self.quiet, line_feed=self.line_feed, sink=self.sink))
+
+		# key:		address of an instruction already decoded
+		# value:	(IR, OP, OI) of the instruction in that address
+		self.decoded={}
+		self.mem.on_write=self.invalidate
+		self.compiler=compiler.compiler(self) if compile_blocks else None
+		self.profiler=None
+		self.tracer=None
+		self.history=None
+		self.detector=None
+		# key:		(object, name of the method) with hooks installed
+		# value:	hook_chain of the method
+		self.hook_chains={}
 
 		# key:		instruction in code
 		# value:	original instruction
@@ -62,12 +112,43 @@ class MVN:
 								0xe: 0xe,
 								0xf: 0xf}
 
+		# index:	original instruction
+		# value:	method that executes it
+		self.handlers=[self.jp, self.jz, self.jn, self.lv,
+					   self.ad, self.sb, self.ml, self.dv,
+					   self.ld, self.mm, self.sc, self.rs,
+					   self.hm, self.gd, self.pd, self.os]
+
+		# key:		operation given to the supervisor (OI%0x100)
+		# value:	method that executes it
+		self.os_calls={0xEE: self.os_message,
+					   0xEF: self.os_run,
+					   0x57: self.os_stack,
+					   0x01: self.os_logic,
+					   0x0D: self.os_device,
+					   0x71: self.os_sleep}
+
+		# key:		value in AC when calling the supervisor with 0xEE
+		# value:	message to be printed
+		self.os_messages={0: "OK",
+						  1: "ER:JOB",
+						  2: "ER:CMD",
+						  3: "ER:ARG",
+						  4: "ER:END",
+						  5: "ER:EXE",
+						  2319: "2319! Temos um 2319!",
+						  404: "404! Erro não encontrado.",
+						  66: "Execute o erro 66!",
+						  88: "Cuidado amigo!!! Indo rápido desse jeito você pode acabar viajando no tempo",
+						  42: "Também fiquei triste com a resposta do Pensador Profundo. Tomara que a Terra já esteja terminando seu trabalho.",
+						  2001: "Desculpe Dave, estou com medo e não posso fazer isso."}
+
 	'''Set current address and get instruction from memory
 	MAR:=IC
 	MDR:=mem(MAR)'''
 	def fetch(self):
 		self.MAR.set_value(self.IC.get_value())
-		self.get_mem()
+		self.MDR.set_value(self.mem.fetch(self.MAR.get_value()))
 
 	'''Separate instruction in operation+argument
 	IR:=MDR
@@ -87,50 +168,192 @@ class MVN:
 	Halt Machine.
 	If OP is logic or arithmetic calls ULA to do it'''
 	def execute(self):
-		switch(self.instru_translator[self.OP.get_value()])
-		if case(0):
-			return self.jp()
-		elif case(1) or case(2):
-			if self.ula.execute(self.instru_translator[self.OP.get_value()], 
-								self.AC.get_value()):
-				self.IC.set_value(self.OI.get_value())
-			else:
-				self.IC.set_value(self.IC.get_value()+2)
-			return True
-		elif case(3):
-			return self.lv()
-		elif case(4) or case(5) or case(6) or case(7):
-			self.MAR.set_value(self.OI.get_value())
-			self.get_mem()
-			self.AC.set_value(self.ula.execute(self.instru_translator[self.OP.get_value()], 
-												self.AC.get_value(), 
-												self.MDR.get_value()))
-			self.IC.set_value(self.IC.get_value()+2)
-			return True
-		elif case(8):
-			return self.ld()
-		elif case(9):
-			return self.mm()
-		elif case(10):
-			return self.sc()
-		elif case(11):
-			return self.rs()
-		elif case(12):
-			return self.hm()
-		elif case(13):
-			return self.gd()
-		elif case(14):
-			return self.pd()
-		elif case(15):
-			return self.os()
+		return self.handlers[self.instru_translator[self.OP.get_value()]]()
 
 	'''Makes the common cycle: fetch, decode, execute and return weather
-	 the code should continue or not'''
+	 the code should continue or not.
+	 Addresses already decoded are taken from the decoded cache, setting
+	 the registers as fetch and decode would do'''
 	def step(self):
-		self.fetch()
-		self.decode()
+		entry=self.decoded.get(self.IC.value)
+		if entry==None or (self.timeInterrupt and self.nsteps==self.NUM):
+			self.fetch()
+			self.decode()
+			if self.IR.value==self.MDR.value:
+				self.decoded[self.MAR.value]=(self.IR.value, self.OP.value, self.OI.value)
+		else:
+			self.MAR.value=self.IC.value
+			self.MDR.value=entry[0]
+			self.IR.value=entry[0]
+			self.OP.value=entry[1]
+			self.OI.value=entry[2]
+			self.nsteps+=1
 		return self.execute()
 
+	'''Execute up to max_steps steps in a single loop, stopping before
+	any address in until (except the first one) is executed. Return the
+	reason to stop (HALT, STEP_LIMIT, BREAKPOINT, LOOP or ERROR) and the
+	number of steps done; on ERROR and LOOP the exception is kept in 
+	error.
+	With the compiler on, whole blocks are executed at once when they 
+	fit in the steps left and no time interruption or breakpoint falls
+	inside them. The output kept by the devices is written before it
+	returns.
+	When step is replaced in the instance (e.g. by the profiler), every
+	instruction goes through it; while memory is watched no block is
+	executed, as blocks access the memory directly'''
+	def run(self, max_steps, until=None):
+		breakpoints=set(until) if until else None
+		hooked="step" in self.__dict__
+		blocks=self.compiler if not hooked and self.mem.watches==None else None
+		mem=self.mem
+		ula=self.ula
+		decoded=self.decoded if not hooked else {}
+		handlers=self.handlers
+		translator=self.instru_translator
+		step=self.step
+		MAR, MDR, IR, OP, OI, IC=self.MAR, self.MDR, self.IR, self.OP, self.OI, self.IC
+		loops=self.detector
+		steps=0
+		self.error=None
+		if loops!=None:
+			loops.reset()
+		try:
+			while steps<max_steps:
+				ic=IC.value
+				if breakpoints and steps and ic in breakpoints:
+					return BREAKPOINT, steps
+				if blocks!=None:
+					block=blocks.get_block(ic)
+					if (block!=None and steps+block[1]<=max_steps
+							and not (self.timeInterrupt and self.nsteps<=self.NUM<self.nsteps+block[1])
+							and not (breakpoints and len(block[2]&breakpoints)>(ic in breakpoints))):
+						done=block[0](self, mem.map, mem, ula)
+						if done:
+							steps+=done
+							if loops!=None and IC.value<=ic:
+								loops.check()
+							continue
+				steps+=1
+				entry=decoded.get(ic)
+				if entry==None or (self.timeInterrupt and self.nsteps==self.NUM):
+					if not step():
+						return HALT, steps
+					continue
+				MAR.value=ic
+				MDR.value=entry[0]
+				IR.value=entry[0]
+				OP.value=entry[1]
+				OI.value=entry[2]
+				self.nsteps+=1
+				if not handlers[translator[entry[1]]]():
+					return HALT, steps
+		except MVNLoop as error:
+			self.error=error
+			return LOOP, steps
+		except Exception as error:
+			self.error=error
+			return ERROR, steps
+		finally:
+			self.flush_devs()
+		return STEP_LIMIT, steps
+
+	'''Install hook over the method name of target (the MVN or its 
+	memory), hook is called with the next callable of the chain as its
+	first argument'''
+	def add_hook(self, target, name, hook):
+		key=(target, name)
+		if key not in self.hook_chains:
+			self.hook_chains[key]=hooks.hook_chain(target, name)
+		self.hook_chains[key].install(hook)
+
+	#Remove hook from the method name of target, wherever it is in the chain
+	def remove_hook(self, target, name, hook):
+		key=(target, name)
+		self.hook_chains[key].uninstall(hook)
+		if not self.hook_chains[key]:
+			del self.hook_chains[key]
+
+	#Return the callable that hook calls, the method without it
+	def next_hook(self, target, name, hook):
+		return self.hook_chains[(target, name)].next(hook)
+
+	#Start counting executions and memory accesses, return the profiler
+	def enable_profiler(self):
+		if self.profiler==None:
+			self.profiler=profiler.profiler(self)
+		return self.profiler
+
+	#Stop counting executions and memory accesses
+	def disable_profiler(self):
+		if self.profiler!=None:
+			self.profiler.uninstall()
+			self.profiler=None
+
+	'''Start recording the registers after each step, in a ring buffer 
+	with the last size steps or in the given file, return the tracer'''
+	def enable_tracer(self, size=0x10000, file=None):
+		if self.tracer==None:
+			self.tracer=tracer.tracer(self, size, file)
+		return self.tracer
+
+	#Stop recording the registers, closing the trace file if any
+	def disable_tracer(self):
+		if self.tracer!=None:
+			self.tracer.uninstall()
+			self.tracer=None
+
+	'''Start logging what each step changes, keeping the last limit 
+	steps to be undone by step_back, return the history'''
+	def enable_history(self, limit=100000):
+		if self.history==None:
+			self.history=history.history(self, limit)
+		return self.history
+
+	#Stop logging the steps, forgetting the ones logged
+	def disable_history(self):
+		if self.history!=None:
+			self.history.uninstall()
+			self.history=None
+
+	'''Start looking for infinite loops, raising MVNLoop from step (or
+	returning LOOP from run) when one is found, return the detector'''
+	def enable_detector(self):
+		if self.detector==None:
+			self.detector=detector.detector(self)
+		return self.detector
+
+	#Stop looking for infinite loops
+	def disable_detector(self):
+		if self.detector!=None:
+			self.detector.uninstall()
+			self.detector=None
+
+	#Undo the last step, return False if there is no step to undo
+	def step_back(self):
+		if self.history==None:
+			return False
+		return self.history.back()
+
+	#Drop the decoded and compiled code that is no longer in memory
+	def revalidate(self):
+		mp=self.mem.map
+		for addr, entry in list(self.decoded.items()):
+			if mp[addr]<<8|mp[addr+1]!=entry[0]:
+				del self.decoded[addr]
+		if self.compiler!=None:
+			self.compiler.revalidate()
+
+	'''Remove from the decoded cache every instruction that overlaps 
+	the word written in addr, so self-modifying code is decoded again'''
+	def invalidate(self, addr):
+		if self.decoded:
+			self.decoded.pop(addr-1, None)
+			self.decoded.pop(addr, None)
+			self.decoded.pop(addr+1, None)
+		if self.compiler!=None:
+			self.compiler.invalidate(addr)
+
 	#Return the addr's value
 	def get_mem(self):
 		self.MDR.set_value(self.mem.get_value(self.MAR.get_value()))
@@ -144,6 +367,24 @@ class MVN:
 		self.IC.set_value(self.OI.get_value())
 		return True
 
+	'''IC:=OI if AC is 0
+	IC:=IC+1 otherwise'''
+	def jz(self):
+		return self.jump_if(1)
+
+	'''IC:=OI if AC is negative
+	IC:=IC+1 otherwise'''
+	def jn(self):
+		return self.jump_if(2)
+
+	#Jump to OI if the ULA test op over AC is True
+	def jump_if(self, op):
+		if self.ula.execute(op, self.AC.get_value()):
+			self.IC.set_value(self.OI.get_value())
+		else:
+			self.IC.set_value(self.IC.get_value()+2)
+		return True
+
 	'''AC:=OI
 	IC:=IC+1'''
 	def lv(self):
@@ -151,6 +392,33 @@ class MVN:
 		self.IC.set_value(self.IC.get_value()+2)
 		return True
 
+	#AC:=AC+mem(OI)
+	def ad(self):
+		return self.arithmetic(4)
+
+	#AC:=AC-mem(OI)
+	def sb(self):
+		return self.arithmetic(5)
+
+	#AC:=AC*mem(OI)
+	def ml(self):
+		return self.arithmetic(6)
+
+	#AC:=AC/mem(OI)
+	def dv(self):
+		return self.arithmetic(7)
+
+	'''MAR:=OI
+	MDR:=mem(MAR)
+	AC:=ULA op over AC and MDR
+	IC:=IC+1'''
+	def arithmetic(self, op):
+		self.MAR.set_value(self.OI.get_value())
+		self.get_mem()
+		self.AC.set_value(self.ula.execute(op, self.AC.get_value(), self.MDR.get_value()))
+		self.IC.set_value(self.IC.get_value()+2)
+		return True
+
 	'''MAR:=OI
 	MDR:=mem(MAR)
 	AC:=MDR
@@ -199,7 +467,9 @@ class MVN:
 
 	#Only returns False, end of the program
 	def hm(self):
-		if self.end:return False
+		if self.end:
+			self.flush_devs(True)
+			return False
 		self.end=True
 		self.IC.set_value(self.ret)
 		return True
@@ -207,155 +477,166 @@ class MVN:
 	'''AC:=dev
 	IC:=IC+1'''
 	def gd(self):
-		nfound=True
-		for dev in self.devs:
-			if self.OI.get_value()//0x0100==dev.get_type() and self.OI.get_value()%0x0100==dev.get_UC():
-				self.AC.set_value(dev.get_data(self.TIMEOUT))
-				nfound=False
-		if nfound: raise MVNError("Dispositivo não existe")
+		dev=self.get_dev(self.OI.get_value())
+		if dev.dtype==0:
+			self.flush_devs()
+		self.AC.set_value(dev.get_data(self.TIMEOUT))
 		self.IC.set_value(self.IC.get_value()+2)
 		return True	
 
 	'''dev:=AC
 	IC:=IC+1'''
 	def pd(self):
-		nfound=0
-		for dev in self.devs:
-			if self.OI.get_value()//0x0100==dev.get_type() and self.OI.get_value()%0x0100==dev.get_UC():
-				dev.put_data(self.AC.get_value())
-				nfound+=1
-		if nfound==len(self.devs):
-			raise MVNError("Dispositivo não existe")
+		self.get_dev(self.OI.get_value()).put_data(self.AC.get_value())
 		self.IC.set_value(self.IC.get_value()+2)
 		return True
 
-	'''Send OI to the supervisor
+	#Return the device given by code as type*0x100+UC, raise error if there is none
+	def get_dev(self, code):
+		dev=self.dev_table.get((code//0x0100, code%0x0100))
+		if dev==None: raise MVNError("Dispositivo não existe")
+		return dev
+
+	'''Send OI to the supervisor, which executes the operation
+	given by OI%0x100
 	IC:=IC+1'''
 	def os(self):
-		if self.OI.get_value()%0x100==0xEE:
-			switch(self.AC.get_value())
-			if case(0):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("OK")
-			elif case(1):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("ER:JOB")
-			elif case(2):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("ER:CMD")
-			elif case(3):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("ER:ARG")
-			elif case(4):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("ER:END")
-			elif case(5):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("ER:EXE")
-			elif case(2319):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("2319! Temos um 2319!")
-			elif case(404):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("404! Erro não encontrado.")
-			elif case(66):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("Execute o erro 66!")
-			elif case(88):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("Cuidado amigo!!! Indo rápido desse jeito você pode acabar viajando no tempo")
-			elif case(42):
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("Também fiquei triste com a resposta do Pensador Profundo. Tomara que a Terra já esteja terminando seu trabalho.")
-			elif case(2001):
+		call=self.os_calls.get(self.OI.get_value()%0x100)
+		if call!=None:
+			call()
+		elif self.quiet:
+			self.flush_devs()
+			print("Operação desconhecida. Código "+str(self.OI.get_value()%0x100))
+		self.IC.set_value(self.IC.get_value()+2)
+		return True
+
+	#Print the message given by AC
+	def os_message(self):
+		code=self.AC.get_value()
+		self.flush_devs()
+		if code in self.os_messages:
+			if code==2001:
 				if self.OI.get_value()!=0: self.os_error(0,self.OI.get_value()//0x100)
-				print("Desculpe Dave, estou com medo e não posso fazer isso.")
-			elif self.quiet:
-				print("Erro desconhecido. Código "+str(self.OI.get_value()//0x100))
-		elif self.OI.get_value()%0x100==0xEF:
-			self.ret=self.IC.get_value()+2
-			self.IC.set_value(self.AC.get_value()-2)
-			self.end=False
-		elif self.OI.get_value()%0x100==0x57:
-			switch(self.AC.get_value())
-			if case(0):
-				#Get pointer
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				self.MAR.set_value(self.SP)
-				self.get_mem()
-				self.AC.set_value(self.MDR.get_value())
-			elif case(1):
-				#Set pointer
-				if self.OI.get_value()//0x100!=1: self.os_error(1,self.OI.get_value()//0x100)
-				self.MAR.set_value(self.MAR.get_value()-2)
-				self.get_mem()
-				self.MAR.set_value(self.SP)
-				self.set_mem()
-			elif case(2):
-				#Get stacktop
-				if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
-				self.MAR.set_value(self.SP)
-				self.get_mem()
-				self.MAR.set_value(self.MDR.get_value())
-				self.get_mem()
-				self.AC.set_value(self.MDR.get_value())
-			elif case(3):
-				#Set stacktop
-				if self.OI.get_value()//0x100!=1: self.os_error(1,self.OI.get_value()//0x100)
-				self.MAR.set_value(self.MAR.get_value()-2)
-				self.get_mem()
-				self.AC.set_value(self.MDR.get_value())
-				self.MAR.set_value(self.SP)
-				self.get_mem()
-				self.MAR.set_value(self.MDR.get_value())
-				self.MDR.set_value(self.AC.get_value())
-				self.set_mem()		
-			elif self.quiet:
-				print("Instrução desconhecida. Código "+str(self.AC.get_value()//0x100))
-		elif self.OI.get_value()%0x100==0x01:
+			elif self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
+			print(self.os_messages[code])
+		elif self.quiet:
+			print("Erro desconhecido. Código "+str(self.OI.get_value()//0x100))
+
+	#Run the secondary code in address AC, returning when it halts
+	def os_run(self):
+		self.ret=self.IC.get_value()+2
+		self.IC.set_value(self.AC.get_value()-2)
+		self.end=False
+
+	#Operate the stack as given by AC
+	def os_stack(self):
+		code=self.AC.get_value()
+		if code==0:
+			#Get pointer
+			if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
+			self.MAR.set_value(self.SP)
+			self.get_mem()
+			self.AC.set_value(self.MDR.get_value())
+		elif code==1:
+			#Set pointer
+			if self.OI.get_value()//0x100!=1: self.os_error(1,self.OI.get_value()//0x100)
 			self.MAR.set_value(self.MAR.get_value()-2)
 			self.get_mem()
-			switch(self.AC.get_value())
-			if case(0):
-				if self.OI.get_value()//0x100!=1: self.os_error(1, self.OI.get_value()//0x100)
-				self.AC.set_value(self.ula.execute(0xA, self.MDR.get_value()))#NOT
-			else:
-				if self.OI.get_value()//0x100!=2: self.os_error(2, self.OI.get_value()//0x100)
-				self.AC.set_value(self.MDR.get_value())
-				self.MAR.set_value(self.MAR.get_value()-2)
-				self.get_mem()
-				if case(1):
-					self.AC.set_value(self.ula.execute(0xB , self.AC.get_value(), self.MDR.get_value()))#AND
-				elif case(2):
-					self.AC.set_value(self.ula.execute(0xC , self.AC.get_value(), self.MDR.get_value()))#OR
-				elif case(3):
-					self.AC.set_value(self.ula.execute(0xD , self.AC.get_value(), self.MDR.get_value()))#XOR
-				elif self.quiet:
-					print("Operador desconhecido. Código "+str(self.AC.get_value()))
-		elif self.OI.get_value()%0x100==0x0D:
-			if self.OI.get_value()//0x100!=1: self.os_error(1, self.get_value()//0x100)
+			self.MAR.set_value(self.SP)
+			self.set_mem()
+		elif code==2:
+			#Get stacktop
+			if self.OI.get_value()//0x100!=0: self.os_error(0,self.OI.get_value()//0x100)
+			self.MAR.set_value(self.SP)
+			self.get_mem()
+			self.MAR.set_value(self.MDR.get_value())
+			self.get_mem()
+			self.AC.set_value(self.MDR.get_value())
+		elif code==3:
+			#Set stacktop
+			if self.OI.get_value()//0x100!=1: self.os_error(1,self.OI.get_value()//0x100)
 			self.MAR.set_value(self.MAR.get_value()-2)
 			self.get_mem()
-			nfound=True
-			for dev in self.devs:
-				if self.MDR.get_value()//0x0100==dev.get_type() and self.MDR.get_value()%0x0100==dev.get_UC():
-					nfound=False
-					break
-			if nfound: raise MVNError("Dispositivo não existe")
-			switch(self.AC.get_value())
-			if case(0):
-				dev.clean_buffer()
-			elif case(1):
-				dev.append_buffer()
+			self.AC.set_value(self.MDR.get_value())
+			self.MAR.set_value(self.SP)
+			self.get_mem()
+			self.MAR.set_value(self.MDR.get_value())
+			self.MDR.set_value(self.AC.get_value())
+			self.set_mem()
+		elif self.quiet:
+			print("Instrução desconhecida. Código "+str(self.AC.get_value()//0x100))
+
+	#Make the logic operation given by AC over the arguments
+	def os_logic(self):
+		self.MAR.set_value(self.MAR.get_value()-2)
+		self.get_mem()
+		code=self.AC.get_value()
+		if code==0:
+			if self.OI.get_value()//0x100!=1: self.os_error(1, self.OI.get_value()//0x100)
+			self.AC.set_value(self.ula.execute(0xA, self.MDR.get_value()))#NOT
+		else:
+			if self.OI.get_value()//0x100!=2: self.os_error(2, self.OI.get_value()//0x100)
+			self.AC.set_value(self.MDR.get_value())
+			self.MAR.set_value(self.MAR.get_value()-2)
+			self.get_mem()
+			if code==1:
+				self.AC.set_value(self.ula.execute(0xB , self.AC.get_value(), self.MDR.get_value()))#AND
+			elif code==2:
+				self.AC.set_value(self.ula.execute(0xC , self.AC.get_value(), self.MDR.get_value()))#OR
+			elif code==3:
+				self.AC.set_value(self.ula.execute(0xD , self.AC.get_value(), self.MDR.get_value()))#XOR
 			elif self.quiet:
 				print("Operador desconhecido. Código "+str(self.AC.get_value()))
-		elif self.OI.get_value()%0x100==0x71:
-			if self.OI.get_value()//0x100!=0: self.os_error(0, self.get_value()//0x100)
-			time.sleep(self.AC.get_value()/1000)
+
+	#Clean or append the buffer of the device given as argument, or submit its output
+	def os_device(self):
+		if self.OI.get_value()//0x100!=1: self.os_error(1, self.get_value()//0x100)
+		self.MAR.set_value(self.MAR.get_value()-2)
+		self.get_mem()
+		dev=self.get_dev(self.MDR.get_value())
+		code=self.AC.get_value()
+		if code==0:
+			dev.clean_buffer()
+		elif code==1:
+			dev.append_buffer()
+		elif code==2:
+			dev.submit()
 		elif self.quiet:
-			print("Operação desconhecida. Código "+str(self.OI.get_value()%0x100))
-		self.IC.set_value(self.IC.get_value()+2)
-		return True
+			print("Operador desconhecido. Código "+str(self.AC.get_value()))
+
+	#Sleep for AC miliseconds
+	def os_sleep(self):
+		if self.OI.get_value()//0x100!=0: self.os_error(0, self.get_value()//0x100)
+		time.sleep(self.AC.get_value()/1000)
+
+	'''Return a snapshot of the MVN state: memory, registers, SP, 
+	number of steps, secondary code state and device buffers'''
+	def snapshot(self):
+		return {"mem": self.mem.snapshot(),
+				"regs": (self.MAR.value, self.MDR.value, self.IC.value, self.IR.value,
+						 self.OP.value, self.OI.value, self.AC.value),
+				"SP": self.SP,
+				"nsteps": self.nsteps,
+				"end": self.end,
+				"ret": getattr(self, "ret", None),
+				"devs": [(dev, dev.get_state()) for dev in self.devs]}
+
+	'''Restore a snapshot taken by snapshot, dropping the decoded and 
+	compiled code that changed with the memory'''
+	def restore(self, snap):
+		if self.mem.restore(snap["mem"]):
+			self.revalidate()
+		(self.MAR.value, self.MDR.value, self.IC.value, self.IR.value,
+		 self.OP.value, self.OI.value, self.AC.value)=snap["regs"]
+		self.SP=snap["SP"]
+		self.nsteps=snap["nsteps"]
+		self.end=snap["end"]
+		self.ret=snap["ret"]
+		self.devs=[]
+		self.dev_table={}
+		for dev, state in snap["devs"]:
+			dev.set_state(state)
+			self.add_dev(dev)
 
 	def os_error(self, expected, passed):
 		raise MVNError(str(expected)+" arguments expecteds, "+str(passed)+" passed.")
@@ -364,10 +645,30 @@ class MVN:
 		return hex(self.MAR.get_value())[2:].zfill(4)+" "+hex(self.MDR.get_value())[2:].zfill(4)+" "+hex(self.IC.get_value())[2:].zfill(4)+" "+hex(self.IR.get_value())[2:].zfill(4)+" "+hex(self.OP.get_value())[2:].zfill(4)+" "+hex(self.OI.get_value())[2:].zfill(4)+" "+hex(self.AC.get_value())[2:].zfill(4)
 
 	'''Receives an list of lists containing pairs of addr-value and put 
-	this to memory'''
+	this to memory, checking them even in trusted mode'''
 	def set_memory(self, guide):
 		for data in guide:
-			self.mem.set_value(int(data[0], 16), int(data[1], 16))
+			addr=int(data[0], 16)
+			value=int(data[1], 16)
+			valid_value(addr, memory.MIN_ADDR, memory.MAX_ADDR-1)
+			valid_value(value, memory.MIN_VALUE, memory.MAX_VALUE)
+			self.mem.set_value(addr, value)
+	'''Copy a binary image made by image.build straight to memory, 
+	dropping the decoded and compiled code that changed, raise error if
+	it is not a valid image'''
+	def load_image(self, data):
+		segments, blob=image.read(data)
+		self.mem.load(segments, blob)
+		self.revalidate()
+	'''Load the contents of an .mvn file or of a binary image, as told
+	by image.is_image, to memory'''
+	def load(self, data):
+		if image.is_image(data):
+			self.load_image(data)
+		else:
+			if isinstance(data, bytes):
+				data=data.decode()
+			self.set_memory(parse_mvn(data))
 	def dump_memory(self, start, stop, arq=None):
 		self.mem.show(start, stop, arq)
 
@@ -387,19 +688,19 @@ class MVN:
 			if case(0):
 				if len(line)!=2:
 					raise MVNError("'disp.lst' file badly formulated")
-				self.devs.append(device.device(0, int(line[1]), quiet=self.quiet))
+				self.add_dev(device.device(0, int(line[1]), quiet=self.quiet, stream=self.input))
 			elif case(1):
 				if len(line)!=2:
 					raise MVNError("'disp.lst' file badly formulated")
-				self.devs.append(device.device(1, int(line[1]), quiet=self.quiet, line_feed=self.line_feed))
+				self.add_dev(device.device(1, int(line[1]), quiet=self.quiet, line_feed=self.line_feed, sink=self.sink))
 			elif case(2):
 				if len(line)!=3:
 					raise MVNError("'disp.lst' file badly formulated")
-				self.devs.append(device.device(2, int(line[1]), printer=line[2], quiet=self.quiet))
+				self.add_dev(device.device(2, int(line[1]), printer=line[2], quiet=self.quiet, print_command=self.print_command))
 			elif case(3):
 				if len(line)!=4:
 					raise MVNError("'disp.lst' file badly formulated")
-				self.devs.append(device.device(3, int(line[1]), line[2], line[3], quiet=self.quiet))
+				self.add_dev(device.device(3, int(line[1]), line[2], line[3], quiet=self.quiet))
 
 	#Print the devices on device list
 	def print_devs(self):
@@ -413,15 +714,55 @@ class MVN:
 
 	#Add a new device with specified parameters
 	def new_dev(self, dtype, UC, file=None, rwb=None, printer=None):
+		if (dtype, UC) in self.dev_table:
+			raise MVNError("Device ja existe")
+		self.add_dev(device.device(dtype, UC, file, rwb, printer, self.quiet, sink=self.sink, stream=self.input, print_command=self.print_command))
+
+	'''Write the output kept by the devices, with submit the printers
+	also send their jobs'''
+	def flush_devs(self, submit=False):
+		for dev in self.devs:
+			if submit:
+				dev.submit()
+			else:
+				dev.flush()
+
+	#Send the output of the screens to sink instead of sys.stdout
+	def set_sink(self, sink):
+		self.sink=sink
+		for dev in self.devs:
+			if dev.dtype==1:
+				dev.flush()
+				dev.sink=sink
+
+	'''Make the keyboards read from stream, a file or the bytes typed,
+	instead of sys.stdin'''
+	def set_input(self, stream):
+		self.input=stream
 		for dev in self.devs:
-			if dev.get_type()==dtype and dev.get_UC()==UC:
-				raise MVNError("Device ja existe")
-		self.devs.append(device.device(dtype, UC, file, rwb, printer, self.quiet))
+			if dev.dtype==0:
+				dev.set_stream(stream)
+
+	'''Make the printers send their jobs to command, a list with the
+	program and its arguments, instead of lpr'''
+	def set_print_command(self, command):
+		self.print_command=command
+		for dev in self.devs:
+			if dev.dtype==2:
+				dev.print_command=command
+
+	#Add dev to the device list and table
+	def add_dev(self, dev):
+		self.devs.append(dev)
+		self.dev_table.setdefault((dev.get_type(), dev.get_UC()), dev)
 
 	#Remove specified device
 	def rm_dev(self, dtype, UC):
-		for dev in range(len(self.devs)):
-			if self.devs[dev].get_type()==dtype and self.devs[dev].get_UC()==UC:
-				self.devs[dev].terminate()
-				self.devs.pop(dev)
-				return
\ No newline at end of file
+		dev=self.dev_table.pop((dtype, UC), None)
+		if dev!=None:
+			dev.terminate()
+			self.devs.remove(dev)
+			for other in self.devs:
+				if other.get_type()==dtype and other.get_UC()==UC:
+					self.dev_table[(dtype, UC)]=other
+					break
\ No newline at end of file
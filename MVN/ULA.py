@@ -1,9 +1,33 @@
 from mvnutils import *
-from switchcase import *
 
 MIN_VALUE=0x0000
 MAX_VALUE=0xFFFF
 
+'''
+Arithmetic over words, shared by ULA and lockstep: every function 
+works on ints and, element by element, on numpy arrays of words.
+'''
+
+def add_words(num1, num2):
+	return (num1+num2)&0xFFFF
+
+def sub_words(num1, num2):
+	return (num1-num2)&0xFFFF
+
+def mul_words(num1, num2):
+	return (num1*num2)&0xFFFF
+
+#Return the opposite of num (two's complement) where neg is True, num elsewhere
+def negate_where(num, neg):
+	return num+(((-num)&0xFFFF)-num)*neg
+
+'''Divide the magnitudes of num1 and num2 and negate the result if 
+their signs differ, raise ZeroDivisionError if num2 is an int 0'''
+def div_words(num1, num2):
+	neg1=num1>=0x8000
+	neg2=num2>=0x8000
+	return negate_where(negate_where(num1, neg1)//negate_where(num2, neg2), neg1!=neg2)
+
 '''
 This class represents an simple Logic and Arthimatic Unit 
 (LAU), here called by ULA (in portuguese), this LAU can only
@@ -16,7 +40,18 @@ to call the others.
 class ULA:
 	#Inicialize the LAU
 	def __init__(self):
-		pass
+		# key:		operation code
+		# value:	method that executes it
+		self.unary={1: self.is_zero,
+					2: self.is_neg,
+					0xA: self._not}
+		self.binary={4: self.add,
+					 5: self.sub,
+					 6: self.mul,
+					 7: self.div,
+					 0xB: self._and,
+					 0xC: self._or,
+					 0xD: self._xor}
 
 	'''Check if the given instruction is valid and performs the
 	right operation'''
@@ -24,27 +59,9 @@ class ULA:
 		valid_instru(op)
 		valid_value(ac, MIN_VALUE, MAX_VALUE)
 		valid_value(oi, MIN_VALUE, MAX_VALUE)
-		switch(op)
-		if case(1):
-			return self.is_zero(ac)
-		elif case(2):
-			return self.is_neg(ac)
-		elif case(4):
-			return self.add(ac, oi)
-		elif case(5):
-			return self.sub(ac, oi)
-		elif case(6):
-			return self.mul(ac, oi)
-		elif case(7):
-			return self.div(ac, oi)
-		elif case(0xA):
-			return self._not(ac)
-		elif case(0xB):
-			return self._and(ac, oi)
-		elif case(0xC):
-			return self._or(ac, oi)
-		elif case(0xD):
-			return self._xor(ac, oi)
+		if op in self.unary:
+			return self.unary[op](ac)
+		return self.binary[op](ac, oi)
 	
 	def is_zero(self, num):
 		return num==0x0000
@@ -53,25 +70,16 @@ class ULA:
 		return num>=0x8000
 
 	def add(self, num1, num2):
-		return (num1+num2)%(1<<16)
+		return add_words(num1, num2)
 
 	def sub(self, num1, num2):
-		return (num1-num2)%(1<<16)
+		return sub_words(num1, num2)
 
 	def mul(self, num1, num2):
-		return (num1*num2)%(1<<16)
+		return mul_words(num1, num2)
 
 	def div(self, num1, num2):
-		signal=False
-		if self.is_neg(num1):
-			num1=self.mul(num1, 0xFFFF)
-			signal=not signal
-		if self.is_neg(num2):
-			num2=self.mul(num2, 0xFFFF)
-			signal=not signal
-		if signal:
-			return self.mul(num1//num2, 0xFFFF)
-		return num1//num2
+		return div_words(num1, num2)
 
 	def _not(self, num):
 		return num ^ 0xFFFF
@@ -83,4 +91,15 @@ class ULA:
 		return num1 | num2
 
 	def _xor(self, num1, num2):
-		return num1 ^ num2
\ No newline at end of file
+		return num1 ^ num2
+
+'''
+ULA for MVNs in trusted mode, it does not check the operation and
+the operands, as the values come from trusted registers and memory
+'''
+class trusted_ULA(ULA):
+
+	def execute(self, op, ac, oi=0x0000):
+		if op in self.unary:
+			return self.unary[op](ac)
+		return self.binary[op](ac, oi)
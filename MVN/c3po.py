@@ -16,10 +16,10 @@ class C3PO:
 				"tl":"   ra'    De'Wa'DIch           QapwI'\n---------------------------------------------------------------------------\n    i                          MVN taghqa'lu'\n    p     [navDe'wI']          qawHaqvaD ghun qenglu'\n    r     [Daq] [De'jan]       ghun De'wI'Qaplu'\n    b                          chu'lu'/chu'be'lu' Debug Qap\n    s                          jan I/O vu'lu'\n    g                          De'jan 'anglu'\n    m     [wa'DIch] [Qav]      qawHaq 'anglu'\n    h                          QaH\n    x                          MVN jIH je rInlu'"
 			},
 			"dbg_help":{
-				"en":" COMMAND  PARAMETERS           OPERATION\n---------------------------------------------------------------------------\n    c                          Continue execution\n    s                          Make one step forward on execution\n    b     [addr]               Insert a breakpoint\n    x                          Pause execution\n    h                          Help\n    r     [reg] [val]          Place value on register\n    a     [addr] [val]         Place value in memory\n    e                          Show register values\n    m     [ini] [fim]          List memory content",
-				"pt":" COMANDO  PARÂMETROS           OPERAÇÃO\n---------------------------------------------------------------------------\n    c                          Continua execução\n    s                          Avança um passo na execução\n    b     [ende]               Insere um breakpoint\n    x                          Pausa execução\n    h                          Ajuda\n    r     [reg] [val]          Atribui valor a registrador\n    a     [ende] [val]         Atribui valor a memória\n    e                          Mostra valores dos registradores\n    m     [ini] [fim]          Lista conteúdo da memória",
-				"es":" COMANDO  PARÁMETROS           OPERACIÓN\n---------------------------------------------------------------------------\n    c                          Continua execución\n    s                          Avanza um passo en la execución\n    b     [posi]               Insere un breakpoint\n    x                          Pausa execusión\n    h                          Ayuda\n    r     [reg] [val]          Atribuye valor a un registro\n    a     [posi] [val]         Atribuye valor a memoria\n    e                          Muestra valores de los registradores\n    m     [ini] [fim]          Lista contenido de la memória",
-				"tl":"   ra'    De'Wa'DIch           QapwI'\n---------------------------------------------------------------------------\n    c                          De'wI'Qapqa'lu'\n    s                          wa' gho' De'wI'Qaplu' \n    b     [Daq]                Breakpoint chellu'\n    x                          De'wI'Qap rInlu'\n    h                          QaH\n    r     [De'qawHaq] [mI']    De'qawHaqvaD  mI' chellu'\n    a     [Daq] [mI']          qawHaqvaD mI' chellu'\n    e                          De'qawHaq 'anglu'\n    m     [wa'DIch] [Qav]      qawHaq 'anglu'"
+				"en":" COMMAND  PARAMETERS           OPERATION\n---------------------------------------------------------------------------\n    c                          Continue execution\n    s                          Make one step forward on execution\n    b     [addr]               Insert a breakpoint\n    bc    [addr] [cond]        Insert a breakpoint that stops when cond holds\n    w     [ini] [fim] [r|w]    Stop on reads and/or writes of memory\n    x                          Pause execution\n    h                          Help\n    r     [reg] [val]          Place value on register\n    a     [addr] [val]         Place value in memory\n    e                          Show register values\n    m     [ini] [fim]          List memory content\n    v                          Make one step backward on execution\n    vc                         Continue execution backward until a breakpoint",
+				"pt":" COMANDO  PARÂMETROS           OPERAÇÃO\n---------------------------------------------------------------------------\n    c                          Continua execução\n    s                          Avança um passo na execução\n    b     [ende]               Insere um breakpoint\n    bc    [ende] [cond]        Insere um breakpoint que para quando cond vale\n    w     [ini] [fim] [r|w]    Para em leituras e/ou escritas da memória\n    x                          Pausa execução\n    h                          Ajuda\n    r     [reg] [val]          Atribui valor a registrador\n    a     [ende] [val]         Atribui valor a memória\n    e                          Mostra valores dos registradores\n    m     [ini] [fim]          Lista conteúdo da memória\n    v                          Volta um passo na execução\n    vc                         Continua a execução para trás até um breakpoint",
+				"es":" COMANDO  PARÁMETROS           OPERACIÓN\n---------------------------------------------------------------------------\n    c                          Continua execución\n    s                          Avanza um passo en la execución\n    b     [posi]               Insere un breakpoint\n    bc    [posi] [cond]        Insere un breakpoint que para cuando cond vale\n    w     [ini] [fim] [r|w]    Para en lecturas y/o escrituras de memoria\n    x                          Pausa execusión\n    h                          Ayuda\n    r     [reg] [val]          Atribuye valor a un registro\n    a     [posi] [val]         Atribuye valor a memoria\n    e                          Muestra valores de los registradores\n    m     [ini] [fim]          Lista contenido de la memória\n    v                          Retrocede un paso en la execución\n    vc                         Continua la execución hacia atrás hasta un breakpoint",
+				"tl":"   ra'    De'Wa'DIch           QapwI'\n---------------------------------------------------------------------------\n    c                          De'wI'Qapqa'lu'\n    s                          wa' gho' De'wI'Qaplu' \n    b     [Daq]                Breakpoint chellu'\n    bc    [Daq] [cond]         mIw ghajbogh Breakpoint chellu'\n    w     [ini] [fim] [r|w]    qawHaq laDlu'/ghItlhlu'DI' mevlu'\n    x                          De'wI'Qap rInlu'\n    h                          QaH\n    r     [De'qawHaq] [mI']    De'qawHaqvaD  mI' chellu'\n    a     [Daq] [mI']          qawHaqvaD mI' chellu'\n    e                          De'qawHaq 'anglu'\n    m     [wa'DIch] [Qav]      qawHaq 'anglu'\n    v                          wa' gho' DoHlu'\n    vc                         Breakpoint SIchpa' DoHtaHlu'"
 			},
 			"header":{
 				"en":"                Escola Politécnica da Universidade de São Paulo\n                   PCS3616 - von Neumann Machine Simulator\n                 MVN version %s (%s) - All rights reserved",
@@ -63,6 +63,12 @@ class C3PO:
 				"es":"Más de dos numeros en la instrucción",
 				"tl":"cha' mI' law' ra' mI' puS"
 			},
+			"bad_image":{
+				"en":"Invalid memory image",
+				"pt":"Imagem de memória inválida",
+				"es":"Imagen de memoria inválida",
+				"tl":"qawHaq mIllogh Hatlu'"
+			},
 			"big_number":{
 				"en":"Number is too big for the MVN",
 				"pt":"Número é grande demais para a MVN",
@@ -265,11 +271,51 @@ class C3PO:
 				"en":"File does not exist",
 				"pt":"O arquivo não existe",
 				"es":"Él archivo no existe",
-				"tl":""
+				"tl":"ghItlh tu'lu'be'"
+			},
+			"no_back":{
+				"en":"There is no step to go back to",
+				"pt":"Não há passo para voltar",
+				"es":"No hay paso para retroceder",
+				"tl":"DoHmeH gho' tu'lu'be'"
+			},
+			"trace_saved":{
+				"en":"Registers of each step saved to %s, show them with mvnTrace.py",
+				"pt":"Registradores de cada passo salvos em %s, mostre-os com mvnTrace.py",
+				"es":"Registros de cada paso guardados en %s, muestralos con mvnTrace.py",
+				"tl":"De'jan %s ngeHlu'ta', mvnTrace.py yIlo'"
+			},
+			"cond_inv":{
+				"en":"Breakpoint condition is not a valid expression",
+				"pt":"Condição do breakpoint não é uma expressão válida",
+				"es":"Condición del breakpoint no es una expresión válida",
+				"tl":"breakpoint mIw Hatlu'"
+			},
+			"watch_inv":{
+				"en":"Watchpoint mode has to be r, w or rw",
+				"pt":"Modo do watchpoint deve ser r, w ou rw",
+				"es":"Modo del watchpoint tiene que ser r, w o rw",
+				"tl":"watchpoint mIw: r, w qoj rw neH"
+			},
+			"watch_hit":{
+				"en":"Watchpoint: address %s accessed (%s)",
+				"pt":"Watchpoint: endereço %s acessado (%s)",
+				"es":"Watchpoint: posición %s accedida (%s)",
+				"tl":"watchpoint: Daq %s Qaplu' (%s)"
+			},
+			"loop_found":{
+				"en":"Infinite loop found at address %s, the same state repeated with no device I/O in between",
+				"pt":"Loop infinito encontrado no endereço %s, o mesmo estado se repetiu sem E/S de dispositivos entre eles",
+				"es":"Ciclo infinito encontrado en la posición %s, el mismo estado se repitió sin E/S de dispositivos entre ellos",
+				"tl":"gho' natlh tu'lu' Daq %s, Dotlh rap jan I/O Hutlh"
 			}
 		}
+	#Return the message in the language, or in English if it has no translation
 	def __call__(self, title, args=()):
-		return self.message[title][self.language] %(args)
+		message=self.message[title][self.language]
+		if message=="":
+			message=self.message[title]["en"]
+		return message %(args)
 	def presentation(self):
 		print("Hi, I'm C-3PO, human-cyborg relations, I'm fluent in over 6 million forms os communication.")
 	def fluencies(self):
@@ -0,0 +1,161 @@
+MAX_ADDR=0x0FFF
+#Maximum number of instructions in a single block
+MAX_BLOCK=64
+
+'''
+This class compiles the basic blocks of the code in the MVN memory
+into Python functions, so that a whole block is executed at once
+instead of one step at a time.
+A block starts in any address reached by the execution and goes until
+a jump (JP, JZ or JN, which are part of the block) or until an
+instruction that only the MVN can run (SC, RS, HM, GD, PD or OS, which
+are left out of the block).
+Each compiled function leaves the registers exactly as the steps of the
+block would and returns the number of instructions executed. Blocks are
+discarded when any word in their range is written.
+'''
+class compiler:
+
+	#Inicialize the compiler for the given MVN
+	def __init__(self, mvn):
+		self.mvn=mvn
+		# key:		start address
+		# value:	(function, number of instructions, set of addresses
+		#			of the instructions, bytes of the code compiled) or
+		#			None if no block starts there
+		self.blocks={}
+		# key:		byte address
+		# value:	start addresses of the blocks that contain it
+		self.owners={}
+
+	'''Return the block starting in addr, compiling it if needed, or
+	None if no block can start in addr'''
+	def get_block(self, addr):
+		try:
+			return self.blocks[addr]
+		except KeyError:
+			pass
+		instrs=self.scan(addr)
+		if instrs:
+			end=instrs[-1][0]+2
+			block=(self.build(instrs), len(instrs), {instr[0] for instr in instrs},
+				   bytes(self.mvn.mem.map[addr:end]))
+		else:
+			block=None
+			end=addr+2
+		self.blocks[addr]=block
+		for byte in range(addr, end):
+			self.owners.setdefault(byte, set()).add(addr)
+		return block
+
+	#Discard every block that contains the word written in addr
+	def invalidate(self, addr):
+		for byte in (addr, addr+1):
+			starts=self.owners.pop(byte, None)
+			if starts:
+				for start in starts:
+					self.blocks.pop(start, None)
+
+	#Discard every block whose code is no longer the one in memory
+	def revalidate(self):
+		mp=self.mvn.mem.map
+		for start, block in list(self.blocks.items()):
+			if block==None or mp[start:start+len(block[3])]!=block[3]:
+				del self.blocks[start]
+
+	#Discard every block
+	def clear(self):
+		self.blocks={}
+		self.owners={}
+
+	'''Return the list of (address, IR, instruction, OI) of the block
+	starting in start'''
+	def scan(self, start):
+		mvn=self.mvn
+		mp=mvn.mem.map
+		instrs=[]
+		pc=start
+		while len(instrs)<MAX_BLOCK and pc<MAX_ADDR:
+			word=mp[pc]<<8|mp[pc+1]
+			oi=word&0x0FFF
+			op=mvn.instru_translator[word>>12]
+			if op>=0xA:
+				break
+			#Leave to the MVN the accesses that raise errors
+			if op>=4 and oi>=MAX_ADDR:
+				break
+			if op>=8 and mvn.timeInterrupt and pc>=0x100 and oi<0x100:
+				break
+			instrs.append((pc, word, op, oi))
+			pc+=2
+			if op<=2:
+				break
+		#Self-modifying code ends the block in the store
+		end=pc
+		for index in range(len(instrs)):
+			pc, word, op, oi=instrs[index]
+			if op==9 and start<=oi+1 and oi<end:
+				return instrs[:index+1]
+		return instrs
+
+	'''Generate the source code of the block and compile it to a function
+	receiving the MVN, the memory bytearray, the memory and the ULA'''
+	def build(self, instrs):
+		lines=["def block(mvn, mp, mem, ula):",
+			   "	ac=mvn.AC.value"]
+		for index in range(len(instrs)):
+			pc, word, op, oi=instrs[index]
+			read=f"	m{index}=mp[{oi}]<<8|mp[{oi+1}]"
+			if op==0:
+				lines+=self.leave(instrs, index+1, str(oi), "	")
+			elif op==1:
+				lines+=["	if ac==0:"]+self.leave(instrs, index+1, str(oi), "		")
+				lines+=self.leave(instrs, index+1, str(pc+2), "	")
+			elif op==2:
+				lines+=["	if ac>=0x8000:"]+self.leave(instrs, index+1, str(oi), "		")
+				lines+=self.leave(instrs, index+1, str(pc+2), "	")
+			elif op==3:
+				lines+=[f"	ac={oi}"]
+			elif op==4:
+				lines+=[read, f"	ac=(ac+m{index})&0xFFFF"]
+			elif op==5:
+				lines+=[read, f"	ac=(ac-m{index})&0xFFFF"]
+			elif op==6:
+				lines+=[read, f"	ac=(ac*m{index})&0xFFFF"]
+			elif op==7:
+				#Division by zero is left to the MVN, to raise the error
+				lines+=[read, f"	if not m{index}:"]
+				lines+=self.leave(instrs, index, str(pc), "		")
+				lines+=[f"	ac=ula.div(ac, m{index})"]
+			elif op==8:
+				lines+=[read, f"	ac=m{index}"]
+			elif op==9:
+				lines+=[f"	mem.set_value({oi}, ac)"]
+		if instrs[-1][2]>2:
+			lines+=self.leave(instrs, len(instrs), str(instrs[-1][0]+2), "	")
+		namespace={}
+		exec(compile("\n".join(lines), f"<block {hex(instrs[0][0])}>", "exec"), namespace)
+		return namespace["block"]
+
+	'''Return the lines that set the registers as they are after the
+	first done instructions of the block, with IC:=ic, and return done'''
+	def leave(self, instrs, done, ic, indent):
+		if done==0:
+			return [indent+"return 0"]
+		pc, word, op, oi=instrs[done-1]
+		if 4<=op<=8:
+			mar, mdr=oi, f"m{done-1}"
+		elif op==9:
+			mar, mdr=oi, "ac"
+		else:
+			mar, mdr=pc, word
+		lines=[f"mvn.MAR.value={mar}",
+			   f"mvn.MDR.value={mdr}",
+			   f"mvn.IR.value={word}",
+			   f"mvn.OP.value={word>>12}",
+			   f"mvn.OI.value={oi}",
+			   "mvn.AC.value=ac",
+			   f"mvn.IC.value={ic}",
+			   f"mvn.nsteps+={done}",
+			   f"return {done}"]
+		return [indent+line for line in lines]
@@ -0,0 +1,92 @@
+from mvnutils import *
+
+#Handlers that may move IC backwards, besides OS: JP, JZ, JN, SC, RS and HM
+JUMPS=[0x0, 0x1, 0x2, 0xA, 0xB, 0xC]
+#Handlers that do device I/O: GD and PD
+DEVICES=[0xD, 0xE]
+#Supervisor calls with no effect outside the MVN: run, stack and logic
+PURE_CALLS=[0xEF, 0x57, 0x01]
+
+'''
+This class detects when an MVN is in an infinite loop, by finding a
+state of the machine (memory, registers, SP, secondary code state and,
+with time interruptions, the number of steps) that repeats with no
+device I/O in between.
+The state is sampled whenever IC moves backwards, as any loop does,
+and compared with a single saved state that is moved forward at powers
+of two (Brent's cycle detection), so the memory used is bounded and a
+loop is found within a few turns of it. The registers are compared
+first and the memory only when they match.
+It is installed over the MVN handlers of the instructions that jump or
+do I/O, so an MVN without a detector runs the original handlers with
+no extra cost.
+'''
+class detector:
+
+	#Inicialize the saved state and install the detector in the MVN
+	def __init__(self, mvn):
+		self.mvn=mvn
+		self.reset()
+		self.handlers=mvn.handlers
+		handlers=list(mvn.handlers)
+		for index in JUMPS:
+			handlers[index]=self.sampled(handlers[index])
+		for index in DEVICES:
+			handlers[index]=self.resetting(handlers[index])
+		handlers[0xF]=self.os(handlers[0xF])
+		mvn.handlers=handlers
+
+	#Remove the detector from the MVN
+	def uninstall(self):
+		self.mvn.handlers=self.handlers
+
+	#Forget the saved state, as after device I/O
+	def reset(self):
+		self.regs=None
+		self.mem=None
+		self.power=1
+		self.turns=0
+
+	'''Compare the state of the MVN with the saved one, raising MVNLoop
+	if they are equal, and move the saved state forward when turns
+	reaches power'''
+	def check(self):
+		mvn=self.mvn
+		regs=(mvn.MAR.value, mvn.MDR.value, mvn.IC.value, mvn.IR.value, mvn.OP.value,
+			  mvn.OI.value, mvn.AC.value, mvn.SP, mvn.end, getattr(mvn, "ret", None),
+			  mvn.nsteps if mvn.timeInterrupt else None)
+		if regs==self.regs and mvn.mem.map==self.mem:
+			raise MVNLoop("Laço infinito no endereço "+hex(mvn.IC.value)[2:].zfill(4))
+		self.turns+=1
+		if self.regs==None or self.turns==self.power:
+			self.regs=regs
+			self.mem=bytes(mvn.mem.map)
+			self.power*=2
+			self.turns=0
+
+	'''Return handler checking the state when it moves IC backwards
+	and the MVN goes on'''
+	def sampled(self, handler):
+		def sample():
+			ic=self.mvn.IC.value
+			goon=handler()
+			if goon and self.mvn.IC.value<=ic:
+				self.check()
+			return goon
+		return sample
+
+	#Return handler forgetting the saved state
+	def resetting(self, handler):
+		def reset():
+			self.reset()
+			return handler()
+		return reset
+
+	#Return the OS handler, forgetting the saved state on calls with I/O
+	def os(self, handler):
+		sample=self.sampled(handler)
+		def call():
+			if self.mvn.OI.value%0x100 not in PURE_CALLS:
+				self.reset()
+			return sample()
+		return call
@@ -1,10 +1,15 @@
 import subprocess
 import sys, select
+import os, mmap, io
 from mvnutils import *
 from switchcase import *
 
 MIN_VALUE=0x0000
 MAX_VALUE=0xFFFF
+#Characters kept by a screen before they are written
+SCREEN_SIZE=4096
+#Bytes read at once by a keyboard from its stream
+KEYBOARD_CHUNK=0x10000
 
 '''
 This class represents an simple I/O device for MVN, it can
@@ -13,18 +18,31 @@ or file (input and/or output).
 It contains methods to return weather the device is readable
 or writable, to input and output data, to get device type and 
 UC, to print the possible devices and to terminate it.
+Screens keep their output and write it at once when it reaches
+SCREEN_SIZE characters or when flushed, which the MVN does on halt and
+before reading the keyboard. Screens writing to a terminal also write
+it when the program prints a line feed.
+Disks map the file read in memory instead of loading it, and the file
+written is only flushed when the device is flushed or terminated.
+Keyboards read sys.stdin a line at a time or, if given a stream, read 
+it in chunks, keeping the bytes in a bytearray consumed by a cursor.
+Printers spool the words printed and submit them as a single job to
+the print command (lpr by default) only when submitted, which is done
+on halt, when the device is terminated and on request of the program
+(OS 0x0D with AC=2), never on a flush.
 '''
 class device:
 
 	'''Inicialize the device given the type, the UC and other
 	convinient parameters'''
-	def __init__(self, dtype, UC, file=None, rwb=None, printer=None, quiet=False, line_feed="\n"):
+	def __init__(self, dtype, UC, file=None, rwb=None, printer=None, quiet=False, line_feed="\n", sink=None, stream=None, print_command=None):
 		valid_type(dtype)
 		self.dtype=dtype
 		self.UC=UC
 		self.quiet=quiet
 		if self.dtype==3:
 			valid_rwb(rwb)
+			self.rwb=rwb
 			switch(rwb)
 			if case("e"):
 				self.file_write=open(file, "wb")
@@ -33,16 +51,28 @@ class device:
 				valid_file(file)
 				self.file_write=None
 				self.file_read=open(file, "rb")
-				self.buffer=self.file_read.read()
+				self.buffer=b""
+				#Offset of the next word to be read
 				self.counter=0
+				#Size of the file when it was last mapped
+				self.limit=0
 				self.file=file
+				self.map_file()
 		elif self.dtype==2:
-			valid_printer(printer)
+			if print_command==None:
+				valid_printer(printer)
 			self.printer=printer
+			#Command given the job on its input, lpr if None
+			self.print_command=print_command
+			self.spool=bytearray()
 		elif self.dtype==0:
-			self.buffer=[]
+			self.set_stream(stream)
 		elif self.dtype==1:
 			self.line_feed=line_feed
+			#File the screen writes to, sys.stdout if None
+			self.sink=sink
+			self.out=[]
+			self.size=0
 
 	#Return True weather the device is readable
 	def is_readable(self):
@@ -71,32 +101,32 @@ class device:
 	def get_data(self, limit):
 		if not self.is_readable():
 			raise MVNError("Unreadable device")
-		switch(self.dtype)
-		if case(0):
-			if len(self.buffer)<2:
-				if limit==None:
-					read=input()
-					for nibble in read:
-						self.buffer.append(ord(nibble))
-					self.buffer.append(ord("\n"))
+		if self.dtype==0:
+			if len(self.buffer)-self.cursor<2:
+				del self.buffer[:self.cursor]
+				self.cursor=0
+				if self.stream!=None:
+					while len(self.buffer)<2 and self.read_stream():
+						pass
+				elif limit==None:
+					self.buffer+=(input()+"\n").encode("latin-1", "replace")
 				else:
 					read, o, e = select.select( [sys.stdin], [], [], limit/1000)
 					if read:
-						for nibble in sys.stdin.readline().strip():
-							self.buffer.append(ord(nibble))
+						self.buffer+=(sys.stdin.readline().strip()+"\n").encode("latin-1", "replace")
 					else:
 						if self.quiet:
 							print("Not enough data on buffer, returning 0x0000")
 						return 0x0000
-					self.buffer.append(ord("\n"))
-			if len(self.buffer)>1:
-				return self.buffer.pop(0)*0x0100+self.buffer.pop(0)
+			if len(self.buffer)-self.cursor>1:
+				self.cursor+=2
+				return self.buffer[self.cursor-2]*0x0100+self.buffer[self.cursor-1]
 			else:
 				if self.quiet:
 					print("Not enough data on buffer, returning 0x0000")
 				return 0x0000
-		elif case(3):
-			if self.counter+2>len(self.buffer):
+		elif self.dtype==3:
+			if self.counter+2>self.limit:
 				if self.quiet: print("No more data to get, returning 0x0000")
 				return 0x0000
 			else:
@@ -109,45 +139,147 @@ class device:
 		if not self.is_writable():
 			raise MVNError("Unwritable device")
 		valid_value(value, MIN_VALUE, MAX_VALUE)
-		switch(self.dtype)
-		if case(1):
-			print(chr(value//0x0100)+chr(value%0x0100), end=self.line_feed)
-		elif case(2):
-			out=open("will_print.txt", "rb")
-			out.write(value//0x0100)
-			out.write(value%0x0100)
-			subprocess.run("lpr -P "+self.printer+" will_print.txt")
-			subprocess.run("rm will_print.txt")
-		elif case(3):
-			self.file_write.write((value//0x0100).to_bytes(1,byteorder="big"))
-			self.file_write.write((value%0x0100).to_bytes(1,byteorder="big"))
-			self.file_write.flush()
+		if self.dtype==1:
+			text=chr(value//0x0100)+chr(value%0x0100)
+			self.out.append(text+self.line_feed)
+			self.size+=len(text)+len(self.line_feed)
+			if self.size>=SCREEN_SIZE or ("\n" in text and self.interactive()):
+				self.flush()
+		elif self.dtype==2:
+			self.spool+=bytes((value//0x0100, value%0x0100))
+		elif self.dtype==3:
+			self.file_write.write(bytes((value//0x0100, value%0x0100)))
+
+	#Return True weather the screen writes to a terminal
+	def interactive(self):
+		isatty=getattr(self.sink if self.sink!=None else sys.stdout, "isatty", None)
+		return isatty!=None and isatty()
+
+	'''Make the keyboard read from stream, a file (text or binary) or
+	the bytes (or text) typed, instead of sys.stdin if it is None'''
+	def set_stream(self, stream):
+		if isinstance(stream, str):
+			stream=stream.encode("latin-1", "replace")
+		if isinstance(stream, (bytes, bytearray)):
+			stream=io.BytesIO(stream)
+		self.stream=stream
+		self.buffer=bytearray()
+		self.cursor=0
+		#Weather the last line read from the stream has no line feed yet
+		self.line_open=False
+
+	'''Read the next chunk of the stream to the buffer, return False
+	at its end, where the last line is ended with a line feed as 
+	input() would'''
+	def read_stream(self):
+		read=getattr(self.stream, "read1", self.stream.read)
+		data=read(KEYBOARD_CHUNK)
+		if isinstance(data, str):
+			data=data.encode("latin-1", "replace")
+		if data:
+			self.buffer+=data
+			self.line_open=data[-1]!=ord("\n")
+			return True
+		if self.line_open:
+			self.buffer.append(ord("\n"))
+			self.line_open=False
+		return False
+
+	'''Map the file read in memory, so the words appended to it since
+	it was last mapped can be read'''
+	def map_file(self):
+		size=os.fstat(self.file_read.fileno()).st_size
+		if size==self.limit:
+			return
+		if isinstance(self.buffer, mmap.mmap):
+			self.buffer.close()
+		self.buffer=mmap.mmap(self.file_read.fileno(), 0, access=mmap.ACCESS_READ) if size>0 else b""
+		self.limit=size
 
 	def append_buffer(self):
 		if not self.is_readable() or self.dtype != 3:
 			raise MVNError("Unreadable device")
-		self.file_read.close()
-		self.file_read=open(self.file, "rb")
-		self.buffer=self.file_read.read()
+		self.map_file()
 
 	def clean_buffer(self):
 		if not self.has_buffer():
 			raise MVNError("No buffer to be cleaned")
 		switch(self.dtype)
 		if case(0):
-			self.buffer=[]
+			self.buffer=bytearray()
+			self.cursor=0
 		elif case(3):
-			self.buffer=""
-			self.counter=0
+			self.counter=self.limit
+
+	#Write the output kept by the device
+	def flush(self):
+		if self.dtype==1 and self.out:
+			(self.sink if self.sink!=None else sys.stdout).write("".join(self.out))
+			self.out=[]
+			self.size=0
+		elif self.dtype==3 and self.file_write!=None:
+			self.file_write.flush()
+
+	'''Write the output kept by the device, printers send the words 
+	spooled as one job'''
+	def submit(self):
+		if self.dtype!=2:
+			self.flush()
+		elif self.spool:
+			command=self.print_command if self.print_command!=None else ["lpr", "-P", self.printer]
+			job=bytes(self.spool)
+			self.spool=bytearray()
+			try:
+				subprocess.run(command, input=job, check=True)
+			except (OSError, subprocess.CalledProcessError):
+				raise MVNError("Impressora invalida")
+
+	#Return the state of the device buffers, to be given to set_state
+	def get_state(self):
+		if self.dtype==0:
+			return bytes(self.buffer[self.cursor:])
+		elif self.dtype==1:
+			return "".join(self.out)
+		elif self.dtype==2:
+			return bytes(self.spool)
+		elif self.dtype==3:
+			if self.file_read!=None:
+				return (self.counter, self.limit)
+			return self.file_write.tell()
+
+	#Set the state of the device buffers returned by get_state
+	def set_state(self, state):
+		if self.dtype==0:
+			self.buffer=bytearray(state)
+			self.cursor=0
+		elif self.dtype==1:
+			self.out=[state] if state else []
+			self.size=len(state)
+		elif self.dtype==2:
+			self.spool=bytearray(state)
+		elif self.dtype==3:
+			if self.file_read!=None:
+				self.counter, limit=state
+				self.map_file()
+				self.limit=min(limit, self.limit)
+			else:
+				self.file_write.seek(state)
+				self.file_write.truncate()
 
 	#Ends up the device
 	def terminate(self):
+		self.submit()
 		if self.dtype==3:
 			try:
 				self.file_write.close()
 			except:
 				pass
 
+			try:
+				self.buffer.close()
+			except:
+				pass
+
 			try:
 				self.file_read.close()
 			except:
@@ -0,0 +1,73 @@
+from collections import deque
+
+'''
+This class keeps a bounded log of what each step of an MVN changed,
+so that steps can be undone one by one.
+Each entry holds the registers changed by the step with their old
+values, the old value of each memory word written, the old number of
+steps and the old secondary code state if it changed. Device I/O is
+not undone.
+It is installed as a hook over the MVN step and memory set_value
+methods, so an MVN without history runs the original methods with no
+extra cost.
+'''
+class history:
+
+	#Inicialize the log, keeping at most limit steps, and install it
+	def __init__(self, mvn, limit=100000):
+		self.mvn=mvn
+		self.log=deque(maxlen=limit)
+		self.writes=None
+		self.registers=[mvn.MAR, mvn.MDR, mvn.IC, mvn.IR, mvn.OP, mvn.OI, mvn.AC]
+		mvn.add_hook(mvn, "step", self.step)
+		mvn.add_hook(mvn.mem, "set_value", self.logged_set_value)
+
+	#Remove the history from the MVN
+	def uninstall(self):
+		self.mvn.remove_hook(self.mvn, "step", self.step)
+		self.mvn.remove_hook(self.mvn.mem, "set_value", self.logged_set_value)
+
+	#Step of the MVN, logging what it changes
+	def step(self, mvn_step):
+		mvn=self.mvn
+		before=[register.value for register in self.registers]
+		nsteps=mvn.nsteps
+		sub=(mvn.end, getattr(mvn, "ret", None))
+		self.writes=[]
+		try:
+			return mvn_step()
+		finally:
+			changed=tuple((index, before[index]) for index in range(len(before))
+						  if self.registers[index].value!=before[index])
+			if sub==(mvn.end, getattr(mvn, "ret", None)):
+				sub=None
+			self.log.append((changed, tuple(self.writes), nsteps, sub))
+			self.writes=None
+
+	#Memory set_value, logging the old value of the word while stepping
+	def logged_set_value(self, set_value, addr, value):
+		if self.writes!=None:
+			self.writes.append((addr, self.mvn.mem.map[addr]<<8|self.mvn.mem.map[addr+1]))
+		set_value(addr, value)
+
+	'''Undo the last step logged, return False if there is none. The
+	writes undone are not seen by the watchpoints'''
+	def back(self):
+		if not self.log:
+			return False
+		changed, writes, nsteps, sub=self.log.pop()
+		set_value=self.mvn.next_hook(self.mvn.mem, "set_value", self.logged_set_value)
+		hit=self.mvn.mem.hit
+		for addr, value in reversed(writes):
+			set_value(addr, value)
+		self.mvn.mem.hit=hit
+		for index, value in changed:
+			self.registers[index].value=value
+		self.mvn.nsteps=nsteps
+		if sub!=None:
+			self.mvn.end, self.mvn.ret=sub
+		return True
+
+	#Number of steps that can be undone
+	def __len__(self):
+		return len(self.log)
@@ -0,0 +1,51 @@
+import functools
+
+'''
+This class keeps the chain of hooks installed over one method of an
+object (the MVN step, the memory get_value or set_value), so the hooks
+can be installed and removed in any order.
+Each hook is called with the next callable of the chain, the hook
+installed before it or the original method, as its first argument.
+The chain is rebuilt whenever a hook is installed or removed, and the
+original method is put back with the last hook, so an object with no
+hooks runs the original method with no extra cost.
+'''
+class hook_chain:
+
+	def __init__(self, target, name):
+		self.target=target
+		self.name=name
+		#True if the original method is an instance attribute
+		self.own=name in target.__dict__
+		self.original=getattr(target, name)
+		#Hooks from the first installed (the innermost) to the last
+		self.hooks=[]
+		#Callable passed to each hook of hooks
+		self.inner=[]
+
+	def install(self, hook):
+		self.hooks.append(hook)
+		self.rebuild()
+
+	#Remove hook from wherever it is in the chain
+	def uninstall(self, hook):
+		self.hooks.remove(hook)
+		self.rebuild()
+
+	#Return the callable that hook calls, so it can skip itself
+	def next(self, hook):
+		return self.inner[self.hooks.index(hook)]
+
+	def rebuild(self):
+		call=self.original
+		self.inner=[]
+		for hook in self.hooks:
+			self.inner.append(call)
+			call=functools.partial(hook, call)
+		if self.hooks or self.own:
+			setattr(self.target, self.name, call)
+		elif self.name in self.target.__dict__:
+			delattr(self.target, self.name)
+
+	def __len__(self):
+		return len(self.hooks)
@@ -0,0 +1,67 @@
+import struct
+import memory
+from mvnutils import *
+
+#Magic, version, reserved byte and number of segments
+HEADER=struct.Struct(">4sBBH")
+#Start and length in bytes of a segment
+SEGMENT=struct.Struct(">HH")
+MAGIC=b"MVNI"
+VERSION=1
+#Size of the memory blob
+SIZE=memory.MAX_ADDR+1
+
+'''
+Binary memory images: an header, the segments of memory written by the
+program as (start, length) ranges and a blob with the whole memory,
+so loading one is copying the segments of the blob to the memory, with
+no text to parse nor words to check.
+Images are made from .mvn files by mvnImage.py, with the .mvi extension.
+'''
+
+#Return True if data is a binary image
+def is_image(data):
+	return data[:len(MAGIC)]==MAGIC
+
+'''Return the image of code, a list of [addr, value] pairs as returned
+by parse_mvn, raise error if an address or value is invalid'''
+def build(code):
+	blob=memory.memory().map
+	written=bytearray(SIZE)
+	for data in code:
+		addr=int(data[0], 16)
+		value=int(data[1], 16)
+		valid_value(addr, memory.MIN_ADDR, memory.MAX_ADDR-1)
+		valid_value(value, memory.MIN_VALUE, memory.MAX_VALUE)
+		blob[addr]=value>>8
+		blob[addr+1]=value&0xFF
+		written[addr]=1
+		written[addr+1]=1
+	segments=[]
+	start=None
+	for addr in range(SIZE+1):
+		if addr<SIZE and written[addr]:
+			if start==None:
+				start=addr
+		elif start!=None:
+			segments.append(SEGMENT.pack(start, addr-start))
+			start=None
+	return HEADER.pack(MAGIC, VERSION, 0, len(segments))+b"".join(segments)+bytes(blob)
+
+#Return the image of the text of an .mvn file
+def convert(text):
+	return build(parse_mvn(text))
+
+'''Return the segments, as (start, length) pairs, and the blob of an
+image, raise error if it is not a valid image'''
+def read(data):
+	if len(data)<HEADER.size:
+		raise MVNError("Imagem inválida")
+	magic, version, reserved, count=HEADER.unpack_from(data)
+	if magic!=MAGIC or version!=VERSION or len(data)!=HEADER.size+count*SEGMENT.size+SIZE:
+		raise MVNError("Imagem inválida")
+	segments=list(SEGMENT.iter_unpack(data[HEADER.size:HEADER.size+count*SEGMENT.size]))
+	for start, length in segments:
+		if start+length>SIZE:
+			raise MVNError("Imagem inválida")
+	return segments, memoryview(data)[HEADER.size+count*SEGMENT.size:]
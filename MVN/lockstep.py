@@ -0,0 +1,309 @@
+import MVN
+import ULA
+import device
+import io
+import contextlib
+from mvnutils import *
+try:
+	import numpy as np
+except ImportError:
+	np=None
+
+MAX_ADDR=0x0FFF
+
+'''
+This class runs many copies of the program loaded in an MVN at once,
+each one with its own keyboard input, in lockstep: the memory of the
+copies is an (N, 4096) array of bytes and each register an array of N
+values, so each step is done for every copy with array operations,
+grouping the copies by the instruction they execute.
+The arithmetic is done by the word functions of ULA, over arrays. Supervisor calls
+are executed one copy at a time by a scratch MVN, except the device
+operations (0x0D), done on the keyboard and screen of the copy. Only the
+keyboard (0, 0) and the screen (1, 0) devices are available and there
+are no time interruptions; a copy that uses other devices stops with an
+error.
+It needs numpy.
+'''
+class lockstep:
+
+	'''Inicialize N=len(inputs) copies of the memory and registers of
+	mvn, the copy i reading inputs[i] (bytes or text) on the keyboard'''
+	def __init__(self, mvn, inputs):
+		if np==None:
+			raise MVNError("lockstep needs numpy")
+		if mvn.timeInterrupt:
+			raise MVNError("lockstep does not support time interruptions")
+		n=len(inputs)
+		self.n=n
+		self.line_feed=mvn.line_feed
+		self.mem=np.tile(np.frombuffer(bytes(mvn.mem.map), dtype=np.uint8), (n, 1))
+		self.MAR=np.full(n, mvn.MAR.value, dtype=np.int64)
+		self.MDR=np.full(n, mvn.MDR.value, dtype=np.int64)
+		self.IC=np.full(n, mvn.IC.value, dtype=np.int64)
+		self.IR=np.full(n, mvn.IR.value, dtype=np.int64)
+		self.AC=np.full(n, mvn.AC.value, dtype=np.int64)
+		self.SP=np.full(n, mvn.SP, dtype=np.int64)
+		self.end=np.full(n, mvn.end, dtype=bool)
+		self.ret=np.full(n, getattr(mvn, "ret", 0), dtype=np.int64)
+		#MVN where the copies execute the supervisor calls
+		self.scratch=MVN.MVN(line_feed=mvn.line_feed, quiet=mvn.quiet)
+		self.steps=np.zeros(n, dtype=np.int64)
+		self.running=np.ones(n, dtype=bool)
+		self.reasons=[None]*n
+		self.errors=[None]*n
+		self.outputs=[[] for i in range(n)]
+		#Keyboard input of each copy and the offset of the next word
+		self.inputs=[]
+		for data in inputs:
+			if isinstance(data, str):
+				data=data.encode("latin-1", "replace")
+			if data and data[-1:]!=b"\n":
+				data+=b"\n"
+			self.inputs.append(data)
+		self.cursors=[0]*n
+		# key:		opcode
+		# value:	method that executes it for the copies given
+		self.handlers={0x0: self.jp, 0x1: self.jz, 0x2: self.jn, 0x3: self.lv,
+					   0x4: self.arithmetic, 0x5: self.arithmetic, 0x6: self.arithmetic,
+					   0x7: self.arithmetic, 0x8: self.ld, 0x9: self.mm, 0xA: self.sc,
+					   0xB: self.rs, 0xC: self.hm, 0xD: self.gd, 0xE: self.pd, 0xF: self.os}
+
+	'''Run every copy until it halts, fails or executes max_steps steps
+	(one limit for all or one per copy). Return the reason each copy
+	stopped (MVN.HALT, MVN.STEP_LIMIT or MVN.ERROR) and its number of
+	steps, as MVN.run; errors and outputs keep the error and the screen
+	output of each copy'''
+	def run(self, max_steps):
+		limits=np.broadcast_to(np.asarray(max_steps, dtype=np.int64), (self.n,))
+		while True:
+			done=np.flatnonzero(self.running & (self.steps>=limits))
+			for lane in done:
+				self.stop(lane, MVN.STEP_LIMIT)
+			lanes=np.flatnonzero(self.running)
+			if len(lanes)==0:
+				break
+			lanes=lanes[self.valid(lanes, self.IC[lanes])]
+			if len(lanes)==0:
+				continue
+			ic=self.IC[lanes]
+			ir=self.read(lanes, ic)
+			self.MAR[lanes]=ic
+			self.MDR[lanes]=ir
+			self.IR[lanes]=ir
+			self.steps[lanes]+=1
+			ops=ir>>12
+			first=ops[0]
+			if (ops==first).all():
+				self.handlers[first](first, lanes, ir&0xFFF)
+			else:
+				for op in np.unique(ops):
+					sel=ops==op
+					self.handlers[op](op, lanes[sel], ir[sel]&0xFFF)
+		return [(self.reasons[lane], int(self.steps[lane])) for lane in range(self.n)]
+
+	#Return the screen output of each copy
+	def output(self):
+		return ["".join(out) for out in self.outputs]
+
+	#Stop the copy lane with reason and error
+	def stop(self, lane, reason, error=None):
+		self.running[lane]=False
+		self.reasons[lane]=reason
+		self.errors[lane]=error
+
+	'''Stop with an error the copies in lanes whose addr is not the
+	address of a word, as memory would, and return which are valid'''
+	def valid(self, lanes, addr):
+		ok=addr<MAX_ADDR
+		for lane in lanes[~ok]:
+			self.stop(lane, MVN.ERROR, MVNError("Incompatible size"))
+		return ok
+
+	#Return the words in addr of the memory of each copy in lanes
+	def read(self, lanes, addr):
+		return self.mem[lanes, addr].astype(np.int64)<<8|self.mem[lanes, addr+1]
+
+	#Write value in addr of the memory of each copy in lanes
+	def write(self, lanes, addr, value):
+		self.mem[lanes, addr]=value>>8
+		self.mem[lanes, addr+1]=value&0xFF
+
+	#IC:=OI
+	def jp(self, op, lanes, oi):
+		self.IC[lanes]=oi
+
+	#IC:=OI if AC is 0, IC:=IC+2 otherwise
+	def jz(self, op, lanes, oi):
+		self.IC[lanes]=np.where(self.AC[lanes]==0, oi, self.IC[lanes]+2)
+
+	#IC:=OI if AC is negative, IC:=IC+2 otherwise
+	def jn(self, op, lanes, oi):
+		self.IC[lanes]=np.where(self.AC[lanes]>=0x8000, oi, self.IC[lanes]+2)
+
+	#AC:=OI
+	def lv(self, op, lanes, oi):
+		self.AC[lanes]=oi
+		self.IC[lanes]+=2
+
+	'''MAR:=OI, MDR:=mem(MAR), AC:=ULA op over AC and MDR, for the
+	operations 4 to 7 (add, sub, mul and div)'''
+	def arithmetic(self, op, lanes, oi):
+		ok=self.valid(lanes, oi)
+		lanes, oi=lanes[ok], oi[ok]
+		mdr=self.read(lanes, oi)
+		ac=self.AC[lanes]
+		self.MAR[lanes]=oi
+		self.MDR[lanes]=mdr
+		if op==0x4:
+			ac=ULA.add_words(ac, mdr)
+		elif op==0x5:
+			ac=ULA.sub_words(ac, mdr)
+		elif op==0x6:
+			ac=ULA.mul_words(ac, mdr)
+		else:
+			zero=mdr==0
+			for lane in lanes[zero]:
+				self.stop(lane, MVN.ERROR, ZeroDivisionError("integer division or modulo by zero"))
+			lanes, ac, mdr=lanes[~zero], ac[~zero], mdr[~zero]
+			ac=ULA.div_words(ac, mdr)
+		self.AC[lanes]=ac
+		self.IC[lanes]+=2
+
+	#MAR:=OI, MDR:=mem(MAR), AC:=MDR
+	def ld(self, op, lanes, oi):
+		ok=self.valid(lanes, oi)
+		lanes, oi=lanes[ok], oi[ok]
+		mdr=self.read(lanes, oi)
+		self.MAR[lanes]=oi
+		self.MDR[lanes]=mdr
+		self.AC[lanes]=mdr
+		self.IC[lanes]+=2
+
+	#MAR:=OI, MDR:=AC, mem(MAR):=MDR
+	def mm(self, op, lanes, oi):
+		ok=self.valid(lanes, oi)
+		lanes, oi=lanes[ok], oi[ok]
+		self.MAR[lanes]=oi
+		self.MDR[lanes]=self.AC[lanes]
+		self.write(lanes, oi, self.AC[lanes])
+		self.IC[lanes]+=2
+
+	#MAR:=OI, MDR:=IC+2, mem(MAR):=MDR, IC:=OI+2
+	def sc(self, op, lanes, oi):
+		ok=self.valid(lanes, oi)
+		lanes, oi=lanes[ok], oi[ok]
+		self.MAR[lanes]=oi
+		self.MDR[lanes]=self.IC[lanes]+2
+		self.write(lanes, oi, self.MDR[lanes])
+		self.IC[lanes]=oi+2
+
+	#MAR:=OI, MDR:=mem(MAR), IC:=MDR
+	def rs(self, op, lanes, oi):
+		ok=self.valid(lanes, oi)
+		lanes, oi=lanes[ok], oi[ok]
+		mdr=self.read(lanes, oi)
+		self.MAR[lanes]=oi
+		self.MDR[lanes]=mdr
+		self.IC[lanes]=mdr
+
+	#End of the program, or of the secondary code that returns to ret
+	def hm(self, op, lanes, oi):
+		end=self.end[lanes]
+		for lane in lanes[end]:
+			self.stop(lane, MVN.HALT)
+		lanes=lanes[~end]
+		self.end[lanes]=True
+		self.IC[lanes]=self.ret[lanes]
+
+	#AC:=word typed on the keyboard, 0 when the input ended
+	def gd(self, op, lanes, oi):
+		for lane, code in zip(lanes, oi):
+			if code!=0x000:
+				self.stop(lane, MVN.ERROR, MVNError("Dispositivo não suportado"))
+				continue
+			data, cursor=self.inputs[lane], self.cursors[lane]
+			if cursor+2<=len(data):
+				self.AC[lane]=data[cursor]<<8|data[cursor+1]
+				self.cursors[lane]=cursor+2
+			else:
+				self.AC[lane]=0
+			self.IC[lane]+=2
+
+	#Write AC on the screen
+	def pd(self, op, lanes, oi):
+		for lane, code in zip(lanes, oi):
+			if code!=0x100:
+				self.stop(lane, MVN.ERROR, MVNError("Dispositivo não suportado"))
+				continue
+			value=int(self.AC[lane])
+			self.outputs[lane].append(chr(value>>8)+chr(value&0xFF)+self.line_feed)
+			self.IC[lane]+=2
+
+	'''Send OI to the supervisor of the scratch MVN, loading each copy
+	in it and storing it back, or do the device operation of each copy'''
+	def os(self, op, lanes, oi):
+		dev=oi%0x100==0x0D
+		for lane in lanes[dev]:
+			self.os_device(lane)
+		lanes=lanes[~dev]
+		mvn=self.scratch
+		registers=(mvn.MAR, mvn.MDR, mvn.IC, mvn.IR, mvn.AC)
+		arrays=(self.MAR, self.MDR, self.IC, self.IR, self.AC)
+		for lane in lanes:
+			mvn.mem.map[:]=self.mem[lane].tobytes()
+			for register, array in zip(registers, arrays):
+				register.value=int(array[lane])
+			mvn.OP.value=0xF
+			mvn.OI.value=int(self.IR[lane])&0xFFF
+			mvn.SP=int(self.SP[lane])
+			mvn.end=bool(self.end[lane])
+			mvn.ret=int(self.ret[lane])
+			out=io.StringIO()
+			try:
+				with contextlib.redirect_stdout(out):
+					mvn.os()
+			except Exception as error:
+				self.stop(lane, MVN.ERROR, error)
+				continue
+			finally:
+				self.outputs[lane].append(out.getvalue())
+			self.mem[lane]=np.frombuffer(mvn.mem.map, dtype=np.uint8)
+			for register, array in zip(registers, arrays):
+				array[lane]=register.value
+			self.SP[lane]=mvn.SP
+			self.end[lane]=mvn.end
+			self.ret[lane]=mvn.ret
+
+	'''Operate the device given in mem(MAR-2) as given by AC, as
+	MVN.os_device does: cleaning the keyboard drops the input it would
+	have read in its buffer, submitting to the keyboard or the screen
+	does nothing, as the screen output is kept in outputs'''
+	def os_device(self, lane):
+		oi=int(self.IR[lane])&0xFFF
+		if oi//0x100!=1:
+			self.stop(lane, MVN.ERROR, MVNError("1 arguments expecteds, "+str(oi//0x100)+" passed."))
+			return
+		addr=int(self.MAR[lane])-2
+		if not 0<=addr<MAX_ADDR:
+			self.stop(lane, MVN.ERROR, MVNError("Incompatible size"))
+			return
+		self.MAR[lane]=addr
+		self.MDR[lane]=code=int(self.mem[lane, addr])<<8|int(self.mem[lane, addr+1])
+		operation=int(self.AC[lane])
+		if code not in [0x000, 0x100]:
+			self.stop(lane, MVN.ERROR, MVNError("Dispositivo não suportado"))
+			return
+		if operation==0:
+			if code!=0x000:
+				self.stop(lane, MVN.ERROR, MVNError("No buffer to be cleaned"))
+				return
+			#The keyboard reads its input in chunks, when its buffer runs out
+			cursor=self.cursors[lane]
+			self.cursors[lane]=min(len(self.inputs[lane]), -(-cursor//device.KEYBOARD_CHUNK)*device.KEYBOARD_CHUNK)
+		elif operation==1:
+			self.stop(lane, MVN.ERROR, MVNError("Unreadable device"))
+			return
+		elif operation!=2 and self.scratch.quiet:
+			self.outputs[lane].append("Operador desconhecido. Código "+str(operation)+"\n")
+		self.IC[lane]+=2
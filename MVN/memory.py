@@ -1,15 +1,24 @@
-import address
 from mvnutils import *
 
 MIN_ADDR=0x0000
 MAX_ADDR=0x0FFF
 MIN_VALUE=0x0000
 MAX_VALUE=0xFFFF
+#Memory is split in pages of 2**PAGE_BITS bytes for snapshots
+PAGE_BITS=8
+PAGES=(MAX_ADDR+1)>>PAGE_BITS
 
 '''
 This class represents the memory of the MVN, it has an 
 collection of addresses that vary from 0x0000 to 0xFFFF.
-It contains methods to get, set and print those values.
+The addresses are kept as bytes of a single bytearray, so
+each word is made by the pair map[addr], map[addr+1].
+It contains methods to get, set and print those values and to
+take and restore snapshots of the memory, where each snapshot is a
+tuple of immutable pages shared with the previous snapshot until 
+they are written.
+Ranges of addresses can be watched, any read or write of a watched
+word is kept in hit for the debugger to stop on it.
 '''
 class memory:
 
@@ -17,22 +26,110 @@ class memory:
 	(default 0x0000) in every position'''
 	def __init__(self, value=0x0000):
 		valid_value(value, MIN_VALUE, MAX_VALUE)
-		self.map=[]
-		for cont in range(MAX_ADDR//2):
-			self.map.append(address.address(2*cont, value//0x100))
-			self.map.append(address.address(2*cont+1, value-(value//0x100)*0x100))
-		self.map.append(address.address(MAX_ADDR-1, 0x0f))
-		self.map.append(address.address(MAX_ADDR, 0xfc))
+		self.map=bytearray((value>>8, value&0xFF))*(MAX_ADDR//2)
+		self.map+=bytearray((0x0f, 0xfc))
+		#Called with the address of every word written, if set
+		self.on_write=None
+		#Pages of the last snapshot taken or restored
+		self.pages=None
+		#Pages written since the last snapshot taken or restored
+		self.dirty=set()
+		#Watched ranges as (ini, fim, modes), None if there is none
+		self.watches=None
+		#Last watched access as (addr, mode), until cleared by the reader
+		self.hit=None
 
 	def get_value(self, addr):
-		valid_value(addr, MIN_ADDR, MAX_ADDR)
-		return self.map[addr].get_value()*0x100+self.map[addr+1].get_value()
+		valid_value(addr, MIN_ADDR, MAX_ADDR-1)
+		if self.watches!=None:
+			self.trap(addr, "r")
+		return self.map[addr]<<8|self.map[addr+1]
 
 	def set_value(self, addr, value):
-		valid_value(addr, MIN_ADDR, MAX_ADDR)
+		valid_value(addr, MIN_ADDR, MAX_ADDR-1)
 		valid_value(value, MIN_VALUE, MAX_VALUE)
-		self.map[addr].set_value(value//0x100)
-		self.map[addr+1].set_value(value-(value//0x100)*0x100)
+		self.map[addr]=value>>8
+		self.map[addr+1]=value&0xFF
+		self.dirty.add(addr>>PAGE_BITS)
+		self.dirty.add((addr+1)>>PAGE_BITS)
+		if self.on_write!=None:
+			self.on_write(addr)
+		if self.watches!=None:
+			self.trap(addr, "w")
+
+	'''Set the word given by the user, it is checked even in trusted
+	mode and goes through set_value'''
+	def set_checked_value(self, addr, value):
+		valid_value(addr, MIN_ADDR, MAX_ADDR-1)
+		valid_value(value, MIN_VALUE, MAX_VALUE)
+		self.set_value(addr, value)
+
+	'''Copy the segments of blob, as (start, length) pairs of a binary
+	image, to the memory, with no check of the values and, as restore,
+	with no call to on_write'''
+	def load(self, segments, blob):
+		for start, length in segments:
+			stop=start+length
+			self.map[start:stop]=blob[start:stop]
+			self.dirty.update(range(start>>PAGE_BITS, ((stop-1)>>PAGE_BITS)+1))
+
+	'''Return the instruction in addr, instruction fetches are not
+	seen as reads by the watchpoints'''
+	def fetch(self, addr):
+		valid_value(addr, MIN_ADDR, MAX_ADDR-1)
+		return self.map[addr]<<8|self.map[addr+1]
+
+	'''Watch the words from ini to fim (inclusive) for the accesses in 
+	modes, "r" for reads and "w" for writes'''
+	def watch(self, ini, fim, modes="rw"):
+		valid_value(ini, MIN_ADDR, MAX_ADDR)
+		valid_value(fim, MIN_ADDR, MAX_ADDR)
+		if self.watches==None:
+			self.watches=[]
+		self.watches.append((ini, fim, modes))
+
+	#Remove every watchpoint
+	def unwatch(self):
+		self.watches=None
+		self.hit=None
+
+	#Keep in hit the access to the word in addr if it is watched
+	def trap(self, addr, mode):
+		for ini, fim, modes in self.watches:
+			if mode in modes and ini<=addr+1 and addr<=fim:
+				self.hit=(addr, mode)
+				return
+
+	'''Return a snapshot of the memory, copying only the pages written
+	since the last snapshot taken or restored and sharing the others'''
+	def snapshot(self):
+		if self.pages==None:
+			changed=range(PAGES)
+			pages=[None]*PAGES
+		else:
+			changed=self.dirty
+			pages=list(self.pages)
+		for page in changed:
+			pages[page]=bytes(self.map[page<<PAGE_BITS:(page+1)<<PAGE_BITS])
+		self.pages=tuple(pages)
+		self.dirty=set()
+		return self.pages
+
+	'''Restore a snapshot of the memory, copying only the pages that 
+	differ from it, and return the set of pages copied'''
+	def restore(self, pages):
+		if self.pages==None:
+			changed=set(range(PAGES))
+		else:
+			changed=self.dirty
+			for page in range(PAGES):
+				if pages[page] is not self.pages[page]:
+					changed.add(page)
+		for page in changed:
+			self.map[page<<PAGE_BITS:(page+1)<<PAGE_BITS]=pages[page]
+		self.pages=pages
+		self.dirty=set()
+		return changed
 
 	def show(self, start, stop, arq):
 		valid_value(start, MIN_ADDR, MAX_ADDR)
@@ -50,14 +147,14 @@ class memory:
 		final_index=stop-final_line*0x0010
 		if current_line==final_line:
 			while current_index<=final_index:
-				line+=hex(self.map[current_line*0x0010+current_index].get_value())[2:].zfill(2)+"  "
+				line+=hex(self.map[current_line*0x0010+current_index])[2:].zfill(2)+"  "
 				current_index+=1
 			if arq!=None: file.write(line+"\n")
 			else:print(line)
 		else:
 			while current_line<final_line:
 				while current_index<=0xF:
-					line+=hex(self.map[current_line*0x0010+current_index].get_value())[2:].zfill(2)+"  "
+					line+=hex(self.map[current_line*0x0010+current_index])[2:].zfill(2)+"  "
 					current_index+=1
 				if arq!=None: file.write(line+"\n")
 				else:print(line)
@@ -65,7 +162,39 @@ class memory:
 				current_index=0
 				line=hex(current_line)[2:].zfill(3)+"0:  "
 			while current_index<=final_index:
-				line+=hex(self.map[current_line*0x0010+current_index].get_value())[2:].zfill(2)+"  "
+				line+=hex(self.map[current_line*0x0010+current_index])[2:].zfill(2)+"  "
 				current_index+=1
 			if arq!=None: file.write(line+"\nFinal do dump.")
 			else:print(line)
+
+'''
+Memory for MVNs in trusted mode, it does not check the values
+accessed, as the code was checked when loaded, and only checks that
+the addresses are in the memory and not the last one, where a word
+does not fit
+'''
+class trusted_memory(memory):
+
+	def get_value(self, addr):
+		if not 0<=addr<MAX_ADDR:
+			raise MVNError("Incompatible size")
+		if self.watches!=None:
+			self.trap(addr, "r")
+		return self.map[addr]<<8|self.map[addr+1]
+
+	def fetch(self, addr):
+		if not 0<=addr<MAX_ADDR:
+			raise MVNError("Incompatible size")
+		return self.map[addr]<<8|self.map[addr+1]
+
+	def set_value(self, addr, value):
+		if not 0<=addr<MAX_ADDR:
+			raise MVNError("Incompatible size")
+		self.map[addr]=value>>8
+		self.map[addr+1]=value&0xFF
+		self.dirty.add(addr>>PAGE_BITS)
+		self.dirty.add((addr+1)>>PAGE_BITS)
+		if self.on_write!=None:
+			self.on_write(addr)
+		if self.watches!=None:
+			self.trap(addr, "w")
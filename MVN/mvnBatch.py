@@ -0,0 +1,131 @@
+import MVN
+import io
+import os.path
+import sys
+import json
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from mvnutils import *
+
+'''
+Headless batch runner for the MVN, it reads a manifest of jobs and
+runs them across a pool of processes, writing one JSON result per job.
+Each line of the manifest describes one job as:
+[image] [input] [expected] [max_step]
+image is the .mvn file or binary image to run, input is the file whose content is typed
+on the keyboard, expected is the file with the output expected on the
+screen and max_step is the step limit for the job. input and expected
+may be "-" when not given and max_step is optional. Relative paths are
+taken from the manifest directory, text after ";" is ignored.
+'''
+
+#Machines already loaded by this process
+# key:		image file and options of the MVN
+# value:	(MVN, snapshot taken right after loading the image)
+machines={}
+
+'''Read the manifest and return the list of jobs, each one a dict with
+image, input, expected and max_step'''
+def read_manifest(name, max_step):
+	base=os.path.dirname(name)
+	jobs=[]
+	for line in open(name, "r").read().split("\n"):
+		line=clean(line.split(";")[0])
+		if len(line)==0:
+			continue
+		if len(line) not in [3, 4]:
+			raise MVNError("Manifest badly formulated: "+" ".join(line))
+		paths=[None if path=="-" else os.path.join(base, path) for path in line[:3]]
+		jobs.append({"image": paths[0],
+					 "input": paths[1],
+					 "expected": paths[2],
+					 "max_step": int(line[3]) if len(line)==4 else max_step})
+	return jobs
+
+'''Return an MVN with the image loaded and in its initial state,
+reusing the one loaded before by this process if there is one'''
+def load_machine(image, options):
+	key=(image, options)
+	if key in machines:
+		mvn, snap=machines[key]
+		mvn.restore(snap)
+		return mvn
+	time_interrupt, time_limit, line_feed, compile_blocks, trusted, detect_loops=options
+	mvn=MVN.MVN(time_interrupt, time_limit, None, line_feed, False, compile_blocks, trusted)
+	if detect_loops:
+		mvn.enable_detector()
+	file=open(image, "rb")
+	mvn.load(file.read())
+	file.close()
+	machines[key]=(mvn, mvn.snapshot())
+	return mvn
+
+'''Run one job, with the keyboard reading from the input file and the
+screens and supervisor messages written to memory, and return its 
+result'''
+def run_job(job, options):
+	result={"image": job["image"],
+			"input": job["input"],
+			"reason": None,
+			"steps": 0,
+			"output": "",
+			"passed": None,
+			"error": None}
+	screen=io.StringIO()
+	keyboard=None
+	try:
+		mvn=load_machine(job["image"], options)
+		keyboard=open(job["input"], "rb") if job["input"]!=None else None
+		mvn.set_sink(screen)
+		mvn.set_input(keyboard if keyboard!=None else b"")
+		with contextlib.redirect_stdout(screen):
+			result["reason"], result["steps"]=mvn.run(job["max_step"])
+		if result["reason"] in [MVN.ERROR, MVN.LOOP]:
+			result["error"]=repr(mvn.error)
+	except Exception as error:
+		result["reason"]=MVN.ERROR
+		result["error"]=repr(error)
+	finally:
+		if keyboard!=None:
+			keyboard.close()
+	result["output"]=screen.getvalue()
+	if job["expected"]!=None:
+		try:
+			with open(job["expected"], "r") as expected:
+				result["passed"]=result["reason"]==MVN.HALT and result["output"]==expected.read()
+		except Exception as error:
+			result["passed"]=False
+			result["error"]=repr(error)
+	return result
+
+"""
+Here starts the main code for the batch runner
+"""
+
+if __name__=="__main__":
+	parser=argparse.ArgumentParser(description="MVN batch execution parameters")
+	parser.add_argument("manifest",					action="store", type=str,					help="File with one job per line: [image] [input] [expected] [max_step].")
+	parser.add_argument("-o", "--output",			action="store", type=str,	required=False,	help="File to write the JSON results, one per line. If not given, results are written on the screen.", default=None)
+	parser.add_argument("-j", "--jobs",				action="store", type=int,	required=False,	help="Number of processes running jobs. If not given, one per CPU. Integer", default=None)
+	parser.add_argument("-s", "--max_step",			action="store", type=int,	required=False,	help="The maximum number of steps for jobs without one in the manifest. Integer", default=10000)
+	parser.add_argument("-i", "--time_interrupt",	action="store", type=int,	required=False,	help="Tha maximum number of steps before making a time interruption. If not given, time interruptins will be disabled. Integer")
+	parser.add_argument("-f", "--line_feed",		action="store", type=str,	required=False,	help="The character to be used as line feed when writing on screen devices.", default="\n")
+	parser.add_argument("-c", "--compile",			action="store_true",		required=False,	help="When active the MVN compiles the code in basic blocks to run faster.", default=False)
+	parser.add_argument("-d", "--detect_loops",		action="store_true",		required=False,	help="When active jobs stop as soon as they are in an infinite loop, with reason \"loop\".", default=False)
+	parser.add_argument("-u", "--trusted",			action="store_true",		required=False,	help="When active the MVN only checks the values of the code when loading it.", default=False)
+	args=parser.parse_args()
+
+	options=(args.time_interrupt!=None, args.time_interrupt, args.line_feed, args.compile, args.trusted, args.detect_loops)
+	jobs=read_manifest(args.manifest, args.max_step)
+	out=open(args.output, "w") if args.output!=None else sys.stdout
+	failed=False
+	with ProcessPoolExecutor(args.jobs) as executor:
+		for result in executor.map(run_job, jobs, [options]*len(jobs), chunksize=max(1, len(jobs)//64)):
+			out.write(json.dumps(result)+"\n")
+			out.flush()
+			failed=failed or result["passed"]==False or result["reason"]==MVN.ERROR
+	if out!=sys.stdout:
+		out.close()
+	#Nonzero exit status if any job failed, for scripts and CI
+	sys.exit(1 if failed else 0)
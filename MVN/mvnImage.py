@@ -0,0 +1,20 @@
+import argparse
+import os.path
+import image
+from mvnutils import *
+
+"""
+Converts .mvn files to binary memory images (see image.py), which the
+MVN loads with no parsing
+"""
+
+parser=argparse.ArgumentParser(description="MVN image conversion parameters")
+parser.add_argument("code",					action="store", type=str,					help=".mvn file to be converted.")
+parser.add_argument("output",				action="store", type=str,	nargs="?",	help="Image file to be written. If not given, the .mvn file name with the .mvi extension.")
+args=parser.parse_args()
+
+output=args.output if args.output!=None else os.path.splitext(args.code)[0]+".mvi"
+data=image.convert(open(args.code, "r").read())
+file=open(output, "wb")
+file.write(data)
+file.close()
@@ -4,7 +4,9 @@ __version__="1.3"
 __year__="2021"
 
 import MVN
+import image
 import os.path
+import shlex
 import argparse
 from mvnutils import *
 from switchcase import *
@@ -12,8 +14,16 @@ from c3po import C3PO
 
 '''Start an MVN, check if there is any 'disp.lst' file and 
 inicialze the devices in it, return the MVN inicialized'''
-def inicialize(time_interrupt, time_limit, timeout, line_feed, quiet):
-	mvn=MVN.MVN(time_interrupt, time_limit, timeout, line_feed, quiet)
+def inicialize(time_interrupt, time_limit, timeout, line_feed, quiet, compile_blocks, trusted):
+	mvn=MVN.MVN(time_interrupt, time_limit, timeout, line_feed, quiet, compile_blocks, trusted)
+	if profile!=None:
+		mvn.enable_profiler()
+	if detect_loops:
+		mvn.enable_detector()
+	if keyboard!=None:
+		mvn.set_input(open(keyboard, "rb"))
+	if print_command!=None:
+		mvn.set_print_command(shlex.split(print_command))
 	print(c3po("MVN_ini"))
 	if os.path.exists("disp.lst"):
 		mvn.create_disp()
@@ -22,37 +32,34 @@ def inicialize(time_interrupt, time_limit, timeout, line_feed, quiet):
 		print(c3po("disp_ini_def"))
 	return mvn
 
-'''Open given file, read it, separate memory and addresses and 
-send them to the MVN memory'''
+'''Open given file, an .mvn file or a binary image, and send its
+contents to the MVN memory'''
 def load(name, mvn):
 	try:
 		valid_file(name)
 	except:
 		print(c3po("no_file"))
 		return False
-	file=open(name, "r")
-	raw=file.read()
-	code=raw.split("\n")
-	line=0
-	while line < len(code):
+	file=open(name, "rb")
+	data=file.read()
+	file.close()
+	if image.is_image(data):
 		try:
-			code[line]=code[line][:code[line].index(";")]
+			mvn.load_image(data)
 		except:
-			pass
-		code[line]=clean(code[line])
-		if len(code[line])!=2:
-			if len(code[line])==0:
-				code.pop(line)
-				line-=1
-			else:
-				print(c3po("big_instru"))
-				return False
-		line+=1
-	try:
-		mvn.set_memory(code)
-	except:
-		print(c3po("big_number"))
-		return False
+			print(c3po("bad_image"))
+			return False
+	else:
+		try:
+			code=parse_mvn(data.decode())
+		except:
+			print(c3po("big_instru"))
+			return False
+		try:
+			mvn.set_memory(code)
+		except:
+			print(c3po("big_number"))
+			return False
 	print(c3po("loaded",(name)))
 	return True
 
@@ -84,12 +91,42 @@ def run(mvn, goon, vals, sbs):
 	else:
 		sbs=False
 
-	if vals:
+	if vals and not sbs and trace!=None:
+		mvn.enable_tracer(file=trace)
+		try:
+			reason, n_steps=mvn.run(max_step+1)
+		finally:
+			mvn.disable_tracer()
+		if reason==MVN.ERROR:
+			raise mvn.error
+		if reason==MVN.STEP_LIMIT:
+			print(c3po("infty_loop"))
+		if reason==MVN.LOOP:
+			print(c3po("loop_found", (hex(mvn.IC.get_value())[2:].zfill(4))))
+		print(c3po("trace_saved", (trace)))
+		goon=False
+	elif vals:
 		print(c3po("reg_head"))
+	else:
+		reason, n_steps=mvn.run(max_step+1)
+		if reason==MVN.ERROR:
+			raise mvn.error
+		if reason==MVN.STEP_LIMIT:
+			print(c3po("infty_loop"))
+		if reason==MVN.LOOP:
+			print(c3po("loop_found", (hex(mvn.IC.get_value())[2:].zfill(4))))
+		goon=False
+	if mvn.detector!=None:
+		mvn.detector.reset()
 	while goon:
-		goon=mvn.step()
+		try:
+			goon=mvn.step()
+		except MVNLoop:
+			print(c3po("loop_found", (hex(mvn.IC.get_value())[2:].zfill(4))))
+			break
 		n_steps+=1
 		if vals:
+			mvn.flush_devs()
 			if sbs:
 				read=input(mvn.print_state())
 			else:
@@ -98,6 +135,28 @@ def run(mvn, goon, vals, sbs):
 			print(c3po("infty_loop"))
 			goon=False
 
+'''Return True if the MVN is at a breakpoint, unconditional or with a
+condition that holds. Conditions are Python expressions on the 
+registers (MAR, MDR, IC, IR, OP, OI, AC) and on mem(addr), the word in
+addr; a condition that fails to be evaluated holds'''
+def at_breakpoint(mvn):
+	ic=mvn.IC.get_value()
+	if ic in breakpoints:
+		return True
+	if ic not in conditions:
+		return False
+	names={"MAR": mvn.MAR.get_value(), "MDR": mvn.MDR.get_value(), "IC": ic,
+		   "IR": mvn.IR.get_value(), "OP": mvn.OP.get_value(), "OI": mvn.OI.get_value(),
+		   "AC": mvn.AC.get_value(), "mem": mvn.mem.fetch, "__builtins__": {}}
+	for condition in conditions[ic]:
+		try:
+			if eval(condition, names):
+				return True
+		except Exception:
+			print(c3po("cond_inv"))
+			return True
+	return False
+
 '''Run the code in debugger mode, in this mode vals and sbs are not
 needed. The debugger mode has it's own instruction set, to execute 
 debugging operations, see bdg_help() for complete guide'''
@@ -106,9 +165,10 @@ def run_dbg(mvn, goon):
 	print(c3po("dbg_comm"))
 	print(c3po("dbg_help"))
 	print(c3po("reg_head"))
+	mvn.enable_history()
 	step=True
 	while goon:
-		if step or mvn.IC.get_value() in breakpoints:
+		if step or ((breakpoints or conditions) and at_breakpoint(mvn)):
 			step=False
 			out=False
 			while not out:
@@ -124,11 +184,35 @@ def run_dbg(mvn, goon):
 						if len(read)>1:
 							for breaks in read[1:]:
 								try:
-									breakpoints.append(int(breaks, 16))
+									breakpoints.add(int(breaks, 16))
 								except:
 									print(c3po("break_hex"))
 						else:
 							print(c3po("no_addr"))
+					elif case("bc"):
+						if len(read)>2:
+							try:
+								addr=int(read[1], 16)
+								try:
+									conditions.setdefault(addr, []).append(compile(" ".join(read[2:]), "<breakpoint>", "eval"))
+								except SyntaxError:
+									print(c3po("cond_inv"))
+							except ValueError:
+								print(c3po("break_hex"))
+						else:
+							print(c3po("no_addr"))
+					elif case("w"):
+						if len(read) in [3, 4]:
+							modes=read[3] if len(read)==4 else "rw"
+							if modes not in ["r", "w", "rw"]:
+								print(c3po("watch_inv"))
+							else:
+								try:
+									mvn.mem.watch(int(read[1], 16), int(read[2], 16), modes)
+								except:
+									print(c3po("val_hex"))
+						else:
+							print(c3po("no_addr"))
 					elif case("x"):
 						out=True
 						goon=False
@@ -140,32 +224,56 @@ def run_dbg(mvn, goon):
 								if read[1] not in ["MAR", "MDR", "IC", "IR", "OP", "OI", "AC"]:
 									print(c3po("reg_inv"))
 								elif read[1]=="MAR":
-									mvn.MAR.set_value(int(read[2], 16))
+									mvn.MAR.set_checked_value(int(read[2], 16))
 								elif read[1]=="MDR":
-									mvn.MDR.set_value(int(read[2], 16))
+									mvn.MDR.set_checked_value(int(read[2], 16))
 								elif read[1]=="IC":
-									mvn.IC.set_value(int(read[2], 16))
+									mvn.IC.set_checked_value(int(read[2], 16))
 								elif read[1]=="IR":
-									mvn.IR.set_value(int(read[2], 16))
+									mvn.IR.set_checked_value(int(read[2], 16))
 								elif read[1]=="OP":
-									mvn.OP.set_value(int(read[2], 16))
+									mvn.OP.set_checked_value(int(read[2], 16))
 								elif read[1]=="OI":
-									mvn.OI.set_value(int(read[2], 16))
+									mvn.OI.set_checked_value(int(read[2], 16))
 								elif read[1]=="AC":
-									mvn.AC.set_value(int(read[2], 16))
+									mvn.AC.set_checked_value(int(read[2], 16))
 							except:
 								print(c3po("val_hex"))
 					elif case("a"):
-						mvn.mem.set_value(int(read[1], 16), int(read[2], 16))
+						mvn.mem.set_checked_value(int(read[1], 16), int(read[2], 16))
 					elif case("e"):
 						print(c3po("reg_head"))
 						print(mvn.print_state())
 					elif case("m"):
 						mvn.dump_memory(int(read[1], 16), int(read[2], 16))
+					elif case("v"):
+						if mvn.step_back():
+							print(mvn.print_state())
+						else:
+							print(c3po("no_back"))
+					elif case("vc"):
+						if mvn.step_back():
+							while not at_breakpoint(mvn) and mvn.step_back():
+								pass
+							print(mvn.print_state())
+						else:
+							print(c3po("no_back"))
 					else:
 						print(c3po("no_rec"))
-		goon=mvn.step() and goon
+			if mvn.detector!=None:
+				mvn.detector.reset()
+		try:
+			goon=mvn.step() and goon
+		except MVNLoop:
+			print(c3po("loop_found", (hex(mvn.IC.get_value())[2:].zfill(4))))
+			step=True
+		mvn.flush_devs()
 		print(mvn.print_state())
+		if mvn.mem.hit!=None:
+			print(c3po("watch_hit", (hex(mvn.mem.hit[0])[2:].zfill(4), mvn.mem.hit[1])))
+			mvn.mem.hit=None
+			step=True
+	mvn.disable_history()
 
 
 """
@@ -180,21 +288,35 @@ parser.add_argument("-i", "--time_interrupt", 	action="store", type=int, 	requir
 parser.add_argument("-t", "--timeout_input", 	action="store", type=int, 	required=False, help="The maximun time to wait for user keyboard input in miliseconds. If not given, time timeout will be disabled. Integer")
 parser.add_argument("-f", "--line_feed", 		action="store", type=str, 	required=False, help="The character to be used as line feed when writing on screen devices.", default="\n")
 parser.add_argument("-q", "--quiet",		 	action="store_false",		required=False, help="When active the MVN enters in silent mode and will no show debug messages during execution.", default=True)
+parser.add_argument("-c", "--compile",		 	action="store_true",		required=False, help="When active the MVN compiles the code in basic blocks to run faster when the registers are not shown.", default=False)
+parser.add_argument("-u", "--trusted",		 	action="store_true",		required=False, help="When active the MVN only checks the values of the code when loading it, running it without checking each memory and register access.", default=False)
+parser.add_argument("-p", "--profile",		 	action="store", type=str,	required=False, help="When active the MVN counts the executions and memory accesses of each address and shows them after each run. The addresses are annotated with the lines of the .lst file, if given.", nargs="?", const="", default=None)
+parser.add_argument("-d", "--detect_loops",	 	action="store_true",		required=False, help="When active the MVN stops as soon as the program is in an infinite loop (the same state repeated with no device I/O in between). The steps limit is then only applied if given.", default=False)
+parser.add_argument("-k", "--keyboard",		 	action="store", type=str,	required=False, help="File to be read by the keyboards instead of typing the input. String", default=None)
+parser.add_argument("-o", "--print_command",	 	action="store", type=str,	required=False, help="Command the printers send their jobs to, on its input, instead of lpr. String", default=None)
+parser.add_argument("-r", "--trace",		 	action="store", type=str,	required=False, help="File to save the registers of each step when they are to be shown, instead of showing them on screen. Use mvnTrace.py to show the file.", default=None)
 args=parser.parse_args()
 
 #Initializes C3PO
 c3po=C3PO(args.language if args.language!=None else "en")
 
 #Define steps limit
-max_step=args.max_step if args.max_step!=None else 10000
+max_step=args.max_step if args.max_step!=None else (float("inf") if args.detect_loops else 10000)
 time_interrupt=args.time_interrupt!=None
 time_limit=args.time_interrupt
 timeout=args.timeout_input
 line_feed=args.line_feed
 quiet=args.quiet
+compile_blocks=args.compile
+trusted=args.trusted
+profile=args.profile
+trace=args.trace
+detect_loops=args.detect_loops
+keyboard=args.keyboard
+print_command=args.print_command
 
 #First thing to be done is inicialize our MVN
-mvn=inicialize(time_interrupt, time_limit, timeout, line_feed, quiet)
+mvn=inicialize(time_interrupt, time_limit, timeout, line_feed, quiet, compile_blocks, trusted)
 #Show up the header for the MVN
 print(c3po("header",(__version__, __year__)))
 #Show options available
@@ -220,7 +342,7 @@ while True:
 		switch(command[0])
 		#To reinicialize the MVN is just to inicialize it one more time
 		if case("i"):
-			mvn=inicialize(time_interrupt, time_limit, mvn.TIMEOUT, mvn.line_feed, mvn.quiet)
+			mvn=inicialize(time_interrupt, time_limit, mvn.TIMEOUT, mvn.line_feed, mvn.quiet, compile_blocks, trusted)
 
 		#To load an program, one argument (the file) is required, if 
 		#it's not given, ask for it, if more are passed, cancel operation
@@ -245,13 +367,16 @@ while True:
 		elif case("r"):
 			if goon:
 				try:
-					mvn.IC.set_value(int(input(c3po("inf_IC", (str(hex(mvn.IC.get_value())[2:]).zfill(4)))), 16))
+					mvn.IC.set_checked_value(int(input(c3po("inf_IC", (str(hex(mvn.IC.get_value())[2:]).zfill(4)))), 16))
 				except:
 					pass
 				if not dbg:
 					run(mvn, goon, vals, sbs)
 				else:
 					run_dbg(mvn, goon)
+				if profile!=None:
+					print(mvn.profiler.report(20, profile if profile!="" else None))
+					mvn.profiler.clear()
 				goon=True	
 			else:
 				print(c3po("cant_run"))
@@ -261,9 +386,11 @@ while True:
 			dbg=not dbg
 			if dbg:
 				print(c3po("deb_on"))
-				breakpoints=[]
+				breakpoints=set()
+				conditions={}
 			else:
 				print(c3po("deb_off"))
+				mvn.mem.unwatch()
 
 		#Display the available devices and give options to add or remove
 		elif case("s"):
@@ -0,0 +1,23 @@
+import argparse
+import tracer
+from c3po import C3PO
+
+"""
+Renders the binary trace written by the MVN tracer (see tracer.py) 
+in the same text format shown by the monitor at each step
+"""
+
+parser=argparse.ArgumentParser(description="MVN trace rendering parameters")
+parser.add_argument("trace",				action="store", type=str,					help="Trace file written by the MVN.")
+parser.add_argument("-l", "--language",		action="store", type=str,	required=False,	help="Language of the MVN. String")
+parser.add_argument("-n", "--last",			action="store", type=int,	required=False,	help="Number of steps to be shown, from the end of the trace. If not given, all steps are shown. Integer")
+args=parser.parse_args()
+
+c3po=C3PO(args.language if args.language!=None else "en")
+
+data=open(args.trace, "rb").read()
+if args.last!=None:
+	data=data[max(0, len(data)-args.last*tracer.RECORD.size):]
+print(c3po("reg_head"))
+for line in tracer.render(data):
+	print(line)
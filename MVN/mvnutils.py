@@ -6,6 +6,10 @@ import re
 class MVNError(Exception):
 	pass
 
+#Error raised when the MVN is found in an infinite loop
+class MVNLoop(MVNError):
+	pass
+
 #Test if argument is between MIN and MAX, raise error
 def valid_value(num, MIN, MAX):
 	if not(MIN<=num and num<=MAX):
@@ -48,4 +52,17 @@ def clean(line):
 			res.append(word)
 	return res
 
+'''Separate the text of an .mvn file in a list of [addr, value] 
+pairs, ignoring comments and empty lines, raise error'''
+def parse_mvn(text):
+	code=[]
+	for line in text.split("\n"):
+		line=clean(line.split(";")[0])
+		if len(line)==0:
+			continue
+		if len(line)!=2:
+			raise MVNError("Bad instruction: "+" ".join(line))
+		code.append(line)
+	return code
+
 #Really? You had to check this methods???
\ No newline at end of file
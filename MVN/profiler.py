@@ -0,0 +1,101 @@
+from mvnutils import *
+
+MAX_ADDR=0x0FFF
+MNEMONICS=["JP", "JZ", "JN", "LV", "AD", "SB", "ML", "DV",
+		   "LD", "MM", "SC", "RS", "HM", "GD", "PD", "OS"]
+
+'''
+This class profiles the execution of an MVN, counting the executions
+of each instruction (by opcode and by address) and the memory reads
+and writes of each address.
+It is installed as a hook over the MVN step method and over the memory
+methods (get_value, set_value), so an MVN without a profiler
+runs the original methods with no extra cost. Instruction fetches go
+through memory fetch, so they are not counted as reads.
+'''
+class profiler:
+
+	#Inicialize the counters and install the profiler in the MVN
+	def __init__(self, mvn):
+		self.mvn=mvn
+		self.executions=[0]*(MAX_ADDR+1)
+		self.opcodes=[0]*16
+		self.reads=[0]*(MAX_ADDR+1)
+		self.writes=[0]*(MAX_ADDR+1)
+		mvn.add_hook(mvn, "step", self.step)
+		mvn.add_hook(mvn.mem, "get_value", self.counted_get_value)
+		mvn.add_hook(mvn.mem, "set_value", self.counted_set_value)
+
+	#Remove the profiler from the MVN, keeping the counters
+	def uninstall(self):
+		self.mvn.remove_hook(self.mvn, "step", self.step)
+		self.mvn.remove_hook(self.mvn.mem, "get_value", self.counted_get_value)
+		self.mvn.remove_hook(self.mvn.mem, "set_value", self.counted_set_value)
+
+	#Step of the MVN, counting the instruction executed
+	def step(self, mvn_step):
+		ic=self.mvn.IC.value
+		goon=mvn_step()
+		self.executions[ic]+=1
+		self.opcodes[self.mvn.instru_translator[self.mvn.OP.value]]+=1
+		return goon
+
+	def counted_get_value(self, get_value, addr):
+		value=get_value(addr)
+		self.reads[addr]+=1
+		return value
+
+	def counted_set_value(self, set_value, addr, value):
+		set_value(addr, value)
+		self.writes[addr]+=1
+
+	#Reset all counters
+	def clear(self):
+		self.executions=[0]*(MAX_ADDR+1)
+		self.opcodes=[0]*16
+		self.reads=[0]*(MAX_ADDR+1)
+		self.writes=[0]*(MAX_ADDR+1)
+
+	'''Return the text of each line of the .lst file generated by the
+	montador by the address of the line, plus base'''
+	def read_lst(self, name, base=0):
+		source={}
+		for line in open(name, "r").read().split("\n"):
+			if ";" not in line:
+				continue
+			code, text=line.split(";", 1)
+			code=clean(code)
+			if len(code)!=2:
+				continue
+			try:
+				addr=(int(code[0], 16)&0x0FFF)+base
+				int(code[1], 16)
+			except ValueError:
+				continue
+			source[addr]=" ".join(clean(text.strip()))
+		return source
+
+	'''Return the report of the execution, with the addresses sorted from
+	the most to the least executed (then accessed) and the count of each
+	opcode. At most limit addresses are listed and, if lst is given, each
+	address is annotated with its line in the .lst file'''
+	def report(self, limit=None, lst=None, base=0):
+		source=self.read_lst(lst, base) if lst!=None else {}
+		addrs=[addr for addr in range(MAX_ADDR+1)
+			   if self.executions[addr] or self.reads[addr] or self.writes[addr]]
+		addrs.sort(key=lambda addr: (-self.executions[addr], -self.reads[addr]-self.writes[addr], addr))
+		if limit!=None:
+			addrs=addrs[:limit]
+		lines=[" ADDR       EXECS      READS     WRITES  SOURCE",
+			   "-----------------------------------------------------------------------"]
+		for addr in addrs:
+			lines.append(" "+hex(addr)[2:].zfill(4)+"  "+str(self.executions[addr]).rjust(10)+" "
+						 +str(self.reads[addr]).rjust(10)+" "+str(self.writes[addr]).rjust(10)+"  "
+						 +source.get(addr, ""))
+		lines+=["",
+				" OP         EXECS",
+				"-----------------------------------------------------------------------"]
+		for op in sorted(range(16), key=lambda op: -self.opcodes[op]):
+			if self.opcodes[op]:
+				lines.append(" "+MNEMONICS[op]+"  "+str(self.opcodes[op]).rjust(13))
+		return "\n".join(lines)
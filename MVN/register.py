@@ -20,4 +20,19 @@ class register:
 		self.value=value
 		
 	def get_value(self):
-		return self.value
\ No newline at end of file
+		return self.value
+
+	'''Set value given by the user, it is checked even in trusted
+	mode'''
+	def set_checked_value(self, value):
+		valid_value(value, MIN_VALUE, MAX_VALUE)
+		self.set_value(value)
+
+'''
+Register for MVNs in trusted mode, it does not check the values
+set by the MVN, as they are expected to be valid
+'''
+class trusted_register(register):
+
+	def set_value(self, value):
+		self.value=value
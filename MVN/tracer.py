@@ -0,0 +1,72 @@
+import struct
+
+#Each record holds IC, IR, AC, MAR and MDR after one step
+RECORD=struct.Struct(">5H")
+#Records written to the file at once
+CHUNK=4096
+
+'''
+This class records the execution of an MVN as fixed-width binary
+records, one per step, instead of the text of print_state.
+The records are kept in a ring buffer with the last size steps or, if
+a file is given, written to it in chunks.
+It is installed as a hook over the MVN step method, so an MVN without a
+tracer runs the original method with no extra cost.
+'''
+class tracer:
+
+	#Inicialize the buffers and install the tracer in the MVN
+	def __init__(self, mvn, size=0x10000, file=None):
+		self.mvn=mvn
+		self.size=size
+		self.count=0
+		if file!=None:
+			self.file=open(file, "wb")
+			self.pending=bytearray()
+		else:
+			self.file=None
+			self.ring=bytearray(size*RECORD.size)
+		mvn.add_hook(mvn, "step", self.step)
+
+	#Remove the tracer from the MVN and write the pending records
+	def uninstall(self):
+		self.mvn.remove_hook(self.mvn, "step", self.step)
+		if self.file!=None:
+			self.file.write(self.pending)
+			self.file.close()
+			self.pending=bytearray()
+
+	#Step of the MVN, recording the registers after it
+	def step(self, mvn_step):
+		goon=mvn_step()
+		mvn=self.mvn
+		record=(mvn.IC.value&0xFFFF, mvn.IR.value&0xFFFF, mvn.AC.value&0xFFFF,
+				mvn.MAR.value&0xFFFF, mvn.MDR.value&0xFFFF)
+		if self.file!=None:
+			self.pending+=RECORD.pack(*record)
+			if len(self.pending)>=CHUNK*RECORD.size:
+				self.file.write(self.pending)
+				self.pending=bytearray()
+		else:
+			RECORD.pack_into(self.ring, (self.count%self.size)*RECORD.size, *record)
+		self.count+=1
+		return goon
+
+	'''Return the records from the oldest to the newest, the last size
+	steps from the ring buffer or all the steps written to the file'''
+	def records(self):
+		if self.file!=None:
+			if not self.file.closed:
+				self.file.flush()
+			with open(self.file.name, "rb") as file:
+				return file.read()+bytes(self.pending)
+		if self.count<=self.size:
+			return bytes(self.ring[:self.count*RECORD.size])
+		start=(self.count%self.size)*RECORD.size
+		return bytes(self.ring[start:]+self.ring[:start])
+
+'''Return the lines of the records in data, in the same format as
+MVN.print_state'''
+def render(data):
+	for ic, ir, ac, mar, mdr in RECORD.iter_unpack(data):
+		yield " ".join(hex(value)[2:].zfill(4) for value in (mar, mdr, ic, ir, ir//0x1000, ir%0x1000, ac))
@@ -0,0 +1,8 @@
+import os
+import sys
+
+#The MVN and MLR modules import each other by name, as when run from
+#their own directories
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "MLR"))
+sys.path.insert(0, os.path.join(ROOT, "MVN"))
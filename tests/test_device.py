@@ -0,0 +1,56 @@
+import io
+import MVN
+
+#Prints the word in 0100 five times and halts
+PRINTS="""0000 8100
+0002 E100
+0004 E100
+0006 E100
+0008 E100
+000A E100
+000C C00C
+0100 {:04x}
+"""
+
+#Sink counting its writes
+class counting_sink(io.StringIO):
+
+	def __init__(self, tty=False):
+		super().__init__()
+		self.writes=0
+		self.tty=tty
+
+	def write(self, text):
+		self.writes+=1
+		return super().write(text)
+
+	def isatty(self):
+		return self.tty
+
+def run_prints(sink, value=0x4142):
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(PRINTS.format(value))
+	mvn.IC.set_value(0)
+	mvn.set_sink(sink)
+	return mvn.run(100)
+
+def test_screen_writes_once_to_file_sink():
+	sink=counting_sink()
+	assert run_prints(sink)==(MVN.HALT, 7)
+	assert sink.getvalue()=="AB\n"*5
+	assert sink.writes==1
+
+def test_screen_line_feed_printed_does_not_flush_file_sink():
+	sink=counting_sink()
+	run_prints(sink, 0x0A43)
+	assert sink.getvalue()=="\nC\n"*5
+	assert sink.writes==1
+
+def test_screen_flushes_terminal_on_line_feed_printed():
+	sink=counting_sink(tty=True)
+	run_prints(sink, 0x0A43)
+	assert sink.getvalue()=="\nC\n"*5
+	assert sink.writes==5
+	sink=counting_sink(tty=True)
+	run_prints(sink)
+	assert sink.writes==1
@@ -0,0 +1,29 @@
+import MVN
+
+#Counts N down to zero and halts
+COUNTDOWN="""0000 8100
+0002 5102
+0004 9100
+0006 100A
+0008 0000
+000A C00A
+0100 0003
+0102 0001
+"""
+
+def test_step_back_is_not_a_watch_hit():
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(COUNTDOWN)
+	mvn.IC.set_value(0)
+	mvn.enable_history()
+	for step in range(3):
+		mvn.step()
+	mvn.mem.watch(0x100, 0x100, "w")
+	assert mvn.step_back()
+	assert mvn.mem.hit==None
+	assert mvn.mem.get_value(0x100)==0x0003
+	assert mvn.step_back()
+	mvn.step()
+	assert mvn.mem.hit==None
+	mvn.step()
+	assert mvn.mem.hit==(0x100, "w")
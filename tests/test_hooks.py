@@ -0,0 +1,66 @@
+import pytest
+import MVN
+
+#Counts N down to zero and halts
+COUNTDOWN="""0000 8100
+0002 5102
+0004 9100
+0006 100A
+0008 0000
+000A C00A
+0100 0003
+0102 0001
+"""
+
+def countdown():
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(COUNTDOWN)
+	mvn.IC.set_value(0)
+	return mvn
+
+#True if no hook is left over the MVN and its memory
+def unhooked(mvn):
+	return ("step" not in mvn.__dict__ and "get_value" not in mvn.mem.__dict__
+			and "set_value" not in mvn.mem.__dict__ and not mvn.hook_chains)
+
+@pytest.mark.parametrize("first", ["history", "profiler"])
+def test_history_and_profiler_disabled_in_any_order(first):
+	mvn=countdown()
+	history=mvn.enable_history()
+	profiler=mvn.enable_profiler()
+	if first=="history":
+		mvn.disable_history()
+		assert mvn.run(100)==(MVN.HALT, 15)
+		assert profiler.executions[0x0000]==3
+		assert profiler.writes[0x0100]==3
+		mvn.disable_profiler()
+	else:
+		mvn.disable_profiler()
+		assert mvn.run(100)==(MVN.HALT, 15)
+		assert profiler.executions[0x0000]==0
+		assert len(history)==15
+		while mvn.step_back():
+			pass
+		assert mvn.IC.value==0x0000
+		assert mvn.mem.get_value(0x0100)==0x0003
+		mvn.disable_history()
+	assert unhooked(mvn)
+
+def test_history_undo_is_not_profiled():
+	mvn=countdown()
+	mvn.enable_profiler()
+	history=mvn.enable_history()
+	mvn.run(100)
+	writes=mvn.profiler.writes[0x0100]
+	assert history.back()
+	assert mvn.profiler.writes[0x0100]==writes
+
+def test_tracer_kept_when_profiler_removed():
+	mvn=countdown()
+	mvn.enable_profiler()
+	tracer=mvn.enable_tracer(size=64)
+	mvn.disable_profiler()
+	mvn.run(100)
+	assert tracer.count==15
+	mvn.disable_tracer()
+	assert unhooked(mvn)
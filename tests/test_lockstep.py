@@ -0,0 +1,86 @@
+import io
+import pytest
+import MVN
+import device
+import lockstep
+from mvnutils import MVNError
+
+np=pytest.importorskip("numpy")
+
+#AC:=mem(0100) op mem(0102), mem(0104):=AC and halts
+ARITHMETIC="""0000 8100
+0002 {:x}102
+0004 9104
+0006 C006
+0100 {:04x}
+0102 {:04x}
+"""
+
+#Signed division, overflow and division by zero cases
+VALUES=[0x0000, 0x0001, 0x0003, 0x0007, 0x7FFF, 0x8000, 0x8001, 0xFFFF, 0xFFFE, 0xFFF9]
+
+def scalar(op, num1, num2):
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(ARITHMETIC.format(op, num1, num2))
+	mvn.IC.set_value(0)
+	reason, steps=mvn.run(10)
+	return reason, steps, mvn.AC.value, mvn.mem.map[0x104]<<8|mvn.mem.map[0x105]
+
+@pytest.mark.parametrize("op", [0x4, 0x5, 0x6, 0x7])
+def test_lockstep_arithmetic_matches_run(op):
+	pairs=[(num1, num2) for num1 in VALUES for num2 in VALUES]
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(ARITHMETIC.format(op, 0, 0))
+	mvn.IC.set_value(0)
+	engine=lockstep.lockstep(mvn, [b""]*len(pairs))
+	for lane, (num1, num2) in enumerate(pairs):
+		engine.mem[lane, 0x100:0x104]=[num1>>8, num1&0xFF, num2>>8, num2&0xFF]
+	results=engine.run(10)
+	for lane, (num1, num2) in enumerate(pairs):
+		reason, steps, ac, stored=scalar(op, num1, num2)
+		assert results[lane]==(reason, steps)
+		if reason==MVN.HALT:
+			assert (int(engine.AC[lane]), int(engine.mem[lane, 0x104])<<8|int(engine.mem[lane, 0x105]))==(ac, stored)
+
+#Reads a word, operates the device in mem(0006), the argument of the
+#supervisor call, as given by mem(0102), reads another word and writes
+#it on the screen
+DEVICE="""0000 D000
+0002 8102
+0004 0008
+0006 {:04x}
+0008 F10D
+000A D000
+000C E100
+000E C00E
+0102 {:04x}
+"""
+
+def scalar_device(code, operation, data):
+	mvn=MVN.MVN(quiet=True)
+	screen=io.StringIO()
+	mvn.set_sink(screen)
+	mvn.set_input(data)
+	mvn.load(DEVICE.format(code, operation))
+	mvn.IC.set_value(0)
+	reason, steps=mvn.run(10)
+	mvn.flush_devs()
+	return reason, steps, screen.getvalue(), mvn.error
+
+@pytest.mark.parametrize("chunk", [device.KEYBOARD_CHUNK, 3])
+@pytest.mark.parametrize("code, operation", [(0x000, 0), (0x000, 2), (0x100, 2), (0x100, 0), (0x000, 1), (0x301, 2)])
+def test_lockstep_device_call_matches_run(monkeypatch, code, operation, chunk):
+	monkeypatch.setattr(device, "KEYBOARD_CHUNK", chunk)
+	inputs=[b"", b"ab", b"ab\ncd\n", b"abcdef"]
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(DEVICE.format(code, operation))
+	mvn.IC.set_value(0)
+	engine=lockstep.lockstep(mvn, inputs)
+	results=engine.run(10)
+	for lane, data in enumerate(inputs):
+		reason, steps, screen, error=scalar_device(code, operation, data)
+		assert results[lane]==(reason, steps)
+		if reason==MVN.HALT:
+			assert "".join(engine.outputs[lane])==screen
+		else:
+			assert isinstance(error, MVNError) and isinstance(engine.errors[lane], MVNError)
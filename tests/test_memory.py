@@ -0,0 +1,42 @@
+import pytest
+import MVN
+import memory
+from mvnutils import MVNError
+
+@pytest.mark.parametrize("mem", [memory.memory(), memory.trusted_memory()])
+def test_last_address_raises_mvn_error(mem):
+	for read in (mem.get_value, mem.fetch):
+		with pytest.raises(MVNError):
+			read(memory.MAX_ADDR)
+	with pytest.raises(MVNError):
+		mem.set_value(memory.MAX_ADDR, 0x1234)
+	assert mem.map[memory.MAX_ADDR]==0xFC
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_run_stops_with_mvn_error_on_last_address(trusted):
+	mvn=MVN.MVN(quiet=True, trusted=trusted)
+	mvn.load("0000 8FFF\n")
+	mvn.IC.set_value(0)
+	assert mvn.run(10)==(MVN.ERROR, 1)
+	assert isinstance(mvn.error, MVNError)
+
+@pytest.mark.parametrize("mem", [memory.memory(), memory.trusted_memory()])
+def test_negative_address_raises_mvn_error(mem):
+	pages=mem.snapshot()
+	for read in (mem.get_value, mem.fetch):
+		with pytest.raises(MVNError):
+			read(-2)
+	with pytest.raises(MVNError):
+		mem.set_value(-2, 0x1234)
+	mem.restore(pages)
+	assert len(mem.map)==memory.MAX_ADDR+1
+
+def test_trusted_mvn_checks_values_given_by_the_user():
+	mvn=MVN.MVN(quiet=True, trusted=True)
+	with pytest.raises(MVNError):
+		mvn.AC.set_checked_value(0x12345)
+	with pytest.raises(MVNError):
+		mvn.mem.set_checked_value(0x0100, 0x12345)
+	mvn.AC.set_checked_value(0x1234)
+	mvn.mem.set_checked_value(0x0100, 0x1234)
+	assert (mvn.AC.value, mvn.mem.get_value(0x0100))==(0x1234, 0x1234)
@@ -0,0 +1,38 @@
+from montador import Montador, assemble, le_linhas, VERMELHO, BRANCO
+from cache_de_montagem import CacheDeMontagem
+
+#Words that start with a digit and go on with letters that are not hex
+MALFORMED="""& /0000
+MAIN LV /0005
+     MM 1Y
+     AD 2Z
+     HM MAIN
+X    K 9Q
+Y    K 7R ; 8S
+# MAIN
+"""
+
+def lexical_messages(codigo):
+	montador=Montador()
+	list(montador.analisa_lexico(le_linhas(codigo)))
+	return montador.erro_lexico, montador.mensagens
+
+def test_every_malformed_word_is_reported():
+	#Messages written by the lexer before it was moved into Montador
+	erro, mensagens=lexical_messages(MALFORMED)
+	assert erro
+	assert mensagens==[f"{VERMELHO}Palavra mal formada na linha {linha}." for linha in [3, 4, 6, 7]]
+
+def test_malformed_words_followed_by_other_characters():
+	erro, mensagens=lexical_messages("& /0000\nMAIN LV /00G5\n     MM 1Y+\n     AD 3W,\nX    K 9Q\n# MAIN\n")
+	assert erro
+	assert mensagens==[f"{VERMELHO}Palavra mal formada na linha {linha}." for linha in [2, 3, 4, 5]]
+
+def test_assemble_a_malformed_word_fails_without_raising(tmp_path):
+	for cache in [None, CacheDeMontagem(str(tmp_path))]:
+		resultado=assemble(MALFORMED, cache=cache)
+		assert resultado.mvn==None
+		assert resultado.lst==None
+		assert not resultado.ok
+		assert resultado.messages[0]==f"{VERMELHO}Palavra mal formada na linha 3."
+		assert resultado.messages[-1]==f"{VERMELHO}O código está lexicamente errado.{BRANCO}"
@@ -0,0 +1,41 @@
+import pytest
+import MVN
+import tracer
+
+#Counts N down to zero and halts
+COUNTDOWN="""0000 8100
+0002 5102
+0004 9100
+0006 100A
+0008 0000
+000A C00A
+0100 0003
+0102 0001
+"""
+
+#Run the countdown with tracer enabled, return it with the states shown at each step
+def traced(**kwargs):
+	mvn=MVN.MVN(quiet=True)
+	mvn.load(COUNTDOWN)
+	mvn.IC.set_value(0)
+	trace=mvn.enable_tracer(**kwargs)
+	states=[]
+	goon=True
+	while goon:
+		goon=mvn.step()
+		states.append(mvn.print_state())
+	return mvn, trace, states
+
+def test_ring_keeps_the_last_steps():
+	mvn, trace, states=traced(size=4)
+	assert list(tracer.render(trace.records()))==states[-4:]
+
+@pytest.mark.parametrize("chunk", [tracer.CHUNK, 4])
+def test_file_records_are_written_and_pending(tmp_path, monkeypatch, chunk):
+	monkeypatch.setattr(tracer, "CHUNK", chunk)
+	name=str(tmp_path/"trace")
+	mvn, trace, states=traced(file=name)
+	assert list(tracer.render(trace.records()))==states
+	mvn.disable_tracer()
+	assert list(tracer.render(trace.records()))==states
+	assert list(tracer.render(open(name, "rb").read()))==states